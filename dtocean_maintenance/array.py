@@ -26,6 +26,7 @@
 .. moduleauthor:: Mathew Topper <mathew.topper@dataonlygreater.com>
 """
 
+import math
 import logging
 
 import pandas as pd
@@ -36,6 +37,107 @@ from .static import poisson_process
 module_logger = logging.getLogger(__name__)
 
 
+class RAMMetrics(object):
+    
+    """RAM metrics of the sub-system types and failure rates of the
+    components of a RAM network. Each is derived from the network when first
+    requested and then reused, so that one object can be shared by the Array
+    objects of every data point.
+    
+    Args:
+        ram_network (object): RAM Network object
+    
+    """
+    
+    def __init__(self, ram_network):
+        
+        self._ram_network = ram_network
+        self._subsystem_metrics = {}
+        self._component_failure_rates = {}
+        
+        return
+    
+    def get_subsystem_metrics(self, subsystem):
+        
+        """Return the RAM metrics of a sub-system type
+        
+        Args:
+            subsystem (str): sub-system type, e.g. "Substation"
+        
+        Returns:
+            pandas.DataFrame: metrics indexed by parent system, or None if the
+                sub-system type is not in the RAM
+        
+        """
+        
+        if subsystem not in self._subsystem_metrics:
+            
+            metrics = self._ram_network.get_subsystem_metrics(subsystem)
+            
+            if metrics is not None:
+                metrics = pd.DataFrame(metrics)
+                metrics = metrics.set_index("System")
+            
+            self._subsystem_metrics[subsystem] = metrics
+        
+        return self._subsystem_metrics[subsystem]
+    
+    def get_component_failure_rate(self, componentSubType, componentType):
+        
+        """Return the failure rate of a component from the RAM
+        
+        Args:
+            componentSubType (str) : Sub-type of the component
+            componentType (str) : Type of the component (parent system)
+        
+        Returns:
+            tuple: failure rate (per year) and RAM metrics of the parent
+                system
+        
+        """
+        
+        key = (componentSubType, componentType)
+        
+        if key not in self._component_failure_rates:
+            self._component_failure_rates[key] = \
+                    self._get_component_failure_rate(componentSubType,
+                                                     componentType)
+        
+        return self._component_failure_rates[key]
+    
+    def _get_component_failure_rate(self, componentSubType, componentType):
+        
+        # Get sub-system metrics (all systems)
+        if componentSubType in ['Foundation', 'Moorings lines']:
+            metrics = self.get_subsystem_metrics('Station keeping')
+        else:
+            metrics = self.get_subsystem_metrics(componentSubType)
+        
+        if metrics is None:
+            
+            err_str = ("System type '{}' is not available in the "
+                       "RAM").format(componentSubType)
+            raise RuntimeError(err_str)
+        
+        # Get metric for (unique) parent system
+        system_metrics = metrics.loc[componentType]
+        base_failure_rate = system_metrics["lambda"] * 8766
+        
+        if componentSubType in ['Foundation', 'Moorings lines']:
+            
+            link_idx = system_metrics["Link"]
+            system = self._ram_network[link_idx]
+            
+            systemP = system.get_probability_proportion(componentSubType)
+            failureRate = base_failure_rate * systemP
+        
+        else:
+            
+            failureRate = base_failure_rate
+        
+        return failureRate, system_metrics
+
+
 class Array(object):
 
     def __init__(self, ram_network,
@@ -43,7 +145,11 @@ class Array(object):
                        simulationTimeDay,
                        eventsTableKeys,
                        NoPoisson_eventsTableKeys,
-                       printWP6):
+                       printWP6,
+                       random_state=None,
+                       failure_sampler=None,
+                       importance_factor=None,
+                       ram_metrics=None):
 
         '''__init__ function: Saves the arguments in internal variabels.
 
@@ -56,6 +162,20 @@ class Array(object):
                 keys of NoPoisson event table dataframe
             printWP6 (bool):
                 internal flag in order to print messages
+            random_state (numpy.random.RandomState, optional):
+                random number generator for the poisson process. Defaults to
+                the global numpy generator.
+            failure_sampler (StratifiedFailureSampler, optional):
+                sampler of the failure events of each failure mode. Defaults
+                to the poisson process.
+            importance_factor (float, optional):
+                factor applied to the failure rates of the array components
+                when sampling their failure events. The likelihood ratio of
+                the sampled events is available from get_likelihood_ratio.
+                Defaults to None (no factor).
+            ram_metrics (RAMMetrics, optional):
+                RAM metrics of ram_network, which may be shared between
+                Array objects. Defaults to a new RAMMetrics object.
 
         Attributes:
             self.__dtocean_maintenance_PRINT_FLAG (bool):
@@ -70,6 +190,16 @@ class Array(object):
             self.__eventsTableKeys (list of str): keys of event table dataframe
             self.__FM_ID_RA_ID (dictionary):
                 Id of defined repair actions between logistics and maintenance
+            self.__random_state (numpy.random.RandomState):
+                random number generator for the poisson process
+            self.__failure_sampler (StratifiedFailureSampler):
+                sampler of the failure events of each failure mode
+            self.__importance_factor (float):
+                factor applied to the failure rates of the array components
+            self.__logLikelihoodRatio (float):
+                log of the likelihood ratio of the sampled failure events
+            self.__ram_metrics (RAMMetrics):
+                RAM metrics of the sub-systems and components
 
         '''
 
@@ -119,32 +249,80 @@ class Array(object):
         # RAM Network object
         self.__ram_network = ram_network
         
-        # Pre-populate RAM metrics per sub-system type
-        self.__ram_subsystems = ['Export cable',
-                                 'Substation',
-                                 'Elec sub-system',
-                                 'Station keeping',
-                                 'Umbilical',
-                                 'Support structure',
-                                 'Hydrodynamic',
-                                 'Pto',
-                                 'Control']
+        # RAM metrics, derived when first used
+        if ram_metrics is None: ram_metrics = RAMMetrics(ram_network)
+        self.__ram_metrics = ram_metrics
         
         # Store poisson process function results
         self.__Poisson = None
         
-        def get_metrics_df(x):
-            metrics = ram_network.get_subsystem_metrics(x)
-            if metrics is None: return None
-            df = pd.DataFrame(metrics)
-            df = df.set_index("System")
-            return df
+        # Random number generator for the poisson process
+        self.__random_state = random_state
         
-        self.__ram_subsystem_metrics = {x: get_metrics_df(x)
-                                                for x in self.__ram_subsystems}
+        # Optional sampler for the failure events
+        self.__failure_sampler = failure_sampler
+        
+        # Importance sampling of the array component failures
+        self.__importance_factor = importance_factor
+        self.__logLikelihoodRatio = 0.
         
         return
     
+    def get_likelihood_ratio(self):
+        
+        '''get_likelihood_ratio function: Returns the ratio of the
+        probability of the failure events sampled by executeFEM under the
+        original failure rates to their probability under the sampled
+        failure rates. Equal to one unless an importance factor is set.
+
+        Returns:
+            float: likelihood ratio
+
+        '''
+        
+        return math.exp(self.__logLikelihoodRatio)
+    
+    def get_failure_rates(self, component, failureMode):
+        
+        '''get_failure_rates function: Returns the failure rates of the
+        failure modes of the components, as used by executeFEM.
+
+        Args:
+            component (dataframe):
+                table which contains the information about components
+            failureMode (dataframe):
+                table which contains the information about failure modes
+
+        Returns:
+            dict: failure rate (per year) for each failure mode, keyed by
+                component ID and failure mode index, e.g. "ID_1"
+
+        '''
+        
+        failureRates = {}
+        
+        for iCnt in range(0, component.shape[1]):
+            
+            column = component.columns.values[iCnt]
+            componentID = component[column]['Component_ID']
+            componentSubType = component[column]['Component_subtype']
+            componentType = component[column]['Component_type']
+            
+            componentRate, _ = self.__getComponentFailureRate(
+                                                            componentSubType,
+                                                            componentType)
+            
+            n_modes = component[componentID]['number_failure_modes']
+            
+            for iCnt1 in range(0, n_modes):
+                
+                strDummy = componentID + '_' + str(iCnt1 + 1)
+                failureRates[strDummy] = componentRate * \
+                                failureMode[strDummy]['mode_probability'] / \
+                                                                        100.0
+        
+        return failureRates
+    
     # Failure estimation module
     def executeFEM(self, arrayDict,
                          eventsTable,
@@ -173,6 +351,8 @@ class Array(object):
 
         '''
 
+        self.__logLikelihoodRatio = 0.
+
         # EventsTable (DataFrame)
         failureRateList = []
         failureEventsList = []
@@ -212,33 +392,10 @@ class Array(object):
             arrayDict[componentID]['CoBaMa_initOpEventsList'] = []
             arrayDict[componentID]['CoBaMa_FR List'] = []
             
-            # Get sub-system metrics (all systems)
-            if componentSubType in ['Foundation', 'Moorings lines']:
-                metrics = self.__ram_subsystem_metrics['Station keeping']
-            else:
-                metrics = self.__ram_subsystem_metrics[componentSubType]
-            
-            if metrics is None:
-                
-                err_str = ("System type '{}' is not available in the "
-                           "RAM").format(componentSubType)
-                raise RuntimeError(err_str)
-            
-            # Get metric for (unique) parent system
-            system_metrics = metrics.loc[componentType]
-            base_failure_rate = system_metrics["lambda"] * 8766
-            
-            if componentSubType in ['Foundation', 'Moorings lines']:
-                
-                link_idx = system_metrics["Link"]
-                system = self.__ram_network[link_idx]
-                
-                systemP = system.get_probability_proportion(componentSubType)
-                arrayDict[componentID]['FR'] = base_failure_rate * systemP
-            
-            else:
-                
-                arrayDict[componentID]['FR'] = base_failure_rate
+            (arrayDict[componentID]['FR'],
+             system_metrics) = self.__getComponentFailureRate(
+                                                            componentSubType,
+                                                            componentType)
             
             # Get breakdowns
             if componentType == "array":
@@ -355,7 +512,14 @@ class Array(object):
                     belongsToListNoPoisson.append('Array')
 
                 # failure rate from 1/year
-                self.__calcPoissonEvents(failureRate)
+                if componentType == "array":
+                    importanceFactor = self.__importance_factor
+                else:
+                    importanceFactor = None
+
+                self.__calcPoissonEvents(failureRate,
+                                         strDummy,
+                                         importanceFactor)
                 failureRateListNoPoisson.append(failureRate)
 
                 if self.__Poisson:
@@ -451,22 +615,68 @@ class Array(object):
 
         return arrayDict, eventsTable, eventsTableNoPoisson
 
-    def __calcPoissonEvents(self, failureRate):
+    def __getComponentFailureRate(self, componentSubType, componentType):
+
+        '''getComponentFailureRate function: Failure rate of a component
+        from the RAM
+
+        Args:
+            componentSubType (str) : Sub-type of the component
+            componentType (str) : Type of the component (parent system)
+
+        Returns:
+            tuple: failure rate (per year) and RAM metrics of the parent
+                system
+
+        '''
+
+        return self.__ram_metrics.get_component_failure_rate(
+                                                            componentSubType,
+                                                            componentType)
+
+    def __calcPoissonEvents(self, failureRate,
+                                  failureModeKey=None,
+                                  importanceFactor=None):
 
         '''calcPoissonEvents function: Calls the poisson process function
 
         Args:
             failureRate (float) : Failure rate of component (per year)
+            failureModeKey (str) : Unique identifier of the failure mode
+            importanceFactor (float) : Factor applied to the failure rate
+                                       for sampling
 
         '''
 
         rate_day = failureRate / self.__yearDays
+        
+        if importanceFactor is None:
+            sample_rate_day = rate_day
+        else:
+            sample_rate_day = rate_day * importanceFactor
 
-        returnValue = poisson_process(self.__startOperationDate,
-                                      self.__simulationTimeDay,
-                                      rate_day)
+        if self.__failure_sampler is None:
+            returnValue = poisson_process(self.__startOperationDate,
+                                          self.__simulationTimeDay,
+                                          sample_rate_day,
+                                          self.__random_state)
+        else:
+            returnValue = self.__failure_sampler(failureModeKey,
+                                                 self.__startOperationDate,
+                                                 self.__simulationTimeDay,
+                                                 sample_rate_day)
 
         if isinstance(returnValue, list) and len(returnValue) >= 1:
             self.__Poisson = returnValue
         else:
             self.__Poisson = []
+        
+        # (lambda / lambda') ** n * exp(-(lambda - lambda') * T), where n
+        # is the number of events drawn, before any are dropped by rounding
+        if importanceFactor is not None and rate_day > 0:
+            
+            n_events = getattr(returnValue, "n_events", len(self.__Poisson))
+            
+            self.__logLikelihoodRatio += (
+                    - n_events * math.log(importanceFactor) -
+                    (rate_day - sample_rate_day) * self.__simulationTimeDay)
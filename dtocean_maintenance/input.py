@@ -27,7 +27,12 @@ This module contains the classes used to collect and modify inputs
 """
 
 # Built in modules
+import math
 import logging
+from datetime import timedelta
+
+# Internal modules
+from .static import PortSelectionStore, get_parameter_records
 
 # Start logging
 module_logger = logging.getLogger(__name__)
@@ -322,13 +327,103 @@ class inputOM:
             keys:
                 checkNoSolution (bool) [-]: see below
                 curtailDevices (bool) [-]: shut down devices indefinitely
-                numberOfSimulations (int) [-]: Statistical population size
+                numberOfSimulations (int) [-]: Statistical population size.
+                    May be omitted if timeBudget is set
                 numberOfParallelActions (int) [-]:
                     Maximum number of operations that can be completed by one
                     vessel for calendar maintenance. Optional, defaults to 10
                 correctivePrepTime (float) [hour]:
                     time required to prepare vessels for corrective 
                     maintenance actions. Defaults to 48
+                numberOfProcesses (int) [-]:
+                    Number of worker processes used to evaluate the
+                    statistical population in parallel. Optional, defaults
+                    to 1 (serial execution)
+                sharedMemoryPath (str) [-]:
+                    Directory in which to create the memory mapped files used
+                    to share the metocean data with worker processes, e.g.
+                    /dev/shm. Optional, defaults to the system temporary
+                    directory
+                chunkTime (float) [s]:
+                    Target time to evaluate each chunk of data points sent to
+                    a worker process. Optional, defaults to 1
+                randomSeed (int) [-]:
+                    Master seed of the statistical population. Each data point
+                    uses a random number generator derived from this seed and
+                    its index. Optional, chosen randomly if not given
+                convergenceTolerance (float) [-]:
+                    If given, data points are added until the width of the
+                    confidence interval of the mean of the LCOE, availability
+                    and lifetime OPEX, relative to the mean, is less than this
+                    value. numberOfSimulations is then the maximum number of
+                    data points. Optional
+                convergenceConfidence (float) [-]:
+                    Confidence level of the convergence intervals. Optional,
+                    defaults to 0.95
+                convergenceMinPoints (int) [-]:
+                    Minimum number of data points evaluated before checking
+                    for convergence. Optional, defaults to 10
+                checkpointPath (str) [-]:
+                    Path to a file in which completed data points are saved.
+                    Optional, defaults to None (no checkpoint)
+                checkpointInterval (int) [-]:
+                    Number of data points between writes of the checkpoint
+                    file to disk. Optional, defaults to 1
+                checkpointResume (bool) [-]:
+                    If True, resume from the data points stored in the
+                    checkpoint file. Optional, defaults to False
+                keepEventTables (bool) [-]:
+                    If False, the event tables of each data point are
+                    discarded. Optional, defaults to True
+                eventTablesPath (str) [-]:
+                    Path to a directory in which the event tables of each data
+                    point are saved, rather than held in memory. Optional,
+                    defaults to None
+                workQueuePath (str) [-]:
+                    Path to a directory, which may be shared between hosts,
+                    used to distribute the data points to workers started
+                    with run_queue_worker. Optional, defaults to None
+                workQueuePollInterval (float) [s]:
+                    Time between checks of the work queue for results.
+                    Optional, defaults to 1
+                workQueueTimeout (float) [s]:
+                    Time after which a data point claimed by a worker is
+                    returned to the work queue. Optional, defaults to None
+                    (never)
+                timeBudget (float) [s]:
+                    Wall clock time available to evaluate the statistical
+                    population. No data point, or chunk of data points sent
+                    to a worker process, is started that is not expected to
+                    finish within the budget, based on the time measured for
+                    earlier ones. The budget is soft, as started data points
+                    are always completed. A sweep only keeps the data points
+                    completed for all of its scenarios. Optional, defaults
+                    to None
+                stratifiedSampling (bool) [-]:
+                    Stratify the number of failures of each failure mode of
+                    the array across the statistical population, using a
+                    scrambled low discrepancy sequence of the data point
+                    numbers. Optional, defaults to False
+                importanceSamplingFactor (float) [-]:
+                    Factor applied to the failure rates of the array level
+                    components (such as export cables and substations) when
+                    sampling their failures. Each data point is weighted by
+                    the likelihood ratio of its sampled failures, given in
+                    the "likelihoodRatio [-]" output, in the statistics.
+                    Optional, defaults to None (no importance sampling)
+                presampleFailures (int) [-]:
+                    Number of data points for which the failure events of
+                    all failure modes are presampled together, in one
+                    vectorised pass. Blocks are aligned to multiples of this
+                    size, and chunks sent to worker processes end at their
+                    boundaries. Ignored if stratifiedSampling is set.
+                    Optional, defaults to None (sample each data point
+                    separately)
+                portSelectionPath (str) [-]:
+                    Path to a directory in which the ports selected for
+                    inspection and repair operations are saved, so that
+                    later runs with the same inputs reuse them. Optional,
+                    defaults to None (ports are selected once per run)
                 
             Note:
 
@@ -501,3 +596,293 @@ class inputOM:
         '''
 
         return self.__Control_Param
+
+class PreparedModel(object):
+    
+    """Inputs of the O&M module, prepared once from an inputOM object and
+    shared, read only, by every LCOE_Calculator of a statistical population.
+    
+    The Component, Failure_Mode, Repair_Action and Inspection tables and the
+    arrayInfoLogistic table of Simu_Param are relabelled by component ID
+    (and failure mode index), as required by LCOE_Calculator. The relabelled
+    tables are copies, so the tables of inputOM are not modified. The
+    parameters of each component and failure mode are also compiled into
+    ParameterRecord objects, and the CAPEX of condition based maintenance
+    and the end of operation are derived. The ports selected for operations
+    are cached for all data points.
+    
+    The derived structures are built when first requested and must not be
+    modified. The object provides the same get methods as inputOM and can be
+    pickled.
+    
+    Args:
+        inputOMPtr (inputOM): inputs of the O&M module
+    
+    """
+    
+    # Days in one year
+    yearDays = 365.25
+    
+    def __init__(self, inputOMPtr):
+        
+        self._inputOMPtr = inputOMPtr
+        self._tables = None
+        self._records = None
+        self._simu_param = None
+        self._port_selection = {}
+        
+        return
+    
+    def get_Farm_OM(self):
+        return self._inputOMPtr.get_Farm_OM()
+    
+    def get_Component(self):
+        return self._get_tables()["Component"]
+    
+    def get_Failure_Mode(self):
+        return self._get_tables()["Failure_Mode"]
+    
+    def get_Repair_Action(self):
+        return self._get_tables()["Repair_Action"]
+    
+    def get_Inspection(self):
+        return self._get_tables()["Inspection"]
+    
+    def get_RAM_Param(self):
+        return self._inputOMPtr.get_RAM_Param()
+    
+    def get_Logistic_Param(self):
+        return self._inputOMPtr.get_Logistic_Param()
+    
+    def get_Simu_Param(self):
+        
+        """Return Simu_Param, with the arrayInfoLogistic table relabelled by
+        component ID"""
+        
+        if self._simu_param is None:
+            
+            simu_param = dict(self._inputOMPtr.get_Simu_Param())
+            simu_param['arrayInfoLogistic'] = self._get_tables()[
+                                                        "arrayInfoLogistic"]
+            self._simu_param = simu_param
+        
+        return self._simu_param
+    
+    def get_Control_Param(self):
+        return self._inputOMPtr.get_Control_Param()
+    
+    def get_records(self, table):
+        
+        """Return the parameters of each column of a relabelled table.
+        
+        Args:
+            table (str): one of "Component", "Failure_Mode", "Repair_Action"
+                or "Inspection"
+        
+        Returns:
+            dict: ParameterRecord for each component ID (Component) or
+                component ID and failure mode index, e.g. "ID_1"
+        
+        """
+        
+        if self._records is None:
+            
+            tables = self._get_tables()
+            self._records = {key: get_parameter_records(tables[key])
+                                    for key in ["Component",
+                                                "Failure_Mode",
+                                                "Repair_Action",
+                                                "Inspection"]}
+        
+        return self._records[table]
+    
+    def get_condition_capex(self):
+        
+        """Return the CAPEX of the array for condition based maintenance,
+        which is zero if the strategy is not used.
+        
+        Returns:
+            float: CAPEX [Euro]
+        
+        """
+        
+        capex = 0
+        
+        if self.get_Farm_OM()['condition_based_maintenance'] != True:
+            return capex
+        
+        records = self.get_records("Failure_Mode")
+        
+        for column in self.get_Failure_Mode().columns.values:
+            
+            capex_condition = records[column][
+                                        'CAPEX_condition_based_maintenance']
+            
+            if not math.isnan(capex_condition) and capex_condition > 0:
+                capex = capex + capex_condition
+        
+        return capex
+    
+    def get_operation_time_day(self):
+        
+        """Return the duration of operation of the array [day]"""
+        
+        return self.get_Simu_Param()['missionTime'] * self.yearDays
+    
+    def get_end_operation_date(self):
+        
+        """Return the end date of operation of the array"""
+        
+        start_date = self.get_Simu_Param()['startOperationDate']
+        
+        return start_date + timedelta(days=self.get_operation_time_day())
+    
+    def get_port_selection(self, spare_dimensions, select_ports):
+        
+        """Return the ports selected for operations, given the largest spare
+        parts. The selection is made by calling select_ports, once for the
+        given dimensions. If the portSelectionPath control parameter is set,
+        selections are also saved to and loaded from that directory, keyed
+        by a hash of the dimensions, entry point and ports.
+        
+        Args:
+            spare_dimensions (tuple): largest dry mass [kg], length [m],
+                width [m] and height [m] of the spare parts
+            select_ports (function): function without arguments returning
+                the port selection
+        
+        Returns:
+            dict: port selection returned by select_ports
+        
+        """
+        
+        if spare_dimensions in self._port_selection:
+            return self._port_selection[spare_dimensions]
+        
+        path = self.get_Control_Param().get('portSelectionPath')
+        
+        if path is None:
+            
+            selection = select_ports()
+        
+        else:
+            
+            logistic_param = self.get_Logistic_Param()
+            store = PortSelectionStore(path)
+            key = store.get_key(spare_dimensions,
+                                logistic_param['entry_point'],
+                                logistic_param['ports'])
+            
+            if key in store:
+                selection = store[key]
+            else:
+                selection = select_ports()
+                store[key] = selection
+        
+        self._port_selection[spare_dimensions] = selection
+        
+        return selection
+    
+    def _get_tables(self):
+        
+        if self._tables is None:
+            self._tables = _get_relabelled_tables(self._inputOMPtr)
+        
+        return self._tables
+
+
+def _get_relabelled_tables(inputOMPtr):
+    
+    """Return copies of the Component, Failure_Mode, Repair_Action,
+    Inspection and arrayInfoLogistic tables with their columns labelled by
+    component ID, or by component ID and failure mode index"""
+    
+    Component = inputOMPtr.get_Component()
+    Failure_Mode = inputOMPtr.get_Failure_Mode()
+    Repair_Action = inputOMPtr.get_Repair_Action()
+    Inspection = inputOMPtr.get_Inspection()
+    arrayInfoLogistic = inputOMPtr.get_Simu_Param()['arrayInfoLogistic']
+    
+    # Component -> Component_ID
+    # Component
+    col_map = dict(zip(Component.columns,
+                       list(Component.loc['Component_ID'])))
+
+    Component = Component.rename(columns=col_map)
+
+    # Component -> Component_ID
+    # Simu_Param
+    components = arrayInfoLogistic.loc['Component_ID']
+    col_map = dict(zip(arrayInfoLogistic.columns,
+                       list(components)))
+
+    arrayInfoLogistic = arrayInfoLogistic.rename(columns=col_map)
+
+    # The first Repair_Action and Inspection column of each component ID and
+    # failure mode ID pair
+    idListRA = list(Repair_Action.loc['Component_ID'])
+    fmListRA = list(Repair_Action.loc['FM_ID'])
+    newColumnsRA = ['dummy'] * len(idListRA)
+    indexRA = _get_first_index(zip(idListRA, fmListRA))
+
+    idListInsp = list(Inspection.loc['Component_ID'])
+    fmListInsp = list(Inspection.loc['FM_ID'])
+    newColumnsInsp = ['dummy'] * len(idListInsp)
+    indexInsp = _get_first_index(zip(idListInsp, fmListInsp))
+
+    # Failure_Mode columns are numbered in order for each component ID.
+    # Numbers count the earlier labels whose first "_" separated part
+    # matches the component ID
+    idList = list(Failure_Mode.loc['Component_ID'])
+    fmList = list(Failure_Mode.loc['FM_ID'])
+    prefixCount = {}
+    newColumns = []
+
+    for componentID, failureModeID in zip(idList, fmList):
+
+        index = prefixCount.get(componentID, 0)
+        newColumn = componentID + '_' + str(index + 1)
+        newColumns.append(newColumn)
+
+        prefix = newColumn.split('_')[0]
+        prefixCount[prefix] = prefixCount.get(prefix, 0) + 1
+
+        key = (componentID, failureModeID)
+
+        if key in indexRA:
+            newColumnsRA[indexRA[key]] = newColumn
+
+        if key in indexInsp:
+            newColumnsInsp[indexInsp[key]] = newColumn
+
+    # Failure_Mode
+    col_map = dict(zip(Failure_Mode.columns, newColumns))
+    Failure_Mode = Failure_Mode.rename(columns=col_map)
+
+    # Repair_Action
+    col_map = dict(zip(Repair_Action.columns, newColumnsRA))
+    Repair_Action = Repair_Action.rename(columns=col_map)
+
+    # Inspection
+    col_map = dict(zip(Inspection.columns, newColumnsInsp))
+    Inspection = Inspection.rename(columns=col_map)
+    
+    tables = {"Component": Component,
+              "Failure_Mode": Failure_Mode,
+              "Repair_Action": Repair_Action,
+              "Inspection": Inspection,
+              "arrayInfoLogistic": arrayInfoLogistic}
+    
+    return tables
+
+
+def _get_first_index(keys):
+    
+    """Return the index of the first occurrence of each key"""
+    
+    first_index = {}
+    
+    for i, key in enumerate(keys):
+        if key not in first_index: first_index[key] = i
+    
+    return first_index
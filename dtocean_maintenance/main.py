@@ -26,13 +26,24 @@
 """
 
 # Standard modules
+import os
+import sys
 import copy
 import math
-import string
+import numbers
+import itertools
+import collections
+import time
 import timeit
 import logging
+import pickle
+import shutil
+import hashlib
 import datetime
+import tempfile
+import weakref
 from datetime import timedelta
+from multiprocessing import Pool, cpu_count
 
 # 3rd party modules
 import numpy as np
@@ -51,17 +62,30 @@ from dtocean_logistics.selection.match import compatibility_ve
 from dtocean_reliability import Network, SubNetwork
 
 # Internal modules
-from .array import Array
+from .array import Array, RAMMetrics
+from .input import inputOM, PreparedModel
 from .logistics import Logistics
 from .static import (Availability,
+                     Checkpoint,
+                     DataPointAccumulator,
                      Energy,
+                     EventTablesStore,
+                     FailureTimelines,
+                     FileWorkQueue,
                      df_fast_sort,
                      get_uptime_df,
                      get_device_energy_df,
                      get_opex_per_year,
                      get_opex_lcoe,
                      get_number_of_journeys,
-                     poisson_process)
+                     get_data_point_random_state,
+                     get_summary_df,
+                     poisson_process,
+                     ProgressReport,
+                     ResultBlock,
+                     SharedFrame,
+                     StratifiedFailureSampler,
+                     SummaryStatistics)
 
 # Set up logging
 module_logger = logging.getLogger(__name__)
@@ -71,17 +95,105 @@ class LCOE_Statistics(object):
     
     """Calculate statistical results of O&M calculations
     
+    Each data point draws its failure events from an independent random
+    number generator, derived from a master seed and the index of the data
+    point. The master seed is read from the randomSeed control parameter or,
+    if not given, is chosen randomly and logged, so that any run can be
+    reproduced.
+    
+    If the convergenceTolerance control parameter is set, data points are
+    added until the relative width of the confidence interval of the mean of
+    each of the convergence metrics is below the tolerance. The
+    numberOfSimulations control parameter then sets the maximum number of
+    data points.
+    
+    Progress callbacks, registered with add_progress_callback, are called
+    with a ProgressReport after each data point. A run can be stopped
+    between data points by calling cancel, for instance from a callback or
+    another thread, in which case the partial population is returned.
+    
+    If the timeBudget control parameter is set, data points, or chunks of
+    data points sent to a worker process, are only started if the time
+    measured for earlier ones suggests they will finish within the budget.
+    numberOfSimulations may then be omitted, to evaluate as many data points
+    as the budget allows. The budget is soft: data points already started
+    are always completed, so a run may overshoot if they take longer than
+    expected, and the first data point of each worker is started before
+    any timing is available. The number of data points achieved is logged
+    and returned by get_n_data_points.
+    
     Args:
         inputOMPtr (class): pointer of class inputOM
+        engine (StatisticsEngine, optional): persistent worker processes
+            used to evaluate the data points. Defaults to None
 
     Attributes:
         self.__inputOMPTR (class): Instance pointer of inputOM
+        self.__engine (StatisticsEngine): Persistent worker processes
+        self.__master_seed (int): Seed of the statistical population
+        self.__progress_callbacks (list): Functions called with the progress
+            of the run
+        self.__cancel_requested (bool): Stop the run at the next data point
+        self.__cancelled (bool): The last run was cancelled
+        self.__n_data_points (int): Number of data points in the last run
     """
-
-    def __init__(self, inputOMPtr):
+    
+    # Metrics checked for convergence
+    convergence_metrics = ["LCOEOpex [Euro/kWh]",
+                           "arrayAvailability [-]",
+                           "lifetimeOpex [Euro]"]
+    
+    # Component parameters which may be varied by a scenario of sweep
+    scenario_component_keys = ["start_date_calendar_based_maintenance",
+                               "end_date_calendar_based_maintenance",
+                               "interval_calendar_based_maintenance",
+                               "start_date_condition_based_maintenance",
+                               "end_date_condition_based_maintenance",
+                               "soh_threshold"]
+    
+    # Control parameters which apply to a whole sweep, so may not be varied
+    # by a scenario
+    sweep_control_keys = ["numberOfSimulations",
+                          "numberOfProcesses",
+                          "sharedMemoryPath",
+                          "chunkTime",
+                          "randomSeed",
+                          "convergenceTolerance",
+                          "convergenceConfidence",
+                          "convergenceMinPoints",
+                          "checkpointPath",
+                          "checkpointInterval",
+                          "checkpointResume",
+                          "keepEventTables",
+                          "eventTablesPath",
+                          "workQueuePath",
+                          "workQueuePollInterval",
+                          "workQueueTimeout",
+                          "timeBudget"]
+
+    def __init__(self, inputOMPtr, engine=None):
 
         # Instance pointer of inputOM
         self.__inputOMPtr = inputOMPtr
+        self.__engine = engine
+        
+        control_param = inputOMPtr.get_Control_Param()
+        
+        if ("randomSeed" in control_param and
+            control_param["randomSeed"] is not None):
+            
+            master_seed = control_param["randomSeed"]
+        
+        else:
+            
+            master_seed = np.random.RandomState().randint(0, 2 ** 31 - 1)
+        
+        self.__master_seed = None
+        self.__progress_callbacks = []
+        self.__cancel_requested = False
+        self.__cancelled = False
+        self.__n_data_points = 0
+        self.set_master_seed(master_seed)
 
         return
 
@@ -96,143 +208,2287 @@ class LCOE_Statistics(object):
 
         output_dict = self.main()
             
-        return output_dict
-
-    def main(self):
-
-        '''Calls LCOE_Calculator for the calculation of of O&M plan for the
-        required population size and accumulates the results.
+        return output_dict
+    
+    def get_master_seed(self):
+        
+        """Return the seed of the statistical population
+        
+        Returns:
+            int: master seed
+        
+        """
+        
+        return self.__master_seed
+    
+    def set_master_seed(self, master_seed):
+        
+        """Set the seed of the statistical population
+        
+        Args:
+            master_seed (int): master seed
+        
+        """
+        
+        master_seed = int(master_seed)
+        
+        if master_seed < 0:
+            
+            errMsg = ("The master seed must be a non-negative integer; "
+                      "however, it is set to {}").format(master_seed)
+            raise ValueError(errMsg)
+        
+        msg = ('Master seed of statistical population set to '
+               '{}').format(master_seed)
+        module_logger.info(msg)
+        
+        self.__master_seed = master_seed
+        
+        return
+    
+    def add_progress_callback(self, callback):
+        
+        """Register a function to be called after each data point
+        
+        Args:
+            callback (function): function taking a single ProgressReport
+                argument
+        
+        """
+        
+        self.__progress_callbacks.append(callback)
+        
+        return
+    
+    def remove_progress_callback(self, callback):
+        
+        """Remove a registered progress callback
+        
+        Args:
+            callback (function): registered function
+        
+        """
+        
+        self.__progress_callbacks.remove(callback)
+        
+        return
+    
+    def cancel(self):
+        
+        """Stop the current run once the data point in progress is complete.
+        The data points evaluated so far are returned as the population. If
+        no run is in progress, the next run is stopped before it evaluates
+        any data points."""
+        
+        self.__cancel_requested = True
+        
+        return
+    
+    def is_cancelled(self):
+        
+        """Return True if the current or next run has been cancelled, or the
+        last run was stopped by cancellation"""
+        
+        return self.__cancel_requested or self.__cancelled
+    
+    def get_n_data_points(self):
+        
+        """Return the number of data points in the population of the last
+        run, which may be fewer than numberOfSimulations if the run
+        converged, was cancelled or reached its time budget
+        
+        Returns:
+            int: number of data points
+        
+        """
+        
+        return self.__n_data_points
+    
+    def get_random_state(self, sim_number):
+        
+        """Return the random number generator of a data point
+        
+        Args:
+            sim_number (int): index of the data point
+        
+        Returns:
+            numpy.random.RandomState: data point random number generator
+        
+        """
+        
+        return get_data_point_random_state(self.__master_seed, sim_number)
+
+    def main(self):
+
+        '''Calls LCOE_Calculator for the calculation of of O&M plan for the
+        required population size and accumulates the results.
+        
+        If the numberOfProcesses control parameter is greater than one, the
+        data points are shared between a pool of worker processes. The
+        results are collected in data point order, so the output is arranged
+        identically to a serial run. The metocean data is written once to
+        memory mapped files, which the workers attach to without copying.
+        Data points are sent to the workers in chunks, sized adaptively to
+        take about chunkTime seconds each.
+        
+        To limit memory use, the event tables of each data point can be
+        discarded, by setting the keepEventTables control parameter to False,
+        or saved to disk, by setting the eventTablesPath control parameter.
+        In the latter case, the eventTables [-] output is an EventTablesStore
+        which loads the tables of each data point on access.
+
+        Returns:
+            output_dict (dict): Output of WP6
+
+        '''
+        
+        control_param = self.__inputOMPtr.get_Control_Param()
+        events_tables_path = _get_optional_param(control_param,
+                                                 "eventTablesPath")
+        
+        accumulator = self._get_accumulator(events_tables_path)
+        
+        # The blocks of results are added without rebuilding the output of
+        # each data point
+        for block, index, _ in self._iter_blocks():
+            accumulator.add_block(block, [index])
+            
+        output_dict = accumulator.get_output_dict()
+                    
+        return output_dict
+    
+    def compare_strategies(self, strategies, baseline):
+        
+        '''Evaluate alternative O&M strategies using common random numbers.
+        
+        Each strategy is defined by a dictionary of values which replace
+        those of the Farm_OM parameter, e.g. {"calendar_based_maintenance":
+        True}. Every strategy uses the master seed of this object, so data
+        point i of each strategy is subject to the same failure events. The
+        failure timelines are drawn by Array.executeFEM before any strategy
+        dependent draws, such as those of condition based maintenance, so
+        they are identical for all strategies.
+        
+        The strategies are evaluated in lockstep, sharing a single pool of
+        worker processes as for sweep, and the difference between the
+        metrics of each strategy and the baseline are recorded for each
+        data point. As the failure events are shared, these paired
+        differences converge with far fewer data points than independent
+        populations. If the convergenceTolerance control parameter is set,
+        it is applied to the paired differences of all the strategies,
+        rather than to each population. As the mean difference of near
+        equivalent strategies is close to zero, the width of the confidence
+        interval of each mean difference is taken relative to the mean of
+        the baseline metric, rather than to the difference itself.
+        
+        The timeBudget control parameter, cancel and the progress callbacks
+        apply to the comparison as a whole. The progress reports hold the
+        running summary of the metrics of the baseline.
+        
+        Args:
+            strategies (dict): Farm_OM values to replace, keyed by strategy
+                name
+            baseline (str): name of the strategy from which differences
+                are calculated
+        
+        Returns:
+            dict: output of main for each strategy, keyed by strategy name.
+                For all but the baseline, the outputs include the extra keys
+                "PairedDifferenceTable [-]", holding the difference of each
+                metric from the baseline for each data point, and
+                "PairedDifferenceSummary [-]", summarising those differences
+        
+        '''
+        
+        if baseline not in strategies:
+            
+            errMsg = ("Baseline strategy '{}' is not one of the given "
+                      "strategies").format(baseline)
+            raise ValueError(errMsg)
+        
+        control_param = self.__inputOMPtr.get_Control_Param()
+        
+        n_sims, time_budget = self._get_population_size(control_param)
+        tolerance = _get_optional_param(control_param,
+                                        "convergenceTolerance")
+        confidence = _get_optional_param(control_param,
+                                         "convergenceConfidence",
+                                         0.95)
+        min_points = _get_optional_param(control_param,
+                                         "convergenceMinPoints",
+                                         10)
+        events_tables_path = _get_optional_param(control_param,
+                                                 "eventTablesPath")
+        weighted = _get_optional_param(control_param,
+                                       "importanceSamplingFactor") is not None
+        
+        names = [baseline] + sorted(name for name in strategies
+                                                        if name != baseline)
+        inputOMPtrs = []
+        accumulators = {}
+        differences = {}
+        baseline_summaries = {key: SummaryStatistics(weighted=weighted)
+                                for key in DataPointAccumulator.metric_keys}
+        
+        for name in names:
+            
+            inputOMPtr = self._get_scenario_input(
+                                            {"Farm_OM": strategies[name]})
+            inputOMPtrs.append(inputOMPtr)
+            
+            if events_tables_path is None:
+                path = None
+            else:
+                path = os.path.join(events_tables_path, str(name))
+            
+            accumulators[name] = self._get_accumulator(path, inputOMPtr)
+            
+            if name == baseline: continue
+            
+            differences[name] = {key: SummaryStatistics(weighted=weighted)
+                                for key in DataPointAccumulator.metric_keys}
+        
+        start_time = timeit.default_timer()
+        n_complete = 0
+        points = self._iter_scenarios(inputOMPtrs, n_sims, time_budget)
+        
+        try:
+            
+            for sim_number, sim_points in points:
+                
+                baseline_block, baseline_index = sim_points[0]
+                baseline_metrics = baseline_block.get_metrics(baseline_index)
+                weight = baseline_metrics.get("likelihoodRatio [-]", 1.)
+                
+                for key, summary in baseline_summaries.items():
+                    summary.add(baseline_metrics[key], weight)
+                
+                for name, (block, index) in zip(names, sim_points):
+                    
+                    accumulators[name].add_block(block, [index])
+                    
+                    if name == baseline: continue
+                    
+                    metrics = block.get_metrics(index)
+                    
+                    for key, moment in differences[name].items():
+                        moment.add(metrics[key] - baseline_metrics[key],
+                                   weight)
+                
+                n_complete += 1
+                
+                self._report_progress(n_complete,
+                                      n_sims,
+                                      n_complete,
+                                      timeit.default_timer() - start_time,
+                                      time_budget,
+                                      get_summary_df(baseline_summaries))
+                
+                if tolerance is None: continue
+                
+                if all(self._is_difference_converged(moments,
+                                                     baseline_summaries,
+                                                     tolerance,
+                                                     confidence,
+                                                     min_points)
+                                       for moments in differences.values()):
+                    
+                    msg = ('Paired differences of strategies converged after '
+                           '{} data points').format(sim_number + 1)
+                    module_logger.info(msg)
+                    
+                    break
+        
+        finally:
+            
+            points.close()
+        
+        output_dicts = {name: accumulators[name].get_output_dict()
+                                                            for name in names}
+        baseline_df = output_dicts[baseline]["MetricsTable [-]"]
+        
+        for name in names[1:]:
+            
+            output_dict = output_dicts[name]
+            difference_df = output_dict["MetricsTable [-]"] - baseline_df
+            
+            if "likelihoodRatio [-]" in baseline_df:
+                difference_df["likelihoodRatio [-]"] = \
+                                            baseline_df["likelihoodRatio [-]"]
+            
+            output_dict["PairedDifferenceTable [-]"] = difference_df
+            output_dict["PairedDifferenceSummary [-]"] = get_summary_df(
+                                                            differences[name])
+        
+        return output_dicts
+    
+    def sweep(self, scenarios):
+        
+        '''Evaluate a list of scenarios, each defined by overrides of the
+        inputs of this object, in a single group of processes.
+        
+        Each scenario is a dictionary with optional keys "Farm_OM",
+        "Component" and "Control_Param", as listed below. The WaitingTime,
+        RAM network and Logistics objects are built once and shared by all
+        the scenarios. As the Logistics object caches logistic phases which
+        depend on the helideck setting, it is only shared between scenarios
+        with equal values of Farm_OM['helideck'].
+        
+        All scenarios use the master seed of this object, so they are subject
+        to the same failure events at each data point. Convergence checking
+        and checkpoints are not used, so numberOfSimulations data points are
+        evaluated for each scenario, unless the timeBudget control parameter
+        stops the evaluation sooner. Data points are only kept if they are
+        complete for every scenario, so all the scenarios have the same size.
+        If the numberOfProcesses control parameter is greater than one, the
+        data points of all the scenarios are shared between a single pool of
+        worker processes. A sweep can be stopped by calling cancel.
+        
+        Args:
+            scenarios (list): dictionaries of overrides, with keys:
+                Farm_OM (dict): Farm_OM values to replace
+                Component (dict): rows of the Component table to replace,
+                    restricted to scenario_component_keys. Values are either
+                    applied to every component or given as a dictionary
+                    keyed by component
+                Control_Param (dict): Control_Param values to replace,
+                    other than sweep_control_keys, which apply to the whole
+                    sweep
+        
+        Returns:
+            list: output of main for each scenario
+        
+        '''
+        
+        control_param = self.__inputOMPtr.get_Control_Param()
+        
+        n_sims, time_budget = self._get_population_size(control_param)
+        events_tables_path = _get_optional_param(control_param,
+                                                 "eventTablesPath")
+        
+        inputOMPtrs = [self._get_scenario_input(overrides)
+                                                for overrides in scenarios]
+        
+        if not inputOMPtrs: return []
+        
+        accumulators = []
+        
+        for i in xrange(len(inputOMPtrs)):
+            
+            if events_tables_path is None:
+                path = None
+            else:
+                path = os.path.join(events_tables_path, str(i))
+            
+            accumulators.append(self._get_accumulator(path,
+                                                      inputOMPtrs[i]))
+        
+        for _, sim_points in self._iter_scenarios(inputOMPtrs,
+                                                  n_sims,
+                                                  time_budget):
+            
+            for accumulator, (block, index) in zip(accumulators, sim_points):
+                accumulator.add_block(block, [index])
+        
+        output_dicts = [accumulator.get_output_dict()
+                                            for accumulator in accumulators]
+        
+        return output_dicts
+    
+    def _iter_scenarios(self, inputOMPtrs, n_sims, time_budget=None):
+        
+        """Evaluate the data points of several scenarios with the master seed
+        of this object, sharing a single pool of worker processes, and yield
+        them in order. Each data point is only yielded once it is complete
+        for every scenario, as its index and a list of the (ResultBlock,
+        position) pairs holding it for each scenario. If a work queue is set,
+        each scenario is submitted as its own run. The evaluation stops early
+        if it reaches the time budget or is cancelled."""
+        
+        control_param = self.__inputOMPtr.get_Control_Param()
+        
+        keep_events_tables = _get_optional_param(control_param,
+                                                 "keepEventTables",
+                                                 True)
+        work_queue_path = _get_optional_param(control_param,
+                                              "workQueuePath")
+        
+        n_scenarios = len(inputOMPtrs)
+        
+        if (work_queue_path is not None and
+            _get_optional_param(control_param,
+                                'numberOfSimulations') is None):
+            
+            errMsg = ("Parameter numberOfSimulations must be set when "
+                      "using a work queue")
+            raise ValueError(errMsg)
+        
+        self.__cancelled = False
+        self.__n_data_points = 0
+        
+        if self.__cancel_requested:
+            
+            self.__cancel_requested = False
+            self.__cancelled = True
+            module_logger.info('Scenarios cancelled before any data points')
+            
+            return
+        
+        # Keep the number of tasks within the limits of a sequence
+        n_sims = min(n_sims, sys.maxint // n_scenarios)
+        tasks = _SweepTasks(n_scenarios, n_sims)
+        
+        n_processes = min(_get_optional_param(control_param,
+                                              "numberOfProcesses",
+                                              1),
+                          len(tasks))
+        
+        if time_budget is None:
+            msg = ('Executing {} scenarios of {} data points').format(
+                                                                n_scenarios,
+                                                                n_sims)
+        else:
+            msg = ('Executing {} scenarios with a time budget of {} '
+                   'seconds').format(n_scenarios, time_budget)
+        
+        module_logger.info(msg)
+        
+        if time_budget is not None:
+            deadline = timeit.default_timer() + time_budget
+        else:
+            deadline = None
+        
+        pool = None
+        shared_metocean = None
+        generators = []
+        
+        if work_queue_path is not None:
+            
+            generators = [LCOE_Statistics(inputOMPtr)._iter_evaluated(
+                                                            xrange(n_sims),
+                                                            deadline)
+                                                for inputOMPtr in inputOMPtrs]
+            blocks = (block for sim_blocks in itertools.izip(*generators)
+                                                for block in sim_blocks)
+        
+        elif n_processes > 1:
+            
+            broadcast_inputs = []
+            
+            # All the scenarios share the same metocean data
+            for inputOMPtr in inputOMPtrs:
+                
+                (broadcast_input,
+                 shared_metocean) = _get_broadcast_input(inputOMPtr,
+                                                         shared_metocean)
+                broadcast_inputs.append(broadcast_input)
+            
+            pool = Pool(processes=n_processes,
+                        initializer=_init_sweep_worker,
+                        initargs=(broadcast_inputs, self.__master_seed))
+            blocks = _iter_pool_chunks(pool,
+                                       tasks,
+                                       n_processes,
+                                       control_param,
+                                       deadline)
+        
+        else:
+            
+            runner = _SweepRunner(inputOMPtrs, self.__master_seed)
+            data_points = _iter_serial(runner, tasks, deadline)
+            blocks = (ResultBlock([sim_number],
+                                  [data_point],
+                                  keep_events_tables)
+                        for (_, sim_number), data_point in itertools.izip(
+                                                                tasks,
+                                                                data_points))
+        
+        try:
+            
+            sim_points = []
+            
+            for block in blocks:
+                
+                for index in xrange(len(block)):
+                    
+                    # Hold the data points of each index until every
+                    # scenario is complete, so the time budget can not leave
+                    # them uneven
+                    sim_points.append((block, index))
+                    
+                    if len(sim_points) < n_scenarios: continue
+                    
+                    self.__n_data_points += 1
+                    
+                    yield block.sim_numbers[index], sim_points
+                    
+                    sim_points = []
+                    
+                    if self.__cancel_requested:
+                        
+                        self.__cancelled = True
+                        
+                        msg = ('Scenarios cancelled after {} data '
+                               'points').format(self.__n_data_points)
+                        module_logger.info(msg)
+                        
+                        return
+            
+            if time_budget is not None and self.__n_data_points < n_sims:
+                
+                msg = ('Time budget of {} seconds reached after {} data '
+                       'points').format(time_budget, self.__n_data_points)
+                module_logger.info(msg)
+        
+        finally:
+            
+            # A cancellation only applies to one run
+            self.__cancel_requested = False
+            
+            for generator in generators:
+                generator.close()
+            
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            
+            if shared_metocean is not None:
+                shared_metocean.remove()
+    
+    def _get_accumulator(self, events_tables_path=None, inputOMPtr=None):
+        
+        """Return a DataPointAccumulator configured by the control
+        parameters, of the given inputs, if set"""
+        
+        if inputOMPtr is None: inputOMPtr = self.__inputOMPtr
+        
+        control_param = inputOMPtr.get_Control_Param()
+        
+        keep_events_tables = _get_optional_param(control_param,
+                                                 "keepEventTables",
+                                                 True)
+        
+        if events_tables_path is None:
+            events_tables = None
+        else:
+            events_tables = EventTablesStore(events_tables_path)
+        
+        # Storage grows as required, so start small if the population size
+        # is limited by a time budget
+        n_sims = _get_optional_param(control_param, 'numberOfSimulations')
+        
+        if _get_optional_param(control_param, "timeBudget") is not None:
+            n_sims = min(n_sims, 100) if n_sims is not None else 100
+        
+        weighted = _get_optional_param(control_param,
+                                       "importanceSamplingFactor") is not None
+        
+        accumulator = DataPointAccumulator(n_sims,
+                                           keep_events_tables,
+                                           events_tables,
+                                           weighted)
+        
+        return accumulator
+    
+    def _get_scenario_input(self, overrides):
+        
+        """Return a copy of the inputs with the given overrides and the master
+        seed of this object. See sweep for the format of the overrides."""
+        
+        for section in overrides:
+            
+            if section not in ["Farm_OM", "Component", "Control_Param"]:
+                
+                errMsg = ("Scenario overrides may only contain the keys "
+                          "Farm_OM, Component and Control_Param, not "
+                          "'{}'").format(section)
+                raise ValueError(errMsg)
+        
+        farm_om = dict(self.__inputOMPtr.get_Farm_OM())
+        
+        for key, value in overrides.get("Farm_OM", {}).items():
+            
+            if key not in farm_om:
+                
+                errMsg = ("Scenario parameter '{}' is not a member of "
+                          "Farm_OM").format(key)
+                raise ValueError(errMsg)
+            
+            farm_om[key] = value
+        
+        component = self.__inputOMPtr.get_Component()
+        component_values = overrides.get("Component", {})
+        
+        if component_values: component = component.copy()
+        
+        for key, value in component_values.items():
+            
+            if key not in self.scenario_component_keys:
+                
+                errMsg = ("Component parameter '{}' can not be varied by a "
+                          "scenario").format(key)
+                raise ValueError(errMsg)
+            
+            if not isinstance(value, dict):
+                component.loc[key, :] = value
+                continue
+            
+            for component_id, component_value in value.items():
+                
+                if component_id not in component.columns:
+                    
+                    errMsg = ("Scenario component '{}' is not a member of "
+                              "the Component table").format(component_id)
+                    raise ValueError(errMsg)
+                
+                component.loc[key, component_id] = component_value
+        
+        control_values = overrides.get("Control_Param", {})
+        
+        for key in control_values:
+            
+            if key in self.sweep_control_keys:
+                
+                errMsg = ("Control parameter '{}' applies to the whole sweep, "
+                          "so can not be varied by a scenario").format(key)
+                raise ValueError(errMsg)
+        
+        # Convergence is not checked and the checkpoint file can not be
+        # shared
+        control_param = dict(self.__inputOMPtr.get_Control_Param())
+        control_param.update(control_values)
+        control_param["randomSeed"] = self.__master_seed
+        control_param["convergenceTolerance"] = None
+        control_param["checkpointPath"] = None
+        control_param["checkpointResume"] = None
+        
+        scenario_input = inputOM(farm_om,
+                                 component,
+                                 self.__inputOMPtr.get_Failure_Mode(),
+                                 self.__inputOMPtr.get_Repair_Action(),
+                                 self.__inputOMPtr.get_Inspection(),
+                                 self.__inputOMPtr.get_RAM_Param(),
+                                 self.__inputOMPtr.get_Logistic_Param(),
+                                 self.__inputOMPtr.get_Simu_Param(),
+                                 control_param)
+        
+        return scenario_input
+    
+    def iter_data_points(self):
+        
+        '''Generate the data points of the statistical population, yielding
+        each one as soon as it is complete. No data points are retained by
+        the generator, so the caller controls the memory used. If iteration
+        is abandoned early, the generator should be closed to stop any worker
+        processes.
+        
+        If the checkpointPath control parameter is set, completed data points
+        are saved to the given file. If checkpointResume is also True, the
+        data points stored in the file are yielded first, and the master seed
+        of the checkpoint is restored, so that the remaining data points
+        match an uninterrupted run. A checkpoint is only resumed if its
+        inputs, other than the control parameters which do not change the
+        data points, and numberOfSimulations match those of the run.
+        
+        Yields:
+            tuple: index of the data point (int), output of LCOE_Calculator
+                (dict) and running summary of the metrics of all data points
+                yielded so far (DataFrame with columns "count", "mean",
+                "std", "P10", "P50" and "P90")
+        
+        '''
+        
+        blocks = self._iter_blocks()
+        
+        try:
+            for block, index, summary in blocks:
+                yield (block.sim_numbers[index],
+                       block.get_data_point(index),
+                       summary)
+        finally:
+            blocks.close()
+    
+    def _iter_blocks(self):
+        
+        """Generate the data points of the statistical population, as for
+        iter_data_points, yielding the ResultBlock holding each data point,
+        its position within the block and the running summary"""
+
+        control_param = self.__inputOMPtr.get_Control_Param()
+
+        # Population size and time budget
+        n_sims, time_budget = self._get_population_size(control_param)
+        checkpoint_n_sims = _get_optional_param(control_param,
+                                                'numberOfSimulations')
+        
+        if (checkpoint_n_sims is None and
+            _get_optional_param(control_param, "workQueuePath") is not None):
+            
+            errMsg = ("Parameter numberOfSimulations must be set when "
+                      "using a work queue")
+            raise ValueError(errMsg)
+        
+        # Adaptive convergence settings
+        tolerance = _get_optional_param(control_param,
+                                        "convergenceTolerance")
+        confidence = _get_optional_param(control_param,
+                                         "convergenceConfidence",
+                                         0.95)
+        min_points = _get_optional_param(control_param,
+                                         "convergenceMinPoints",
+                                         10)
+        
+        # Checkpoint settings
+        checkpoint_path = _get_optional_param(control_param,
+                                              "checkpointPath")
+        checkpoint_interval = _get_optional_param(control_param,
+                                                  "checkpointInterval",
+                                                  1)
+        checkpoint_resume = _get_optional_param(control_param,
+                                                "checkpointResume",
+                                                False)
+        
+        checkpoint = None
+        completed = []
+        
+        if checkpoint_path is not None:
+            
+            checkpoint = Checkpoint(checkpoint_path, checkpoint_interval)
+            inputs_key = _get_inputs_key(self.__inputOMPtr)
+            
+            if checkpoint_resume:
+                
+                master_seed, completed = checkpoint.resume(inputs_key,
+                                                           checkpoint_n_sims)
+                completed = completed[:n_sims]
+                random_seed = _get_optional_param(control_param,
+                                                  "randomSeed")
+                
+                if random_seed is not None and random_seed != master_seed:
+                    
+                    checkpoint.close()
+                    
+                    errMsg = ("The master seed of checkpoint file '{}' is {} "
+                              "which does not match parameter randomSeed, "
+                              "set to {}").format(checkpoint_path,
+                                                  master_seed,
+                                                  random_seed)
+                    raise ValueError(errMsg)
+                
+                self.set_master_seed(master_seed)
+                
+                msg = ('Resuming from {} data points stored in checkpoint '
+                       'file {}').format(len(completed), checkpoint_path)
+                module_logger.info(msg)
+            
+            else:
+                
+                checkpoint.start(self.__master_seed,
+                                 inputs_key,
+                                 checkpoint_n_sims)
+        
+        weighted = _get_optional_param(control_param,
+                                       "importanceSamplingFactor") is not None
+        moments = {key: SummaryStatistics(weighted=weighted)
+                                for key in DataPointAccumulator.metric_keys}
+        
+        self.__cancelled = False
+        self.__n_data_points = 0
+        start_time = timeit.default_timer()
+        n_calculated = 0
+        
+        if time_budget is not None:
+            deadline = start_time + time_budget
+        else:
+            deadline = None
+        
+        stored = ((ResultBlock([sim_number], [data_point], True, True),
+                   False) for sim_number, data_point in completed)
+        
+        # Data points are only sent whole by the workers if they are
+        # written to the checkpoint
+        evaluated = self._iter_evaluated(xrange(len(completed), n_sims),
+                                         deadline,
+                                         checkpoint is not None)
+        calculated = ((block, True) for block in evaluated)
+        points = ((block, index, is_new)
+                        for block, is_new in itertools.chain(stored, calculated)
+                            for index in xrange(len(block)))
+        
+        try:
+            
+            if self.__cancel_requested:
+                
+                self.__cancelled = True
+                module_logger.info('Statistical population cancelled before '
+                                   'any data points')
+                
+                return
+            
+            # Yield results in data point order
+            for block, index, is_new in points:
+                
+                sim_number = block.sim_numbers[index]
+                
+                if is_new and checkpoint is not None:
+                    checkpoint.add(sim_number, block.get_data_point(index))
+                
+                metrics = block.get_metrics(index)
+                weight = metrics.get("likelihoodRatio [-]", 1.)
+                
+                for key, moment in moments.items():
+                    moment.add(metrics[key], weight)
+                
+                summary = get_summary_df(moments)
+                
+                if is_new: n_calculated += 1
+                
+                self._report_progress(sim_number + 1,
+                                      n_sims,
+                                      n_calculated,
+                                      timeit.default_timer() - start_time,
+                                      time_budget,
+                                      summary)
+                
+                self.__n_data_points += 1
+                
+                yield block, index, summary
+                
+                if self.__cancel_requested:
+                    
+                    self.__cancelled = True
+                    
+                    msg = ('Statistical population cancelled after {} data '
+                           'points').format(sim_number + 1)
+                    module_logger.info(msg)
+                    
+                    break
+                
+                if tolerance is None: continue
+                
+                if self._is_converged(moments,
+                                      tolerance,
+                                      confidence,
+                                      min_points):
+                    
+                    msg = ('Statistical population converged after {} data '
+                           'points').format(sim_number + 1)
+                    module_logger.info(msg)
+                    
+                    break
+            
+            else:
+                
+                # Evaluation stops early once no further data point can
+                # finish within the time budget
+                if time_budget is not None and self.__n_data_points < n_sims:
+                    
+                    msg = ('Time budget of {} seconds reached after {} '
+                           'data points').format(time_budget,
+                                                 self.__n_data_points)
+                    module_logger.info(msg)
+        
+        finally:
+            
+            # A cancellation only applies to one run
+            self.__cancel_requested = False
+            
+            evaluated.close()
+            
+            if checkpoint is not None:
+                checkpoint.close()
+    
+    @classmethod
+    def _get_population_size(cls, control_param):
+        
+        """Return the number of data points to evaluate and the time budget,
+        if any. The number of data points is unlimited if only a time budget
+        is set."""
+        
+        n_sims = _get_optional_param(control_param, 'numberOfSimulations')
+        time_budget = _get_optional_param(control_param, "timeBudget")
+        
+        if n_sims is None and time_budget is not None:
+            n_sims = sys.maxint
+        
+        if n_sims is None or n_sims < 1:
+            
+            errMsg = ("At least one data point must be evaluated; however, "
+                      "parameter numberOfSimulations is set to "
+                      "{}").format(n_sims)
+            raise ValueError(errMsg)
+        
+        return n_sims, time_budget
+    
+    def _report_progress(self, n_complete,
+                               n_total,
+                               n_calculated,
+                               elapsed,
+                               time_budget,
+                               summary):
+        
+        """Call the progress callbacks. Data points restored from a
+        checkpoint are excluded from the timing."""
+        
+        if not self.__progress_callbacks: return
+        
+        if n_calculated > 0:
+            seconds_per_point = elapsed / n_calculated
+            eta = seconds_per_point * (n_total - n_complete)
+        else:
+            seconds_per_point = np.nan
+            eta = np.nan
+        
+        if time_budget is not None:
+            eta = min(eta, max(time_budget - elapsed, 0.))
+        
+        report = ProgressReport(n_complete,
+                                n_total,
+                                seconds_per_point,
+                                eta,
+                                summary)
+        
+        for callback in list(self.__progress_callbacks):
+            callback(report)
+        
+        return
+    
+    def _iter_evaluated(self, sim_numbers,
+                              deadline=None,
+                              keep_data_points=False):
+        
+        """Evaluate the given data points, serially or using a process pool,
+        and yield ResultBlocks of them in order. If a deadline, in the time
+        of timeit.default_timer, is given, no data point is started that is
+        not expected to finish before it. The outputs of LCOE_Calculator are
+        kept in the blocks if keep_data_points is True, or if they were
+        already received whole."""
+        
+        control_param = self.__inputOMPtr.get_Control_Param()
+        
+        if not sim_numbers: return
+        
+        keep_events_tables = _get_optional_param(control_param,
+                                                 "keepEventTables",
+                                                 True)
+        work_queue_path = _get_optional_param(control_param,
+                                              "workQueuePath")
+        
+        if work_queue_path is not None:
+            
+            for block in self._iter_queued(sim_numbers,
+                                           work_queue_path,
+                                           deadline,
+                                           keep_data_points):
+                yield block
+            
+            return
+        
+        if self.__engine is not None:
+            
+            blocks = self.__engine.evaluate(self.__inputOMPtr,
+                                            self.__master_seed,
+                                            sim_numbers,
+                                            deadline,
+                                            keep_data_points)
+            
+            try:
+                for block in blocks:
+                    yield block
+            finally:
+                blocks.close()
+            
+            return
+        
+        # Number of worker processes
+        n_processes = min(_get_optional_param(control_param,
+                                              "numberOfProcesses",
+                                              1),
+                          len(sim_numbers))
+        
+        pool = None
+        shared_metocean = None
+        
+        if n_processes > 1:
+            
+            msg = ('Executing {} data points using {} '
+                   'processes').format(len(sim_numbers), n_processes)
+            module_logger.info(msg)
+            
+            (inputOMPtr,
+             shared_metocean) = _get_broadcast_input(self.__inputOMPtr)
+            
+            pool = Pool(processes=n_processes,
+                        initializer=_init_worker,
+                        initargs=(inputOMPtr,
+                                  self.__master_seed))
+            blocks = _iter_pool_chunks(pool,
+                                       sim_numbers,
+                                       n_processes,
+                                       control_param,
+                                       deadline,
+                                       keep_data_points)
+        
+        else:
+            
+            # The outputs are already held by this process, so are kept
+            runner = _DataPointRunner(self.__inputOMPtr, self.__master_seed)
+            data_points = _iter_serial(runner, sim_numbers, deadline)
+            blocks = (ResultBlock([sim_number],
+                                  [data_point],
+                                  keep_events_tables,
+                                  True)
+                        for sim_number, data_point in itertools.izip(
+                                                                sim_numbers,
+                                                                data_points))
+        
+        try:
+            
+            for block in blocks:
+                yield block
+        
+        finally:
+            
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            
+            if shared_metocean is not None:
+                shared_metocean.remove()
+    
+    def _iter_queued(self, sim_numbers,
+                           work_queue_path,
+                           deadline=None,
+                           keep_data_points=False):
+        
+        """Submit the given data points to a FileWorkQueue and yield the
+        ResultBlock of each one in order. While waiting for a result, this
+        process evaluates queued data points itself, if they are expected to
+        finish before the deadline. No result is waited for once the deadline
+        has passed."""
+        
+        control_param = self.__inputOMPtr.get_Control_Param()
+        
+        poll_interval = _get_optional_param(control_param,
+                                            "workQueuePollInterval",
+                                            1.)
+        timeout = _get_optional_param(control_param, "workQueueTimeout")
+        keep_events_tables = _get_optional_param(control_param,
+                                                 "keepEventTables",
+                                                 True)
+        
+        queue = FileWorkQueue(work_queue_path)
+        run_id = queue.submit(self.__inputOMPtr,
+                              self.__master_seed,
+                              sim_numbers)
+        
+        msg = ('Submitted {} data points to work queue {} as run '
+               '{}').format(len(sim_numbers), work_queue_path, run_id)
+        module_logger.info(msg)
+        
+        runner = None
+        task_time = 0.
+        
+        try:
+            
+            for sim_number in sim_numbers:
+                
+                while True:
+                    
+                    block = queue.pop_result(run_id, sim_number)
+                    if block is not None: break
+                    
+                    if timeout is not None:
+                        queue.requeue_stale(run_id, timeout)
+                    
+                    if deadline is not None:
+                        
+                        now = timeit.default_timer()
+                        if now >= deadline: return
+                        
+                        # Wait for the workers rather than start a data
+                        # point that can not finish in time
+                        if now + task_time > deadline:
+                            time.sleep(min(poll_interval, deadline - now))
+                            continue
+                    
+                    # Only claim data points of this run
+                    task = queue.claim(run_id)
+                    
+                    if task is None:
+                        time.sleep(poll_interval)
+                        continue
+                    
+                    if runner is None:
+                        runner = _DataPointRunner(self.__inputOMPtr,
+                                                  self.__master_seed)
+                    
+                    task_number = task[1]
+                    start_time = timeit.default_timer()
+                    task_block = ResultBlock([task_number],
+                                             [runner(task_number)],
+                                             keep_events_tables,
+                                             keep_data_points)
+                    task_time = timeit.default_timer() - start_time
+                    
+                    queue.complete(run_id, task_number, task_block)
+                
+                yield block
+        
+        finally:
+            
+            queue.cancel(run_id)
+    
+    @classmethod
+    def _is_converged(cls, moments, tolerance, confidence, min_points):
+        
+        n_points = moments[cls.convergence_metrics[0]].get_count()
+        
+        if n_points < max(min_points, 2): return False
+        
+        for key in cls.convergence_metrics:
+            
+            width = moments[key].get_relative_interval_width(confidence)
+            
+            if width > tolerance: return False
+        
+        return True
+    
+    @classmethod
+    def _is_difference_converged(cls, moments,
+                                      baseline_moments,
+                                      tolerance,
+                                      confidence,
+                                      min_points):
+        
+        """Paired differences are converged when the width of the confidence
+        interval of their mean, relative to the mean of the baseline, is
+        below the tolerance. Unlike the width relative to the mean difference,
+        this is reached when the interval straddles zero."""
+        
+        n_points = moments[cls.convergence_metrics[0]].get_count()
+        
+        if n_points < max(min_points, 2): return False
+        
+        for key in cls.convergence_metrics:
+            
+            width = moments[key].get_interval_width(confidence)
+            scale = abs(baseline_moments[key].get_mean())
+            
+            if width > tolerance * scale: return False
+        
+        return True
+
+
+class StatisticsEngine(object):
+    
+    """Long lived pool of worker processes for repeated LCOE_Statistics
+    runs, such as when rerunning the module with small changes to the
+    inputs. The worker processes are kept alive between runs, and each one
+    keeps the WaitingTime, RAM network and Logistics objects of recent runs.
+    These are reused by later runs with matching inputs, so repeat runs skip
+    the start up of the processes and the warm up of their caches.
+    
+    The WaitingTime and RAM network objects are reused if the logistic and
+    RAM parameters are unchanged. The Logistics object, which caches
+    logistic phases, is only reused if all the inputs, other than the
+    control parameters and the Farm_OM values apart from helideck, are
+    unchanged.
+    
+    The metocean data of each set of logistic and RAM parameters is shared
+    with the workers through a SharedFrame, which is kept until the set is
+    evicted from the cache or the engine is closed. The inputs are hashed
+    when first run, to identify their shared objects, and only hashed again
+    if a later run finds that their parameters have changed or that a table
+    has been replaced or resized. The tables of an inputOM object must
+    therefore not be modified in place after it has been run by the engine.
+    
+    The engine should be closed when no longer required, for instance by
+    using it as a context manager.
+    
+    Args:
+        n_processes (int, optional): number of worker processes. Defaults to
+            the number of CPUs
+        cache_size (int, optional): number of sets of shared objects kept by
+            each worker. Defaults to 2
+    
+    """
+    
+    def __init__(self, n_processes=None, cache_size=2):
+        
+        if n_processes is None: n_processes = cpu_count()
+        
+        self._n_processes = n_processes
+        self._cache_size = cache_size
+        self._pool = None
+        self._path = None
+        self._n_runs = 0
+        
+        # Signature, tables and cache keys of each input, SharedFrame
+        # metocean data (or None) of each live set of shared objects, in
+        # order of use, and evicted SharedFrames awaiting removal
+        self._input_keys = weakref.WeakKeyDictionary()
+        self._shared_frames = collections.OrderedDict()
+        self._removed_frames = []
+        
+        return
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def run(self, inputOMPtr):
+        
+        """Calculate the statistical results of the given inputs, as for
+        LCOE_Statistics
+        
+        Args:
+            inputOMPtr (class): pointer of class inputOM
+        
+        Returns:
+            output_dict (dict): Output of WP6
+        
+        """
+        
+        return LCOE_Statistics(inputOMPtr, engine=self)()
+    
+    def evaluate(self, inputOMPtr,
+                       master_seed,
+                       sim_numbers,
+                       deadline=None,
+                       keep_data_points=False):
+        
+        """Evaluate the given data points using the worker processes and
+        yield them in order, in blocks
+        
+        Args:
+            inputOMPtr (class): pointer of class inputOM
+            master_seed (int): seed of the statistical population
+            sim_numbers (list): indices of the data points
+            deadline (float, optional): time, of timeit.default_timer, after
+                which no data point should finish. Defaults to None
+            keep_data_points (bool, optional): keep the output of
+                LCOE_Calculator for each data point in the blocks. Defaults
+                to False
+        
+        Yields:
+            ResultBlock: results of each chunk of data points
+        
+        """
+        
+        control_param = inputOMPtr.get_Control_Param()
+        
+        if self._pool is None:
+            
+            msg = ('Starting statistics engine with {} '
+                   'processes').format(self._n_processes)
+            module_logger.info(msg)
+            
+            self._path = tempfile.mkdtemp(prefix="dtocean_maintenance_")
+            self._pool = Pool(processes=self._n_processes,
+                              initializer=_init_engine_worker,
+                              initargs=(self._cache_size,))
+        
+        # Inputs are only hashed again if their signature has changed
+        signature, tables = _get_inputs_signature(inputOMPtr)
+        input_keys = self._input_keys.get(inputOMPtr)
+        
+        if input_keys is None or input_keys[0] != signature:
+            cache_keys = _get_cache_keys(inputOMPtr)
+            self._input_keys[inputOMPtr] = (signature, tables, cache_keys)
+        else:
+            cache_keys = input_keys[2]
+        
+        shared_metocean = self._get_shared_metocean(inputOMPtr, cache_keys[0])
+        broadcast_input, _ = _get_broadcast_input(inputOMPtr, shared_metocean)
+        
+        # The inputs are read once by each worker, rather than with each
+        # task. Workers drop shared objects which the engine has evicted
+        run_path = os.path.join(self._path,
+                                "run_{}.pkl".format(self._n_runs))
+        self._n_runs += 1
+        
+        with open(run_path, "wb") as f:
+            pickle.dump((broadcast_input,
+                         master_seed,
+                         cache_keys,
+                         list(self._shared_frames)),
+                        f,
+                        pickle.HIGHEST_PROTOCOL)
+        
+        tasks = _RunTasks(run_path, sim_numbers)
+        blocks = _iter_pool_chunks(self._pool,
+                                   tasks,
+                                   self._n_processes,
+                                   control_param,
+                                   deadline,
+                                   keep_data_points)
+        
+        try:
+            
+            for block in blocks:
+                yield block
+        
+        finally:
+            
+            blocks.close()
+            
+            # Workers read the file when they start the run, so chunks of an
+            # abandoned run which are still queued fail quickly, rather than
+            # being evaluated
+            try:
+                os.remove(run_path)
+            except OSError:
+                pass
+    
+    def close(self):
+        
+        """Stop the worker processes and remove the shared files"""
+        
+        if self._pool is None: return
+        
+        self._pool.terminate()
+        self._pool.join()
+        self._pool = None
+        
+        # Files can be removed once no process has them mapped
+        self._removed_frames.extend(x for x in self._shared_frames.values()
+                                                            if x is not None)
+        self._shared_frames.clear()
+        self._remove_frames()
+        
+        shutil.rmtree(self._path, ignore_errors=True)
+        self._path = None
+        
+        return
+    
+    def _get_shared_metocean(self, inputOMPtr, base_key):
+        
+        """Return the SharedFrame of the metocean data of the given inputs,
+        creating it if required, and evict the least recently used sets of
+        shared objects beyond the cache size. Sets without metocean data to
+        share hold None."""
+        
+        logistic_param = inputOMPtr.get_Logistic_Param()
+        
+        if base_key in self._shared_frames:
+            
+            shared_metocean = self._shared_frames.pop(base_key)
+        
+        elif not isinstance(logistic_param['metocean'], pd.DataFrame):
+            
+            shared_metocean = None
+        
+        else:
+            
+            control_param = inputOMPtr.get_Control_Param()
+            shared_memory_path = _get_optional_param(control_param,
+                                                     "sharedMemoryPath")
+            shared_metocean = SharedFrame.create(logistic_param['metocean'],
+                                                 shared_memory_path)
+        
+        self._shared_frames[base_key] = shared_metocean
+        
+        while len(self._shared_frames) > self._cache_size:
+            _, evicted = self._shared_frames.popitem(last=False)
+            if evicted is not None: self._removed_frames.append(evicted)
+        
+        self._remove_frames()
+        
+        return shared_metocean
+    
+    def _remove_frames(self):
+        
+        """Remove the files of evicted SharedFrames. Files still mapped by a
+        worker cannot be removed on some platforms, so these are retried
+        later."""
+        
+        self._removed_frames = [x for x in self._removed_frames
+                                                        if not x.remove()]
+        
+        for shared_frame in self._removed_frames:
+            msg = ("Removal of shared files at {} deferred, as they are in "
+                   "use").format(shared_frame.get_path())
+            module_logger.debug(msg)
+        
+        return
+
+
+class _DataPointRunner(object):
+    
+    """Evaluate data points of the O&M statistical population, reusing the
+    WaitingTime, Logistics, RAM network and RAM metrics objects between
+    them.
+    
+    Args:
+        inputOMPtr (class): pointer of class inputOM
+        master_seed (int): seed of the statistical population
+        shared_runner (_DataPointRunner, optional): runner from which to
+            reuse the WaitingTime, RAM network and RAM metrics objects. The
+            logistic and RAM parameters of both inputs must be equal
+        share_logistics (bool, optional): also reuse the Logistics object of
+            shared_runner. Defaults to True
+    
+    """
+    
+    def __init__(self, inputOMPtr,
+                       master_seed,
+                       shared_runner=None,
+                       share_logistics=True):
+        
+        self._inputOMPtr = inputOMPtr
+        self._model = PreparedModel(inputOMPtr)
+        self._master_seed = master_seed
+        self._failure_rates = None
+        self._timelines = None
+        
+        logistic_param = inputOMPtr.get_Logistic_Param()
+        
+        if shared_runner is not None and share_logistics:
+            self._logistics_manager = shared_runner._logistics_manager
+        else:
+            self._logistics_manager = Logistics(
+                                copy.deepcopy(logistic_param['vessels']),
+                                copy.deepcopy(logistic_param['equipments']),
+                                copy.deepcopy(logistic_param['ports']),
+                                copy.deepcopy(logistic_param['port_sf']),
+                                copy.deepcopy(logistic_param['vessel_sf']),
+                                copy.deepcopy(logistic_param['eq_sf']),
+                                copy.deepcopy(logistic_param['schedule_OLC']))
+        
+        if shared_runner is not None:
+            
+            self._custom_waiting = shared_runner._custom_waiting
+            self._ram_network = shared_runner._ram_network
+            self._ram_metrics = shared_runner._ram_metrics
+            
+            return
+        
+        # Use a single WaitingTime class for all simulations
+        metocean = logistic_param['metocean']
+        self._custom_waiting = WaitingTime(metocean)
+        
+        # Single RAM network
+        ram_param = inputOMPtr.get_RAM_Param()
+        
+        electrical_network = None
+        moorings_network = None
+        user_network = None
+        
+        if not (ram_param['elechier'] is None or
+                ram_param['elecbom'] is None):
+            electrical_network = SubNetwork(ram_param['elechier'],
+                                            ram_param['elecbom'])
+        
+        if not (ram_param['moorhier'] is None or
+                ram_param['moorbom'] is None):
+            moorings_network = SubNetwork(ram_param['moorhier'],
+                                          ram_param['moorbom'])
+        
+        if not (ram_param['userhier'] is None or
+                ram_param['userbom'] is None):
+            user_network = SubNetwork(ram_param['userhier'],
+                                      ram_param['userbom'])
+        
+        network = Network(ram_param['db'],
+                          electrical_network,
+                          moorings_network,
+                          user_network)
+        
+        self._ram_network = network.set_failure_rates(
+                                    calcscenario=ram_param['calcscenario'],
+                                    k_factors=ram_param['kfactors'])
+        
+        # RAM metrics of the network, derived once for all data points
+        self._ram_metrics = RAMMetrics(self._ram_network)
+        
+        return
+    
+    def __call__(self, sim_number):
+        
+        msg = ('Executing data point number {}').format(sim_number)
+        module_logger.info(msg)
+        
+        random_state = get_data_point_random_state(self._master_seed,
+                                                   sim_number)
+        
+        control_param = self._inputOMPtr.get_Control_Param()
+        stratified = _get_optional_param(control_param,
+                                         'stratifiedSampling',
+                                         False)
+        
+        presample_size = _get_optional_param(control_param,
+                                             'presampleFailures')
+        
+        if stratified:
+            failure_sampler = StratifiedFailureSampler(self._master_seed,
+                                                       sim_number,
+                                                       random_state)
+        elif presample_size:
+            timelines = self._get_timelines(sim_number, presample_size)
+            failure_sampler = timelines.get_sampler(sim_number, random_state)
+        else:
+            failure_sampler = None
+        
+        calculator = LCOE_Calculator(
+                                self._model,
+                                custom_waiting=self._custom_waiting,
+                                logistics_manager=self._logistics_manager,
+                                ram_network=self._ram_network,
+                                random_state=random_state,
+                                failure_sampler=failure_sampler,
+                                ram_metrics=self._ram_metrics)
+        data_point = calculator.executeCalc()
+        
+        return data_point
+    
+    def _get_timelines(self, sim_number, presample_size):
+        
+        """Return the presampled failure timelines containing the given data
+        point, sampling a new block of data points if required"""
+        
+        if self._timelines is not None and sim_number in self._timelines:
+            return self._timelines
+        
+        simulationTime = self._model.get_operation_time_day()
+        
+        if self._failure_rates is None:
+            
+            array = Array(self._ram_network,
+                          startOperationDate=None,
+                          simulationTimeDay=simulationTime,
+                          eventsTableKeys=None,
+                          NoPoisson_eventsTableKeys=None,
+                          printWP6=False,
+                          ram_metrics=self._ram_metrics)
+            annual_rates = array.get_failure_rates(
+                                            self._model.get_Component(),
+                                            self._model.get_Failure_Mode())
+            
+            self._failure_rates = {}
+            
+            # Array samples daily rates. Condition based maintenance samples
+            # the same rates
+            for key, rate in annual_rates.iteritems():
+                rate_day = rate / PreparedModel.yearDays
+                self._failure_rates[key] = rate_day
+                self._failure_rates["CoBaMa_" + key] = rate_day
+        
+        # Blocks are aligned, so each data point is always sampled with the
+        # same block, whichever data point is evaluated first
+        block_start = sim_number - sim_number % presample_size
+        sim_numbers = xrange(block_start, block_start + presample_size)
+        
+        msg = ('Presampling failure timelines for data points {} to '
+               '{}').format(sim_numbers[0], sim_numbers[-1])
+        module_logger.debug(msg)
+        
+        self._timelines = FailureTimelines.sample(self._failure_rates,
+                                                  sim_numbers,
+                                                  simulationTime,
+                                                  self._master_seed)
+        
+        return self._timelines
+
+
+class _SweepRunner(object):
+    
+    """Evaluate data points of several scenarios, sharing the WaitingTime,
+    RAM network and Logistics objects between them. A Logistics object is
+    only shared between scenarios with the same helideck setting.
+    
+    Args:
+        inputOMPtrs (list): pointers of class inputOM, one per scenario
+        master_seed (int): seed of the statistical population
+    
+    """
+    
+    def __init__(self, inputOMPtrs, master_seed):
+        
+        self._inputOMPtrs = inputOMPtrs
+        self._master_seed = master_seed
+        self._runners = [None] * len(inputOMPtrs)
+        self._helideck_runners = {}
+        
+        return
+    
+    def __call__(self, task):
+        
+        index, sim_number = task
+        
+        if self._runners[index] is None:
+            
+            inputOMPtr = self._inputOMPtrs[index]
+            helideck = _get_helideck(inputOMPtr)
+            
+            if helideck in self._helideck_runners:
+                shared_runner = self._helideck_runners[helideck]
+                share_logistics = True
+            elif self._helideck_runners:
+                shared_runner = self._helideck_runners.values()[0]
+                share_logistics = False
+            else:
+                shared_runner = None
+                share_logistics = False
+            
+            runner = _DataPointRunner(inputOMPtr,
+                                      self._master_seed,
+                                      shared_runner,
+                                      share_logistics)
+            
+            if helideck not in self._helideck_runners:
+                self._helideck_runners[helideck] = runner
+            
+            self._runners[index] = runner
+        
+        return self._runners[index](sim_number)
+
+
+class _SweepTasks(object):
+    
+    """Sequence of the (scenario index, data point index) tasks of a sweep,
+    ordered by data point"""
+    
+    def __init__(self, n_scenarios, n_sims):
+        
+        self._n_scenarios = n_scenarios
+        self._n_sims = n_sims
+        
+        return
+    
+    def __len__(self):
+        return self._n_scenarios * self._n_sims
+    
+    def __getitem__(self, index):
+        
+        if not 0 <= index < len(self): raise IndexError(index)
+        
+        sim_number, scenario = divmod(index, self._n_scenarios)
+        
+        return scenario, sim_number
+
+
+class _RunTasks(object):
+    
+    """Sequence of the (run path, data point index) tasks of a
+    StatisticsEngine run"""
+    
+    def __init__(self, run_path, sim_numbers):
+        
+        self._run_path = run_path
+        self._sim_numbers = sim_numbers
+        
+        return
+    
+    def __len__(self):
+        return len(self._sim_numbers)
+    
+    def __getitem__(self, index):
+        return self._run_path, self._sim_numbers[index]
+
+
+class _EngineRunner(object):
+    
+    """Evaluate data points of StatisticsEngine runs in a worker process,
+    keeping the shared objects of recent runs for reuse.
+    
+    Args:
+        cache_size (int): number of sets of shared objects to keep
+    
+    """
+    
+    def __init__(self, cache_size):
+        
+        self._cache_size = cache_size
+        self._run_path = None
+        self._runner = None
+        self._base_runners = collections.OrderedDict()
+        self._logistics_runners = collections.OrderedDict()
+        self._logistics_base_keys = {}
+        
+        return
+    
+    def __call__(self, task):
+        
+        run_path, sim_number = task
+        
+        if run_path != self._run_path:
+            self._start_run(run_path)
+        
+        return self._runner(sim_number)
+    
+    def _start_run(self, run_path):
+        
+        with open(run_path, "rb") as f:
+            (inputOMPtr,
+             master_seed,
+             cache_keys,
+             live_keys) = pickle.load(f)
+        
+        # Release the shared objects, and so the mapped files, of the sets
+        # evicted by the engine
+        self._runner = None
+        self._run_path = None
+        
+        for key in self._base_runners.keys():
+            if key not in live_keys: del self._base_runners[key]
+        
+        for key in self._logistics_runners.keys():
+            if self._logistics_base_keys[key] not in live_keys:
+                del self._logistics_runners[key]
+        
+        inputOMPtr = _get_attached_input(inputOMPtr)
+        base_key, logistics_key = cache_keys
+        
+        if logistics_key in self._logistics_runners:
+            shared_runner = self._logistics_runners[logistics_key]
+            share_logistics = True
+        elif base_key in self._base_runners:
+            shared_runner = self._base_runners[base_key]
+            share_logistics = False
+        else:
+            shared_runner = None
+            share_logistics = False
+        
+        runner = _DataPointRunner(inputOMPtr,
+                                  master_seed,
+                                  shared_runner,
+                                  share_logistics)
+        
+        for cache, key in [(self._base_runners, base_key),
+                           (self._logistics_runners, logistics_key)]:
+            
+            cache.pop(key, None)
+            cache[key] = runner
+            
+            while len(cache) > self._cache_size:
+                cache.popitem(last=False)
+        
+        # The logistics key includes the base inputs, so maps to one base key
+        self._logistics_base_keys[logistics_key] = base_key
+        
+        for key in self._logistics_base_keys.keys():
+            if key not in self._logistics_runners:
+                del self._logistics_base_keys[key]
+        
+        self._run_path = run_path
+        self._runner = runner
+        
+        return
+
+
+def run_queue_worker(work_queue_path, poll_interval=1., idle_timeout=0.):
+    
+    """Evaluate data points from a FileWorkQueue until it is empty. Workers
+    may be run on any host which can access the queue directory, while
+    LCOE_Statistics, with the workQueuePath control parameter set, acts as
+    the coordinator. Workers may be started before the coordinator submits
+    its data points, and evaluate the runs of several coordinators, in order
+    of submission, loading the inputs of each run as required.
+    
+    Args:
+        work_queue_path (str): path to the queue directory
+        poll_interval (float, optional): time between checks of an empty
+            queue [s]. Defaults to 1
+        idle_timeout (float, optional): time to wait for new data points
+            while the queue is empty [s]. Defaults to 0
+    
+    Returns:
+        int: number of data points evaluated
+    
+    """
+    
+    queue = FileWorkQueue(work_queue_path)
+    
+    run_id = None
+    runner = None
+    keep_events_tables = True
+    keep_data_points = False
+    n_evaluated = 0
+    idle_start = None
+    
+    while True:
+        
+        task = queue.claim()
+        
+        if task is None:
+            
+            if idle_start is None: idle_start = time.time()
+            if time.time() - idle_start >= idle_timeout: break
+            
+            time.sleep(poll_interval)
+            continue
+        
+        idle_start = None
+        task_run_id, sim_number = task
+        
+        if task_run_id != run_id:
+            
+            # The run may have been removed since the claim
+            try:
+                inputOMPtr, master_seed = queue.get_inputs(task_run_id)
+            except (IOError, OSError):
+                continue
+            
+            # The full outputs are only needed by checkpointed runs
+            control_param = inputOMPtr.get_Control_Param()
+            keep_events_tables = _get_optional_param(control_param,
+                                                     "keepEventTables",
+                                                     True)
+            keep_data_points = _get_optional_param(
+                                    control_param,
+                                    "checkpointPath") is not None
+            
+            runner = _DataPointRunner(inputOMPtr, master_seed)
+            run_id = task_run_id
+            
+            msg = ('Work queue worker loaded inputs of run '
+                   '{}').format(run_id)
+            module_logger.info(msg)
+        
+        block = ResultBlock([sim_number],
+                            [runner(sim_number)],
+                            keep_events_tables,
+                            keep_data_points)
+        
+        queue.complete(run_id, sim_number, block)
+        n_evaluated += 1
+    
+    msg = ('Work queue worker evaluated {} data points').format(n_evaluated)
+    module_logger.info(msg)
+    
+    return n_evaluated
 
-        Returns:
-            output_dict (dict): Output of WP6
 
-        '''
+def _get_optional_param(param_dict, key, default=None):
+    
+    """Return the value of an optional input parameter, or the default if it
+    is missing or None"""
+    
+    if key in param_dict and param_dict[key] is not None:
+        return param_dict[key]
+    
+    return default
+
+
+# Data point runner for the current worker process
+_worker_runner = None
+
+# Control parameters which do not change the data points of a population
+_run_control_keys = ["numberOfSimulations",
+                     "numberOfProcesses",
+                     "sharedMemoryPath",
+                     "chunkTime",
+                     "randomSeed",
+                     "convergenceTolerance",
+                     "convergenceConfidence",
+                     "convergenceMinPoints",
+                     "checkpointPath",
+                     "checkpointInterval",
+                     "checkpointResume",
+                     "keepEventTables",
+                     "eventTablesPath",
+                     "workQueuePath",
+                     "workQueuePollInterval",
+                     "workQueueTimeout",
+                     "timeBudget",
+                     "portSelectionPath"]
+
+
+def _iter_serial(runner, tasks, deadline=None):
+    
+    """Evaluate tasks in this process and yield their results in order. If
+    a deadline, in the time of timeit.default_timer, is given, a task is
+    only started if the mean time per task so far suggests it will finish
+    before it."""
+    
+    total_time = 0.
+    
+    for i, task in enumerate(tasks):
+        
+        start_time = timeit.default_timer()
+        
+        if (deadline is not None and i > 0 and
+            start_time + total_time / i > deadline): return
+        
+        result = runner(task)
+        total_time += timeit.default_timer() - start_time
+        
+        yield result
 
-        control_param = self.__inputOMPtr.get_Control_Param()
 
-        # Population size
-        n_sims = control_param['numberOfSimulations']
+def _iter_pool_chunks(pool, tasks,
+                            n_processes,
+                            control_param,
+                            deadline=None,
+                            keep_data_points=False):
+    
+    """Evaluate tasks using a process pool and yield the ResultBlock of each
+    chunk of tasks in order.
+    
+    The tasks are sent to the workers in chunks, each returned as a single
+    ResultBlock, to amortise the cost of communication. The outputs of
+    LCOE_Calculator are only returned whole if keep_data_points is True.
+    The size of
+    each chunk is chosen so that it takes about chunkTime seconds, based on
+    the mean time per task measured so far. No more than two chunks per
+    worker are queued at once, and chunks are kept small enough to balance
+    the remaining tasks between the workers.
+    
+    If a deadline, in the time of timeit.default_timer, is given, a chunk is
+    only submitted if it is expected to finish before it, allowing for the
+    tasks queued ahead of it, and is shortened to fit if required. Until the
+    first chunk is timed, a single task per worker is submitted. Submitted
+    chunks are always completed, so the deadline may be overshot if they
+    take longer than expected.
+    
+    If the failures are presampled, chunks end at the boundaries of the
+    presampled blocks, so that each block is only sampled by one worker.
+    Chunks are shortened to the previous boundary, if there is one, and
+    otherwise extended to the next, unless a deadline is given.
+    """
+    
+    chunk_time = _get_optional_param(control_param, "chunkTime", 1.)
+    keep_events_tables = _get_optional_param(control_param,
+                                             "keepEventTables",
+                                             True)
+    
+    if _get_optional_param(control_param, 'stratifiedSampling', False):
+        presample_size = None
+    else:
+        presample_size = _get_optional_param(control_param,
+                                             'presampleFailures')
+    
+    n_tasks = len(tasks)
+    max_pending = 2 * n_processes
+    pending = collections.deque()
+    n_pending_tasks = 0
+    next_task = 0
+    chunk_size = 1
+    total_time = 0.
+    total_tasks = 0
+    
+    while pending or next_task < n_tasks:
         
-        if n_sims < 1:
+        while next_task < n_tasks and len(pending) < max_pending:
             
-            errMsg = ("At least one data point must be evaluated; however, "
-                      "parameter numberOfSimulations is set to "
-                      "{}").format(n_sims)
-            raise ValueError(errMsg)
+            stop_task = min(next_task + chunk_size, n_tasks)
+            
+            if deadline is not None and total_tasks == 0:
+                
+                if len(pending) >= n_processes: break
+            
+            elif deadline is not None:
+                
+                # The queued tasks are shared between the workers, after
+                # which the chunk runs on one of them
+                task_time = total_time / total_tasks
+                queued_time = n_pending_tasks * task_time / n_processes
+                remaining = deadline - timeit.default_timer() - queued_time
+                
+                if remaining <= 0: break
+                
+                if task_time > 0:
+                    stop_task = min(stop_task,
+                                    next_task + int(remaining / task_time))
+                
+                if stop_task == next_task: break
+            
+            if presample_size:
+                stop_task = _get_block_boundary(tasks,
+                                                next_task,
+                                                stop_task,
+                                                presample_size,
+                                                deadline is None)
+            
+            chunk = [tasks[i] for i in xrange(next_task, stop_task)]
+            
+            pending.append((pool.apply_async(_run_worker_chunk,
+                                             (chunk,
+                                              keep_events_tables,
+                                              keep_data_points)),
+                            len(chunk)))
+            n_pending_tasks += len(chunk)
+            next_task = stop_task
         
-        metrics_dict = {"lifetimeOpex [Euro]": [],
-                        "lifetimeEnergy [Wh]": [],
-                        "LCOEOpex [Euro/kWh]": [],
-                        "arrayDowntime [hour]": [],
-                        "arrayAvailability [-]": [],
-                        "numberOfJourneys [-]": []}
-        year_opex_df = pd.DataFrame()
-        year_energies_df = pd.DataFrame()
-        device_downtime_df = pd.DataFrame()
-        device_energies_df = pd.DataFrame()
-        events_table_dicts = []
+        # Nothing more can finish before the deadline
+        if not pending: return
         
-        # Use a single WaitingTime class for all simulations
-        logistic_param = self.__inputOMPtr.get_Logistic_Param()
-        metocean = logistic_param['metocean']
+        async_result, n_chunk_tasks = pending.popleft()
+        elapsed, block = async_result.get()
+        n_pending_tasks -= n_chunk_tasks
         
-        custom_waiting = WaitingTime(metocean)
+        total_time += elapsed
+        total_tasks += len(block)
         
-        logistics_manager = Logistics(
-                                copy.deepcopy(logistic_param['vessels']),
-                                copy.deepcopy(logistic_param['equipments']),
-                                copy.deepcopy(logistic_param['ports']),
-                                copy.deepcopy(logistic_param['port_sf']),
-                                copy.deepcopy(logistic_param['vessel_sf']),
-                                copy.deepcopy(logistic_param['eq_sf']),
-                                copy.deepcopy(logistic_param['schedule_OLC']))
+        if total_time > 0:
+            chunk_size = int(chunk_time * total_tasks / total_time)
+        else:
+            chunk_size = 2 * chunk_size
         
-        # Single RAM network
-        ram_param = self.__inputOMPtr.get_RAM_Param()
+        balanced_size = (n_tasks - next_task) // max_pending
+        chunk_size = max(min(chunk_size, balanced_size), 1)
         
-        electrical_network = None
-        moorings_network = None
-        user_network = None
+        yield block
+
+
+def _get_block_boundary(tasks, start, stop, block_size, round_up=True):
+    
+    """Return the last index of the tasks after start and up to stop at
+    which a block of presampled data points begins, or the end of the
+    tasks. If there is none, the next such index after stop is returned if
+    round_up is True, otherwise stop."""
+    
+    def is_boundary(index):
         
-        if not (ram_param['elechier'] is None or
-                ram_param['elecbom'] is None):
-            electrical_network = SubNetwork(ram_param['elechier'],
-                                            ram_param['elecbom'])
+        if index == len(tasks): return True
         
-        if not (ram_param['moorhier'] is None or
-                ram_param['moorbom'] is None):
-            moorings_network = SubNetwork(ram_param['moorhier'],
-                                          ram_param['moorbom'])
+        sim_number = _get_task_sim_number(tasks[index])
         
-        if not (ram_param['userhier'] is None or
-                ram_param['userbom'] is None):
-            user_network = SubNetwork(ram_param['userhier'],
-                                      ram_param['userbom'])
+        # The tasks of sweeps hold each data point of several scenarios
+        return (sim_number % block_size == 0 and
+                _get_task_sim_number(tasks[index - 1]) != sim_number)
+    
+    for index in xrange(stop, start, -1):
+        if is_boundary(index): return index
+    
+    if not round_up: return stop
+    
+    index = stop
+    
+    while not is_boundary(index):
+        index += 1
+    
+    return index
+
+
+def _get_broadcast_input(inputOMPtr, shared_metocean=None):
+    
+    """Return a copy of the given inputs, for sending to worker processes,
+    with the metocean data replaced by a SharedFrame. The given SharedFrame
+    is used, if any, otherwise a new one is created in the sharedMemoryPath
+    directory."""
+    
+    logistic_param = inputOMPtr.get_Logistic_Param()
+    
+    if not isinstance(logistic_param['metocean'], pd.DataFrame):
+        return inputOMPtr, shared_metocean
+    
+    if shared_metocean is None:
         
-        network = Network(ram_param['db'],
-                          electrical_network,
-                          moorings_network,
-                          user_network)
+        control_param = inputOMPtr.get_Control_Param()
+        shared_memory_path = _get_optional_param(control_param,
+                                                 "sharedMemoryPath")
+        shared_metocean = SharedFrame.create(logistic_param['metocean'],
+                                             shared_memory_path)
+    
+    logistic_param = dict(logistic_param)
+    logistic_param['metocean'] = shared_metocean
+    
+    broadcast_input = inputOM(inputOMPtr.get_Farm_OM(),
+                              inputOMPtr.get_Component(),
+                              inputOMPtr.get_Failure_Mode(),
+                              inputOMPtr.get_Repair_Action(),
+                              inputOMPtr.get_Inspection(),
+                              inputOMPtr.get_RAM_Param(),
+                              logistic_param,
+                              inputOMPtr.get_Simu_Param(),
+                              inputOMPtr.get_Control_Param())
+    
+    return broadcast_input, shared_metocean
+
+
+def _get_cache_keys(inputOMPtr):
+    
+    """Return keys identifying the inputs of the shared objects of a
+    StatisticsEngine worker. The first covers the WaitingTime and RAM
+    network and the second the Logistics object."""
+    
+    base_inputs = (_get_sorted_items(inputOMPtr.get_Logistic_Param()),
+                   _get_sorted_items(inputOMPtr.get_RAM_Param()))
+    logistics_inputs = (base_inputs,
+                        _get_helideck(inputOMPtr),
+                        inputOMPtr.get_Component(),
+                        inputOMPtr.get_Failure_Mode(),
+                        inputOMPtr.get_Repair_Action(),
+                        inputOMPtr.get_Inspection(),
+                        _get_sorted_items(inputOMPtr.get_Simu_Param()))
+    
+    base_key = hashlib.sha1(pickle.dumps(base_inputs,
+                                         pickle.HIGHEST_PROTOCOL))
+    logistics_key = hashlib.sha1(pickle.dumps(logistics_inputs,
+                                              pickle.HIGHEST_PROTOCOL))
+    
+    return base_key.hexdigest(), logistics_key.hexdigest()
+
+
+def _get_inputs_signature(inputOMPtr):
+    
+    """Return a cheap summary of the inputs hashed by _get_cache_keys, to
+    detect changes to an inputOM object between StatisticsEngine runs.
+    Tables, and other objects, are summarised by their identity and shape,
+    and are also returned, so that their identities are not reused while
+    the signature is kept."""
+    
+    tables = []
+    
+    def summarise(value):
         
-        ram_network = network.set_failure_rates(
-                                    calcscenario=ram_param['calcscenario'],
-                                    k_factors=ram_param['kfactors'])
+        if value is None or isinstance(value, (numbers.Number, basestring)):
+            return value
         
-        # Run simulations and collect results
-        for sim_number in xrange(n_sims):
-            
-            msg = ('Executing data point number {}').format(sim_number)
-            module_logger.info(msg)
-                        
-            calculator = LCOE_Calculator(self.__inputOMPtr,
-                                         custom_waiting=custom_waiting,
-                                         logistics_manager=logistics_manager,
-                                         ram_network=ram_network)
-            data_point = calculator.executeCalc()
-                                    
-            for key in metrics_dict.keys():
-                metrics_dict[key].append(data_point[key])
-            
-            year_opex = data_point["OpexPerYear [Euro]"].set_index("Year")
-            year_opex.columns = ["Cost {} [Euro]".format(sim_number)]
-            year_opex_df = pd.concat([year_opex_df, year_opex],
-                                     axis=1)
-            
-            year_energies = data_point["energyPerYear [Wh]"].set_index("Year")
-            year_energies.columns = ["Energy {} [Wh]".format(sim_number)]
-            year_energies_df = pd.concat([year_energies_df, year_energies],
-                                         axis=1)
-            
-            downtime_dict = {k: v for k, v in 
-                                data_point["downtimePerDevice [hour]"].items()}
-            downtime_dict = {"Downtime {} [hours]".format(sim_number):
-                                                                downtime_dict}
-            downtime_df = pd.DataFrame(downtime_dict)
-            device_downtime_df = pd.concat([device_downtime_df, downtime_df],
-                                           axis=1)
-            
-            energies_dict = {k: v for k, v in 
-                                data_point["energyPerDevice [Wh]"].items()}
-            energies_dict = {"Energy {} [Wh]".format(sim_number):
-                                                                energies_dict}
-            energies_df = pd.DataFrame(energies_dict)
-            device_energies_df = pd.concat([device_energies_df, energies_df],
-                                           axis=1)
-            
-            events_table_dicts.append(data_point['eventTables [-]'])
-            
-        metrics_df = pd.DataFrame(metrics_dict)
-        
-        output_dict = {"MetricsTable [-]": metrics_df,
-                       "OpexPerYear [Euro]": year_opex_df,
-                       "energyPerYear [Wh]": year_energies_df,
-                       "downtimePerDevice [hour]": device_downtime_df,
-                       "energyPerDevice [Wh]": device_energies_df,
-                       'eventTables [-]': events_table_dicts,
-                       "CapexOfArray [Euro]":
-                           data_point["CapexOfArray [Euro]"]}
-                    
-        return output_dict
+        if isinstance(value, dict):
+            return tuple((key, summarise(value[key]))
+                                                    for key in sorted(value))
+        
+        if isinstance(value, (list, tuple)):
+            return tuple(summarise(x) for x in value)
+        
+        tables.append(value)
+        
+        return id(value), getattr(value, "shape", None)
+    
+    inputs = (inputOMPtr.get_Logistic_Param(),
+              inputOMPtr.get_RAM_Param(),
+              _get_helideck(inputOMPtr),
+              inputOMPtr.get_Component(),
+              inputOMPtr.get_Failure_Mode(),
+              inputOMPtr.get_Repair_Action(),
+              inputOMPtr.get_Inspection(),
+              inputOMPtr.get_Simu_Param())
+    
+    return summarise(inputs), tables
+
+
+def _get_inputs_key(inputOMPtr):
+    
+    """Return a key identifying the inputs which determine the data points
+    of a statistical population. Control parameters which only manage the
+    run, such as the number of processes, are excluded."""
+    
+    _, logistics_key = _get_cache_keys(inputOMPtr)
+    control_items = _get_sorted_items(inputOMPtr.get_Control_Param())
+    
+    inputs = (logistics_key,
+              _get_sorted_items(inputOMPtr.get_Farm_OM()),
+              [item for item in control_items
+                                    if item[0] not in _run_control_keys])
+    
+    inputs_key = hashlib.sha1(pickle.dumps(inputs, pickle.HIGHEST_PROTOCOL))
+    
+    return inputs_key.hexdigest()
+
+
+def _get_sorted_items(param_dict):
+    
+    if param_dict is None: return None
+    
+    return sorted(param_dict.items())
+
+
+def _get_helideck(inputOMPtr):
+    
+    farm_om = inputOMPtr.get_Farm_OM()
+    
+    if farm_om is None: return None
+    
+    return farm_om.get('helideck')
+
+
+def _get_attached_input(inputOMPtr):
+    
+    """Return a copy of inputs received by a worker process, with any
+    SharedFrame metocean data attached"""
+    
+    logistic_param = inputOMPtr.get_Logistic_Param()
+    
+    if not isinstance(logistic_param['metocean'], SharedFrame):
+        return inputOMPtr
+    
+    logistic_param = dict(logistic_param)
+    logistic_param['metocean'] = logistic_param['metocean'].load()
+    
+    attached_input = inputOM(inputOMPtr.get_Farm_OM(),
+                             inputOMPtr.get_Component(),
+                             inputOMPtr.get_Failure_Mode(),
+                             inputOMPtr.get_Repair_Action(),
+                             inputOMPtr.get_Inspection(),
+                             inputOMPtr.get_RAM_Param(),
+                             logistic_param,
+                             inputOMPtr.get_Simu_Param(),
+                             inputOMPtr.get_Control_Param())
+    
+    return attached_input
+
+
+def _init_worker(inputOMPtr, master_seed):
+    
+    """Initialise a worker process of the LCOE_Statistics process pool"""
+    
+    global _worker_runner # pylint: disable=global-statement
+    
+    inputOMPtr = _get_attached_input(inputOMPtr)
+    _worker_runner = _DataPointRunner(inputOMPtr, master_seed)
+    
+    return
+
+
+def _init_sweep_worker(inputOMPtrs, master_seed):
+    
+    """Initialise a worker process of the LCOE_Statistics.sweep process
+    pool"""
+    
+    global _worker_runner # pylint: disable=global-statement
+    
+    inputOMPtrs = [_get_attached_input(inputOMPtr)
+                                            for inputOMPtr in inputOMPtrs]
+    _worker_runner = _SweepRunner(inputOMPtrs, master_seed)
+    
+    return
+
+
+def _init_engine_worker(cache_size):
+    
+    """Initialise a worker process of a StatisticsEngine"""
+    
+    global _worker_runner # pylint: disable=global-statement
+    
+    _worker_runner = _EngineRunner(cache_size)
+    
+    return
+
+
+def _run_worker_chunk(tasks, keep_events_tables=True, keep_data_points=False):
+    
+    """Evaluate a chunk of data points in a worker process, returning the
+    time taken and a ResultBlock of the results. The block only holds the
+    outputs of LCOE_Calculator, and the event tables, if they are kept, to
+    reduce the size of the results."""
+    
+    start_time = timeit.default_timer()
+    
+    sim_numbers = [_get_task_sim_number(task) for task in tasks]
+    data_points = [_worker_runner(task) for task in tasks]
+    block = ResultBlock(sim_numbers,
+                        data_points,
+                        keep_events_tables,
+                        keep_data_points)
+    
+    elapsed = timeit.default_timer() - start_time
+    
+    return elapsed, block
+
+
+def _get_task_sim_number(task):
+    
+    """Return the data point index of a task, which is either the index or
+    a tuple ending with it"""
+    
+    if isinstance(task, tuple): return task[-1]
+    
+    return task
     
 
 class LCOE_Calculator(object):
@@ -609,6 +2865,7 @@ class LCOE_Calculator(object):
         self.__wp6_outputsForLogistic (DataFrame) [-]:
             input for logistic module
         self.__ram_network (class) [-]: RAM Network object
+        self.__ram_metrics (RAMMetrics) [-]: RAM metrics of ram_network
         self.__elechierdict (str) [-]: RAM parameter
         self.__elecbomeg (str) [-]: RAM parameter
         self.__moorhiereg (str) [-]: RAM parameter
@@ -704,12 +2961,28 @@ class LCOE_Calculator(object):
     def __init__(self, inputOMPTR,
                        custom_waiting=None,
                        logistics_manager=None,
-                       ram_network=None):
+                       ram_network=None,
+                       random_state=None,
+                       failure_sampler=None,
+                       ram_metrics=None):
 
         '''__init__ function: Saves the arguments in internal variabels.
 
         Args:
-            inputOMPTR (class): pointer of inputOM class
+            inputOMPTR (class): pointer of inputOM class, or a PreparedModel
+                shared between calculators
+            custom_waiting (WaitingTime, optional): shared WaitingTime object
+            logistics_manager (Logistics, optional): shared Logistics object
+            ram_network (object, optional): shared RAM Network object
+            random_state (numpy.random.RandomState, optional): random number
+                generator for the failure events. Defaults to the global
+                numpy generator.
+            failure_sampler (StratifiedFailureSampler, optional): sampler of
+                the failure events of each failure mode of the array,
+                including the condition based maintenance events. Defaults
+                to the poisson process.
+            ram_metrics (RAMMetrics, optional): shared RAM metrics of
+                ram_network. Ignored if ram_network is not given
 
 
         Returns:
@@ -720,11 +2993,21 @@ class LCOE_Calculator(object):
         #######################################################################
 
         # start: Read from inputOM
-        # Save the instance pointer of inputOM
+        # Prepare the inputs, unless already shared
+        if not isinstance(inputOMPTR, PreparedModel):
+            inputOMPTR = PreparedModel(inputOMPTR)
+        
+        # Save the instance pointer of the prepared inputs
         self.__inputOMPTR = inputOMPTR
         
         # Set custom WaitingTime class
         self.__custom_waiting = custom_waiting
+        
+        # Random number generator for failure events
+        self.__random_state = random_state
+        
+        # Optional sampler for failure events of the array
+        self.__failure_sampler = failure_sampler
 
         # Read the inputs from core
         self.__Farm_OM          = self.__inputOMPTR.get_Farm_OM()
@@ -736,8 +3019,15 @@ class LCOE_Calculator(object):
         self.__Logistic_Param   = self.__inputOMPTR.get_Logistic_Param()
         self.__Simu_Param       = self.__inputOMPTR.get_Simu_Param()
         self.__Control_Param    = self.__inputOMPTR.get_Control_Param()
-
-        self.__changeOfLabels()
+        
+        # Parameters of each component and failure mode, converted once
+        self.__componentRecords = self.__inputOMPTR.get_records("Component")
+        self.__failureModeRecords = self.__inputOMPTR.get_records(
+                                                            "Failure_Mode")
+        self.__repairActionRecords = self.__inputOMPTR.get_records(
+                                                            "Repair_Action")
+        self.__inspectionRecords = self.__inputOMPTR.get_records(
+                                                            "Inspection")
         # end: Read from inputOM
         #######################################################################
 
@@ -782,12 +3072,10 @@ class LCOE_Calculator(object):
         self.__NrOfTurnOffDevices = 0
 
         # Operation time in days
-        self.__operationTimeDay = self.__Simu_Param['missionTime'] * \
-                                                                self.__yearDays
+        self.__operationTimeDay = self.__inputOMPTR.get_operation_time_day()
 
         # End of array operation
-        self.__endOperationDate = self.__startOperationDate + \
-                                    timedelta(days=self.__operationTimeDay)
+        self.__endOperationDate = self.__inputOMPTR.get_end_operation_date()
 
         # Keys of eventsTable
         self.__UnCoMa_eventsTableKeys = ['failureRate',
@@ -895,26 +3183,8 @@ class LCOE_Calculator(object):
 
         # CAPEX of array in case of condition based maintenance strategy
         # (float) [Euro]
-        self.__outputsOfWP6['CapexOfArray [Euro]'] = 0
-
-        # determine the CAPEX of the array
-        if self.__Farm_OM['condition_based_maintenance'] == True:
-
-            for iCnt in range(0,self.__Failure_Mode.shape[1]):
-
-                column = self.__Failure_Mode.columns.values[iCnt]
-                failure_mode = self.__Failure_Mode[column]
-                failure_mode = failure_mode.apply(pd.to_numeric,
-                                                  errors="ignore")
-                
-                capex_condition = failure_mode[
-                                         'CAPEX_condition_based_maintenance']
-
-                if not math.isnan(capex_condition) and capex_condition > 0:
-
-                    self.__outputsOfWP6['CapexOfArray [Euro]'] = \
-                        self.__outputsOfWP6['CapexOfArray [Euro]'] + \
-                            capex_condition
+        self.__outputsOfWP6['CapexOfArray [Euro]'] = \
+                                    self.__inputOMPTR.get_condition_capex()
                             
         # Other metrics
         self.__outputsOfWP6["lifetimeOpex [Euro]"] = None
@@ -925,6 +3195,7 @@ class LCOE_Calculator(object):
         self.__outputsOfWP6["energyPerDevice [W]"] = None
         self.__outputsOfWP6["energyPerYear [W]"] = None
         self.__outputsOfWP6["numberOfJourneys [-]"] = None
+        self.__outputsOfWP6["likelihoodRatio [-]"] = 1.
 
         # end: Declaration of outputs of WP6
         #######################################################################
@@ -1081,10 +3352,12 @@ class LCOE_Calculator(object):
             self.__ram_network = network.set_failure_rates(
                             calcscenario=self.__RAM_Param['calcscenario'],
                             k_factors=self.__RAM_Param['kfactors'])
+            self.__ram_metrics = None
         
         else:
             
             self.__ram_network = ram_network
+            self.__ram_metrics = ram_metrics
         
 
         # end: Declaration of variables for RAM
@@ -1243,6 +3516,24 @@ class LCOE_Calculator(object):
             
             self.__PrepTimeCalcUnCoMa = 48
         
+        # Importance sampling factor for the array component failures
+        if ("importanceSamplingFactor" in self.__Control_Param and
+            self.__Control_Param["importanceSamplingFactor"] is not None):
+            
+            self.__importanceSamplingFactor = \
+                            self.__Control_Param["importanceSamplingFactor"]
+            
+            if self.__importanceSamplingFactor <= 0:
+                
+                errStr = ("Control parameter importanceSamplingFactor must "
+                          "be positive; however, it is set to {}").format(
+                                            self.__importanceSamplingFactor)
+                raise ValueError(errStr)
+        
+        else:
+            
+            self.__importanceSamplingFactor = None
+        
         # actual index of CaBaMa_eventsTable
         self.__actIdxOfCaBaMa = 0
         self.__flagCalcCaBaMa = False
@@ -1276,106 +3567,6 @@ class LCOE_Calculator(object):
 
         return
 
-    def __changeOfLabels(self):
-
-        '''__changeOfLabels function: changes the labels of some tables
-
-        '''
-
-        # Component -> Component_ID
-        # Component
-        col_map = dict(zip(self.__Component.columns,
-                           list(self.__Component.loc['Component_ID'])))
-
-        self.__Component.rename(columns=col_map, inplace=True)
-
-        # Component -> Component_ID
-        # Simu_Param
-        components = self.__Simu_Param['arrayInfoLogistic'].loc['Component_ID']
-        col_map = dict(zip(self.__Simu_Param['arrayInfoLogistic'].columns,
-                           list(components)))
-
-        self.__Simu_Param['arrayInfoLogistic'].rename(columns=col_map,
-                                                      inplace=True)
-
-        # Repair_Action
-        nuOfColumnsRA = self.__Repair_Action.shape[1]
-        idListRA = list(self.__Repair_Action.loc['Component_ID'])
-        fmListRA = list(self.__Repair_Action.loc['FM_ID'])
-
-        newColumnsRA = []
-        for iCnt in range(0,nuOfColumnsRA):
-            newColumnsRA.append('dummy')
-
-        # Inspection
-        nuOfColumnsInsp = self.__Inspection.shape[1]
-        idListInsp = list(self.__Inspection.loc['Component_ID'])
-        fmListInsp = list(self.__Inspection.loc['FM_ID'])
-        newColumnsInsp = []
-        for iCnt in range(0,nuOfColumnsInsp):
-            newColumnsInsp.append('dummy')
-
-        # Failure_Mode
-        nuOfColumns = self.__Failure_Mode.shape[1]
-        idList = list(self.__Failure_Mode.loc['Component_ID'])
-        fmList = list(self.__Failure_Mode.loc['FM_ID'])
-
-        newColumns = []
-        for iCnt in range(0,nuOfColumns):
-            if len(newColumns) == 0:
-                newColumns.append(idList[iCnt] + '_1')
-
-            else:
-                index = 0
-                for iCnt1 in range(0,len(newColumns)):
-                    if idList[iCnt] == string.rsplit(newColumns[iCnt1],'_')[0]:
-                         index = index + 1
-
-                if index == 0:
-                    newColumns.append(idList[iCnt] + '_1')
-                else:
-                    newColumns.append(idList[iCnt] + '_' + str(index + 1))
-
-            indexList = -1
-
-            for iCnt1 in range(0, nuOfColumnsRA):
-
-                if (idListRA[iCnt1] == idList[iCnt] and
-                    fmListRA[iCnt1] == fmList[iCnt]):
-
-                    indexList = iCnt1
-                    break
-
-            if indexList != -1:
-                newColumnsRA[indexList] = newColumns[-1]
-
-            indexList = -1
-
-            for iCnt1 in range(0, nuOfColumnsInsp):
-
-                if (idListInsp[iCnt1] == idList[iCnt] and
-                    fmListInsp[iCnt1] == fmList[iCnt]):
-
-                    indexList = iCnt1
-                    break
-
-            if indexList != -1:
-                newColumnsInsp[indexList] = newColumns[-1]
-
-        # Failure_Mode
-        col_map = dict(zip(self.__Failure_Mode.columns, newColumns))
-        self.__Failure_Mode.rename(columns=col_map, inplace=True)
-
-        # Repair_Action
-        col_map = dict(zip(self.__Repair_Action.columns, newColumnsRA))
-        self.__Repair_Action.rename(columns=col_map, inplace=True)
-
-        # Inspection
-        col_map = dict(zip(self.__Inspection.columns, newColumnsInsp))
-        self.__Inspection.rename(columns=col_map, inplace=True)
-
-        return
-
     def __call__(self):
 
         '''__call__ function: call function
@@ -1495,7 +3686,11 @@ class LCOE_Calculator(object):
                                 self.__operationTimeDay,
                                 self.__UnCoMa_eventsTableKeys,
                                 self.__NoPoisson_eventsTableKeys,
-                                self.__dtocean_maintenance_PRINT_FLAG)
+                                self.__dtocean_maintenance_PRINT_FLAG,
+                                self.__random_state,
+                                self.__failure_sampler,
+                                self.__importanceSamplingFactor,
+                                self.__ram_metrics)
 
         # Read from RAM and calculate the poisson events of failure rates
         (self.__arrayDict,
@@ -1507,6 +3702,10 @@ class LCOE_Calculator(object):
                                          self.__Component,
                                          self.__Failure_Mode,
                                          self.__annual_Energy_Production_perD)
+        
+        # Weight of the data point, if the failures were importance sampled
+        self.__outputsOfWP6["likelihoodRatio [-]"] = \
+                                    self.__arrayPTR.get_likelihood_ratio()
 
         if (self.__Farm_OM['calendar_based_maintenance'] == True or
             self.__Farm_OM['condition_based_maintenance'] == True):
@@ -1527,8 +3726,7 @@ class LCOE_Calculator(object):
                 indexFM = self.__eventsTableNoPoisson.indexFM[iCnt]
                 failureRate = self.__eventsTableNoPoisson.failureRate[iCnt]
                 
-                component = self.__Component[ComponentID]
-                component = component.apply(pd.to_numeric, errors="ignore")
+                component = self.__componentRecords[ComponentID]
                 interval = component['interval_calendar_based_maintenance']
                 threshold_percent = component['soh_threshold']
                 
@@ -1627,9 +3825,24 @@ class LCOE_Calculator(object):
 
                         frate = failureRateDummy / self.__yearDays
 
-                        poissonValue = poisson_process(currentStartActionDate,
-                                                       self.__operationTimeDay,
-                                                       frate)
+                        if self.__failure_sampler is None:
+                            
+                            poissonValue = poisson_process(
+                                                    currentStartActionDate,
+                                                    self.__operationTimeDay,
+                                                    frate,
+                                                    self.__random_state)
+                        
+                        else:
+                            
+                            failureModeKey = "CoBaMa_{}_{}".format(
+                                                                ComponentID,
+                                                                indexFM)
+                            poissonValue = self.__failure_sampler(
+                                                    failureModeKey,
+                                                    currentStartActionDate,
+                                                    self.__operationTimeDay,
+                                                    frate)
 
                         self.__arrayDict[ComponentID] \
                                         ['CoBaMa_FR List'] \
@@ -1757,9 +3970,7 @@ class LCOE_Calculator(object):
 
                 if not logic:
                 
-                    repair_action = self.__Repair_Action[CompIDWithIndex]
-                    repair_action = repair_action.apply(pd.to_numeric,
-                                                        errors="ignore")
+                    repair_action = self.__repairActionRecords[CompIDWithIndex]
                     # repairAction
                     shiftHoursDummy1 = repair_action['delay_spare']
 
@@ -1770,9 +3981,7 @@ class LCOE_Calculator(object):
                 else:
                     
                     # inspection
-                    inspection = self.__Inspection[CompIDWithIndex]
-                    inspection = inspection.apply(pd.to_numeric,
-                                                  errors="ignore")
+                    inspection = self.__inspectionRecords[CompIDWithIndex]
                     
                     shiftHoursDummy1 = 0
 
@@ -1797,27 +4006,18 @@ class LCOE_Calculator(object):
     
     def __initPorts(self):
         
-        outputsForPortSelection = pd.DataFrame(index=[0],
-                                               columns=self.__logisticKeys)
-        
         sp_dry_mass_dummy       = 0.01
         sp_length_dummy         = 0.01
         sp_width_dummy          = 0.01
         sp_height_dummy         = 0.01
         
-        self.__portDistIndex['inspection'] = []
-        self.__portDistIndex['repair']     = []
-        
-        for iCnt in range(0,len(self.__eventsTableNoPoisson)):
-            
-            ComponentID = self.__eventsTableNoPoisson.ComponentID[iCnt]
+        for ComponentID, indexFM in zip(
+                                self.__eventsTableNoPoisson.ComponentID,
+                                self.__eventsTableNoPoisson.indexFM):
             
-            indexFM = self.__eventsTableNoPoisson.indexFM[iCnt]
             CompIDWithIndex = ComponentID + '_' + str(indexFM)
             
-            failure_mode = self.__Failure_Mode[CompIDWithIndex]
-            failure_mode = failure_mode.apply(pd.to_numeric,
-                                              errors="ignore")
+            failure_mode = self.__failureModeRecords[CompIDWithIndex]
             
             # max of values
             sp_dry_mass = failure_mode['spare_mass']
@@ -1842,6 +4042,29 @@ class LCOE_Calculator(object):
                 
                 sp_height_dummy = sp_height
         
+        spare_dimensions = (sp_dry_mass_dummy,
+                            sp_length_dummy,
+                            sp_width_dummy,
+                            sp_height_dummy)
+        
+        # The selection depends only on the inputs, so it is shared by all
+        # data points using the same prepared inputs
+        portDistIndex = self.__inputOMPTR.get_port_selection(
+                            spare_dimensions,
+                            lambda: self.__selectPorts(*spare_dimensions))
+        
+        self.__portDistIndex = dict(portDistIndex)
+        
+        return
+    
+    def __selectPorts(self, sp_dry_mass_dummy,
+                            sp_length_dummy,
+                            sp_width_dummy,
+                            sp_height_dummy):
+        
+        outputsForPortSelection = pd.DataFrame(index=[0],
+                                               columns=self.__logisticKeys)
+        
         # Inspection case
         # *****************************************************************
         # *****************************************************************
@@ -1887,10 +4110,9 @@ class LCOE_Calculator(object):
                    "operations").format(port_name)
         module_logger.debug(msg_str)
         
-        self.__portDistIndex['inspection'].append(
-                om_port['Distance port-site [km]'])
-        self.__portDistIndex['inspection'].append(
-                om_port['Port database index [-]'])
+        portDistIndex = {}
+        portDistIndex['inspection'] = (om_port['Distance port-site [km]'],
+                                       om_port['Port database index [-]'])
         
         # Repair case
         # *****************************************************************
@@ -1938,12 +4160,10 @@ class LCOE_Calculator(object):
                    "operations").format(port_name)
         module_logger.debug(msg_str)
         
-        self.__portDistIndex['repair'].append(
-                om_port['Distance port-site [km]'])
-        self.__portDistIndex['repair'].append(
-                om_port['Port database index [-]'])
+        portDistIndex['repair'] = (om_port['Distance port-site [km]'],
+                                   om_port['Port database index [-]'])
         
-        return
+        return portDistIndex
     
     def __initCheck(self):
 
@@ -1970,9 +4190,7 @@ class LCOE_Calculator(object):
             CompIDWithIndex = ComponentID + \
                     '_' + str(self.__eventsTableNoPoisson.indexFM[iCnt])
             
-            failure_mode = self.__Failure_Mode[CompIDWithIndex]
-            failure_mode = failure_mode.apply(pd.to_numeric,
-                                              errors="ignore")
+            failure_mode = self.__failureModeRecords[CompIDWithIndex]
             
             # for logistic
             sp_dry_mass = failure_mode['spare_mass']
@@ -1994,9 +4212,7 @@ class LCOE_Calculator(object):
 
             if 'Insp' in FM_ID:
                 
-                inspection = self.__Inspection[CompIDWithIndex]
-                inspection = inspection.apply(pd.to_numeric,
-                                              errors="ignore")
+                inspection = self.__inspectionRecords[CompIDWithIndex]
 
                 # for logistic
                 technician = inspection['number_technicians'] + \
@@ -2006,9 +4222,7 @@ class LCOE_Calculator(object):
 
             else:
                 
-                repair_action = self.__Repair_Action[CompIDWithIndex]
-                repair_action = repair_action.apply(pd.to_numeric,
-                                                    errors="ignore")
+                repair_action = self.__repairActionRecords[CompIDWithIndex]
                 # for logistic
                 technician = repair_action['number_technicians'] + \
                              repair_action['number_specialists']
@@ -2522,8 +4736,7 @@ class LCOE_Calculator(object):
 
         # Calculate the cost of operation at alarm date
         # independent from inspection or repair action
-        failure_mode = self.__Failure_Mode[CompIDWithIndex]
-        failure_mode = failure_mode.apply(pd.to_numeric, errors="ignore")
+        failure_mode = self.__failureModeRecords[CompIDWithIndex]
         
         sp_dry_mass = failure_mode['spare_mass']
         sp_length   = failure_mode['spare_length']
@@ -2531,13 +4744,11 @@ class LCOE_Calculator(object):
         sp_height   = failure_mode['spare_height']
 
         if 'Insp' in FM_ID:
-            series = self.__Inspection[CompIDWithIndex]
+            series = self.__inspectionRecords[CompIDWithIndex]
             action = 'inspection'
         else:
-            series = self.__Repair_Action[CompIDWithIndex]
+            series = self.__repairActionRecords[CompIDWithIndex]
             action = 'repair'
-            
-        series = series.apply(pd.to_numeric, errors="ignore")
         
         if 'Insp' in FM_ID:
             d_om = series['duration_inspection']
@@ -3336,8 +5547,7 @@ class LCOE_Calculator(object):
 
                 if iCnt == 0:
 
-                    failure = self.__Failure_Mode[CompIDWithIndex]
-                    failure = failure.apply(pd.to_numeric, errors="ignore")
+                    failure = self.__failureModeRecords[CompIDWithIndex]
 
                     # independent from inspection or repair action
                     sp_dry_mass = failure['spare_mass']
@@ -3347,9 +5557,7 @@ class LCOE_Calculator(object):
 
                     if 'Insp' in FM_ID:
 
-                        inspection = self.__Inspection[CompIDWithIndex]
-                        inspection = inspection.apply(pd.to_numeric,
-                                                      errors="ignore")
+                        inspection = self.__inspectionRecords[CompIDWithIndex]
 
                         # For logistic
                         d_acc = inspection['duration_accessibility']
@@ -3371,8 +5579,7 @@ class LCOE_Calculator(object):
 
                     else:
 
-                        repair = self.__Repair_Action[CompIDWithIndex]
-                        repair = repair.apply(pd.to_numeric, errors="ignore")
+                        repair = self.__repairActionRecords[CompIDWithIndex]
 
                         # for logistic
                         d_acc = repair['duration_accessibility']
@@ -3828,8 +6035,7 @@ class LCOE_Calculator(object):
             
         # Check for nullification of failure from CaBaMa if the interval is
         # greater than zero
-        component = self.__Component[ComponentID]
-        component = component.apply(pd.to_numeric, errors="ignore")
+        component = self.__componentRecords[ComponentID]
         interval = component['interval_calendar_based_maintenance']
 
         if (self.__Farm_OM['calendar_based_maintenance'] == True and
@@ -3973,8 +6179,7 @@ class LCOE_Calculator(object):
             print 'WP6: FM_ID = ', FM_ID
 
         # independent from inspection or repair action
-        failure = self.__Failure_Mode[CompIDWithIndex]
-        failure = failure.apply(pd.to_numeric, errors="ignore")
+        failure = self.__failureModeRecords[CompIDWithIndex]
 
         sp_dry_mass = failure['spare_mass']
         sp_length = failure['spare_length']
@@ -3984,8 +6189,7 @@ class LCOE_Calculator(object):
         if 'Insp' in FM_ID:
 
             # For logistic
-            inspection = self.__Inspection[CompIDWithIndex]
-            inspection = inspection.apply(pd.to_numeric, errors="ignore")
+            inspection = self.__inspectionRecords[CompIDWithIndex]
 
             d_acc = inspection['duration_accessibility']
             d_om = inspection['duration_inspection']
@@ -4007,8 +6211,7 @@ class LCOE_Calculator(object):
         else:
 
             # for logistic
-            repair = self.__Repair_Action[CompIDWithIndex]
-            repair = repair.apply(pd.to_numeric, errors="ignore")
+            repair = self.__repairActionRecords[CompIDWithIndex]
 
             d_acc = repair['duration_accessibility']
             d_om = repair['duration_maintenance']
@@ -4452,16 +6655,14 @@ class LCOE_Calculator(object):
 
         if 'Insp' in FM_ID:
             
-            inspection = self.__Inspection[CompIDWithIndex]
-            inspection = inspection.apply(pd.to_numeric, errors="ignore")
+            inspection = self.__inspectionRecords[CompIDWithIndex]
 
             number_technicians = inspection['number_technicians']
             number_specialists = inspection['number_specialists']
 
         else:
             
-            repair_action = self.__Repair_Action[CompIDWithIndex]
-            repair_action = repair_action.apply(pd.to_numeric, errors="ignore")
+            repair_action = self.__repairActionRecords[CompIDWithIndex]
 
             number_technicians = repair_action['number_technicians']
             number_specialists = repair_action['number_specialists']
@@ -4471,8 +6672,7 @@ class LCOE_Calculator(object):
         wage_technician_day = self.__Farm_OM['wage_technician_day']
         wage_technician_night = self.__Farm_OM['wage_technician_night']
         
-        failure_mode = self.__Failure_Mode[CompIDWithIndex]
-        failure_mode = failure_mode.apply(pd.to_numeric, errors="ignore")
+        failure_mode = self.__failureModeRecords[CompIDWithIndex]
 
         # cost of OM for the current action [unit]
         cost_spare = failure_mode['cost_spare']
@@ -26,17 +26,30 @@ classes.
 .. moduleauthor:: Mathew Topper <mathew.topper@dataonlygreater.com>
 """
 
+import os
+import gzip
 import math
+import hashlib
+import time
 import bisect
-import random
+import pickle
+import shutil
+import socket
+import tempfile
+import logging
 import datetime
+from collections import namedtuple
 
 import numpy as np
 import pandas as pd
+from pandas.core.internals import BlockManager, make_block
 from dateutil.relativedelta import relativedelta
 
 from dtocean_economics.functions import get_present_values, get_lcoe
 
+# Set up logging
+module_logger = logging.getLogger(__name__)
+
 
 class Availability(object):
     
@@ -172,283 +185,2330 @@ class Energy(object):
         return dev_energy_series
 
 
-def get_uptime_df(commissioning_date,
-                  mission_time,
-                  device_ids,
-                  events_tables_dict):
+class ProgressReport(namedtuple("ProgressReport", ["n_complete",
+                                                   "n_total",
+                                                   "seconds_per_point",
+                                                   "eta",
+                                                   "summary"])):
     
-    # Calculate device uptime per year
-    end_date = commissioning_date + relativedelta(years=int(mission_time))
-    start_date_hour = commissioning_date.replace(microsecond=0,
-                                                 second=0,
-                                                 minute=0)
-    end_date_hour = end_date.replace(microsecond=0, second=0, minute=0)
-    uptime_dates = pd.date_range(start_date_hour, end_date_hour, freq="H")
+    """Progress of a LCOE_Statistics run.
     
-    uptime_dict = {"Date": uptime_dates}
+    Attributes:
+        n_complete (int): number of data points completed
+        n_total (int): maximum number of data points
+        seconds_per_point (float): mean time to evaluate a data point [s]
+        eta (float): estimated time to evaluate the remaining data points [s]
+        summary (pandas.DataFrame): running summary of the metrics, as
+            yielded by LCOE_Statistics.iter_data_points
     
-    for device_id in device_ids:
-        uptime_dict[device_id] = [1] * len(uptime_dates)
+    """
     
-    for event_df in events_tables_dict.itervalues():
-                    
-        repair_df = event_df.loc[:, ["repairActionRequestDate [-]",
-                                     "repairActionDate [-]",
-                                     "downtimeDuration [Hour]",
-                                     'downtimeDeviceList [-]']]
-        repair_df["repairActionRequestDate [-]"] = pd.to_datetime(
-                                repair_df["repairActionRequestDate [-]"])
-        repair_df["repairActionDate [-]"] = pd.to_datetime(
-                                repair_df["repairActionDate [-]"])
-        
-        for _, row in repair_df.iterrows():
-            
-            isnull = pd.isnull(row).all()
-            
-            if isnull: continue
-                                        
-            for device_id in row['downtimeDeviceList [-]']:
-            
-                downtime_start = row["repairActionDate [-]"]
-                downtime = row["downtimeDuration [Hour]"]
-                downtime_end = downtime_start + \
-                                     datetime.timedelta(hours=downtime)
-                                     
-                # Avoid zero downtime events
-                if downtime_start == downtime_end: continue
-            
-                downtime_start_hour = downtime_start.replace(microsecond=0,
-                                                             second=0,
-                                                             minute=0)
-                downtime_end_hour = downtime_end.replace(microsecond=0,
-                                                         second=0,
-                                                         minute=0)
-            
-                downtime_start_idx = bisect.bisect_right(uptime_dates,
-                                                         downtime_start_hour)
-                downtime_end_idx = bisect.bisect_left(uptime_dates,
-                                                      downtime_end_hour)
-                
-                n_zeros = downtime_end_idx - downtime_start_idx
-                
-                uptime_dict[device_id][
-                        downtime_start_idx:downtime_end_idx] = [0] * n_zeros
-                
-    uptime_df = pd.DataFrame(uptime_dict)
-    uptime_df = uptime_df.set_index("Date")
-                
-    return uptime_df
+    __slots__ = ()
 
 
-def get_device_energy_df(uptime_df, device_ids, mean_power_per_device):
+class DataPointAccumulator(object):
     
-    uptime_df = uptime_df.resample("A").sum()
-    uptime_df.index = uptime_df.index.map(lambda x: x.year)
+    """Collect the results of the data points of the statistical population.
+    The per year and per device results are stored in preallocated arrays,
+    with one column per data point, and are only converted to DataFrames
+    when the output is requested.
     
-    # Energy calculation
-    dev_energy_dict = {device_id: [] for device_id in device_ids}
+    Summary statistics of each metric and of the OPEX of each year are also
+    maintained as the data points arrive, using the SummaryStatistics class.
     
-    for _, row in uptime_df.iterrows():
-        for device_id in device_ids:
-            year_energy = row[device_id] * mean_power_per_device[device_id]
-            dev_energy_dict[device_id].append(year_energy)
-            
-    dev_energy_dict["Year"] = list(uptime_df.index.values)
-    dev_energy_df = pd.DataFrame(dev_energy_dict)
-    dev_energy_df = dev_energy_df.set_index("Year")
-                    
-    dev_energy_df["Energy"] = dev_energy_df.sum(1)
-    dev_energy_df = dev_energy_df.reset_index()
+    The event tables of each data point are kept in memory by default. They
+    can be discarded, by setting keep_events_tables to False, or passed to
+    an alternative store with an append method, such as EventTablesStore.
     
-    return dev_energy_df
-
-
-def get_opex_per_year(start_date,
-                      commissioning_date,
-                      mission_time,
-                      events_tables_dict):
+    If the failures of the data points are importance sampled, their
+    likelihood ratios are used to weight the summary statistics and are
+    added to the metrics table.
     
-    start_year = start_date.year
-    commisioning_year = commissioning_date.year
-    end_year = commisioning_year + int(mission_time)
+    Args:
+        n_sims (int): expected number of data points
+        keep_events_tables (bool, optional): store the event tables of each
+            data point. Defaults to True
+        events_tables (object, optional): store for the event tables, with
+            an append method. Defaults to None, which stores the event
+            tables in a list
+        weighted (bool, optional): weight the data points by their
+            likelihood ratios. Defaults to False
+    
+    """
+    
+    metric_keys = ["lifetimeOpex [Euro]",
+                   "lifetimeEnergy [Wh]",
+                   "LCOEOpex [Euro/kWh]",
+                   "arrayDowntime [hour]",
+                   "arrayAvailability [-]",
+                   "numberOfJourneys [-]"]
+    
+    def __init__(self, n_sims,
+                       keep_events_tables=True,
+                       events_tables=None,
+                       weighted=False):
         
-    years = range(start_year, end_year + 1)
-    n_years = len(years)
-    year_idxs = range(n_years)
+        if not keep_events_tables:
+            events_tables = None
+        elif events_tables is None:
+            events_tables = []
+        
+        self._capacity = max(int(n_sims), 1)
+        self._n_points = 0
+        self._sim_numbers = []
+        self._metrics = {key: [] for key in self.metric_keys}
+        self._metric_summaries = {key: SummaryStatistics(weighted=weighted)
+                                                for key in self.metric_keys}
+        self._weighted = weighted
+        self._weights = []
+        self._opex_summaries = {}
+        self._events_tables = events_tables
+        self._capex = None
+        
+        # Allocated on receipt of the first data point
+        self._opex_years = None
+        self._energy_years = None
+        self._device_ids = None
+        self._year_opex = None
+        self._year_energy = None
+        self._device_downtime = None
+        self._device_energy = None
+        
+        return
     
-    eco_dict = {"Year": year_idxs,
-                "Cost": [0] * n_years}
+    def __len__(self):
+        return self._n_points
+    
+    def add(self, sim_number, data_point):
+        
+        """Add the results of a data point
+        
+        Args:
+            sim_number (int): index of the data point
+            data_point (dict): output of LCOE_Calculator
+        
+        """
+        
+        block = ResultBlock([sim_number],
+                            [data_point],
+                            self._events_tables is not None)
+        self.add_block(block)
+        
+        return
+    
+    def add_block(self, block, indices=None):
+        
+        """Add the results of the data points of a ResultBlock
+        
+        Args:
+            block (ResultBlock): results of the data points
+            indices (list, optional): positions of the data points to add
+                within the block. Defaults to None, which adds them all
+        
+        """
+        
+        if indices is None:
+            indices = range(len(block))
+        else:
+            indices = list(indices)
+        
+        if not indices: return
+        
+        if self._year_opex is None:
+            self._allocate(block.opex_years,
+                           block.energy_years,
+                           block.device_ids)
+        
+        n_new = len(indices)
+        
+        while self._n_points + n_new > self._capacity:
+            self._grow()
+        
+        cols = slice(self._n_points, self._n_points + n_new)
+        year_opex = block.year_opex[:, indices]
+        
+        self._year_opex[:, cols] = _reindex_rows(year_opex,
+                                                 block.opex_years,
+                                                 self._opex_years)
+        self._year_energy[:, cols] = _reindex_rows(
+                                            block.year_energy[:, indices],
+                                            block.energy_years,
+                                            self._energy_years)
+        self._device_downtime[:, cols] = _reindex_rows(
+                                            block.device_downtime[:, indices],
+                                            block.device_ids,
+                                            self._device_ids)
+        self._device_energy[:, cols] = _reindex_rows(
+                                            block.device_energy[:, indices],
+                                            block.device_ids,
+                                            self._device_ids)
+        
+        if self._weighted and block.likelihood_ratios is not None:
+            weights = block.likelihood_ratios[indices].tolist()
+        else:
+            weights = [1.] * n_new
+        
+        for key in self.metric_keys:
             
-    eco_df = pd.DataFrame(eco_dict)
-    eco_df = eco_df.set_index("Year")
+            values = block.metrics[key][indices].tolist()
+            self._metrics[key].extend(values)
             
-    for event_df in events_tables_dict.itervalues():
+            for value, weight in zip(values, weights):
+                self._metric_summaries[key].add(value, weight)
         
-        if event_df.isnull().values.all(): continue
+        for year, costs in zip(block.opex_years, year_opex):
+            
+            if year not in self._opex_summaries:
+                self._opex_summaries[year] = SummaryStatistics(
+                                                    weighted=self._weighted)
+            
+            for cost, weight in zip(costs, weights):
+                self._opex_summaries[year].add(cost, weight)
+        
+        if self._events_tables is not None:
+            
+            for index in indices:
+                
+                if block.events_tables is None:
+                    self._events_tables.append(None)
+                else:
+                    self._events_tables.append(block.events_tables[index])
+        
+        self._capex = block.capex[indices[-1]]
+        self._sim_numbers.extend(block.sim_numbers[index]
+                                                    for index in indices)
+        self._weights.extend(weights)
+        self._n_points += n_new
+        
+        return
     
-        event_df = event_df.dropna()
-        event_df = event_df.set_index("repairActionDate [-]")
-        event_df.index = pd.to_datetime(event_df.index)
+    def get_output_dict(self):
         
-        event_df = event_df[["ComponentType [-]",
-                             "costLogistic [Euro]",
-                             "costOM_Labor [Euro]",
-                             "costOM_Spare [Euro]"]]
-
-        # Prepare a dataframe for each component type
-        grouped = event_df.groupby("ComponentType [-]")
-        group_dict = {}
+        """Return the accumulated results of the statistical population
         
-        for name, comp_df in grouped:
-                
-            comp_df = comp_df.drop("ComponentType [-]", 1)
-            comp_df["Total Cost"] = \
-                            comp_df[["costLogistic [Euro]",
-                                     "costOM_Labor [Euro]",
-                                     "costOM_Spare [Euro]"]].sum(axis=1)
-            comp_df = comp_df.apply(pd.to_numeric)
-            comp_df = comp_df.resample("A").sum()
-            comp_df.index = comp_df.index.map(lambda x: x.year)
-            comp_df = comp_df.dropna()
-                            
-            group_dict[name] = comp_df
-
-        # Record energy and costs for each year
-        year_costs = []
+        Returns:
+            dict: statistical results, in the format of the output of
+                LCOE_Statistics
         
-        for year in years:
-
-            year_cost = 0.  
+        """
         
-            for name, comp_df in group_dict.items():
-                
-                if year not in comp_df.index: continue
-                    
-                year_series = comp_df.loc[year]
-                year_cost += year_series["Total Cost"]
-                                  
-            year_costs.append(year_cost)
+        n_points = self._n_points
+        sim_numbers = self._sim_numbers
+        
+        if self._year_opex is None:
             
-        year_dict = {"Year": year_idxs,
-                     "Cost": year_costs}
-
-        year_df = pd.DataFrame(year_dict)
-        year_df = year_df.set_index("Year")
+            year_opex_df = pd.DataFrame()
+            year_energies_df = pd.DataFrame()
+            device_downtime_df = pd.DataFrame()
+            device_energies_df = pd.DataFrame()
         
-        eco_df = eco_df.add(year_df)
+        else:
+            
+            year_opex_df = pd.DataFrame(
+                    self._year_opex[:, :n_points],
+                    index=pd.Index(self._opex_years, name="Year"),
+                    columns=["Cost {} [Euro]".format(i) for i in sim_numbers])
+            
+            year_energies_df = pd.DataFrame(
+                    self._year_energy[:, :n_points],
+                    index=pd.Index(self._energy_years, name="Year"),
+                    columns=["Energy {} [Wh]".format(i) for i in sim_numbers])
+            
+            device_downtime_df = pd.DataFrame(
+                self._device_downtime[:, :n_points],
+                index=self._device_ids,
+                columns=["Downtime {} [hours]".format(i) for i in sim_numbers])
+            
+            device_energies_df = pd.DataFrame(
+                    self._device_energy[:, :n_points],
+                    index=self._device_ids,
+                    columns=["Energy {} [Wh]".format(i) for i in sim_numbers])
         
-    opex_per_year = eco_df.reset_index()
+        metrics_df = pd.DataFrame(self._metrics)
+        
+        if self._weighted:
+            metrics_df["likelihoodRatio [-]"] = self._weights
+        
+        if self._events_tables is None:
+            events_tables = []
+        elif isinstance(self._events_tables, list):
+            events_tables = list(self._events_tables)
+        else:
+            events_tables = self._events_tables
+        
+        metrics_summary_df = get_summary_df(self._metric_summaries)
+        opex_summary_df = get_summary_df(self._opex_summaries, "Year")
+        
+        output_dict = {"MetricsTable [-]": metrics_df,
+                       "MetricsSummary [-]": metrics_summary_df,
+                       "OpexPerYearSummary [Euro]": opex_summary_df,
+                       "OpexPerYear [Euro]": year_opex_df,
+                       "energyPerYear [Wh]": year_energies_df,
+                       "downtimePerDevice [hour]": device_downtime_df,
+                       "energyPerDevice [Wh]": device_energies_df,
+                       'eventTables [-]': events_tables,
+                       "CapexOfArray [Euro]": self._capex}
+        
+        return output_dict
     
-    return opex_per_year
+    def _allocate(self, opex_years, energy_years, device_ids):
+        
+        self._opex_years = list(opex_years)
+        self._energy_years = list(energy_years)
+        self._device_ids = sorted(device_ids)
+        
+        n_opex_years = len(self._opex_years)
+        n_energy_years = len(self._energy_years)
+        n_devices = len(self._device_ids)
+        
+        self._year_opex = np.zeros((n_opex_years, self._capacity))
+        self._year_energy = np.zeros((n_energy_years, self._capacity))
+        self._device_downtime = np.zeros((n_devices, self._capacity))
+        self._device_energy = np.zeros((n_devices, self._capacity))
+        
+        return
+    
+    def _grow(self):
+        
+        def extend(array):
+            extra = np.zeros((array.shape[0], self._capacity))
+            return np.hstack([array, extra])
+        
+        self._year_opex = extend(self._year_opex)
+        self._year_energy = extend(self._year_energy)
+        self._device_downtime = extend(self._device_downtime)
+        self._device_energy = extend(self._device_energy)
+        self._capacity *= 2
+        
+        return
 
 
-def get_opex_lcoe(opex_df, energy_df, discount_rate):
+class ResultBlock(object):
     
-    opex_costs = opex_df["Cost"].values
-    opex_years = opex_df["Year"].values
+    """Compact results of a block of data points, such as a chunk evaluated
+    by a worker process. Each metric is held in an array and the per year
+    and per device results in matrices, with one column per data point, so
+    the block is cheap to send between processes and can be added to a
+    DataPointAccumulator without building DataFrames for each data point.
     
-    present_opex = get_present_values(opex_costs,
-                                      opex_years,
-                                      discount_rate)
-    discounted_opex = present_opex.sum()
+    The rows of the matrices are set by the first data point, as for
+    DataPointAccumulator. The outputs of LCOE_Calculator are only kept if
+    keep_data_points is True, such as when they are written to a
+    checkpoint. Otherwise, get_data_point rebuilds them from the arrays.
     
-    energy_costs = energy_df["Energy"].values
-    energy_years = energy_df["Year"].values
+    Args:
+        sim_numbers (list): index of each data point
+        data_points (list): output of LCOE_Calculator for each data point
+        keep_events_tables (bool, optional): keep the event tables of each
+            data point. Defaults to True
+        keep_data_points (bool, optional): keep the output of
+            LCOE_Calculator for each data point. Defaults to False
     
-    present_energy = get_present_values(energy_costs,
-                                        energy_years,
-                                        discount_rate)
-    discounted_energy = present_energy.sum()
+    Attributes:
+        sim_numbers (list): index of each data point
+        metrics (dict): array of the values of each metric, keyed by
+            DataPointAccumulator.metric_keys
+        likelihood_ratios (numpy.ndarray): likelihood ratio of each data
+            point, or None if the failures are not importance sampled
+        capex (list): CAPEX of the array for each data point
+        opex_years (list): years of the rows of year_opex
+        year_opex (numpy.ndarray): OPEX of each year and data point
+        energy_years (list): years of the rows of year_energy
+        year_energy (numpy.ndarray): energy of each year and data point
+        device_ids (list): devices of the rows of the device matrices
+        device_downtime (numpy.ndarray): downtime of each device and data
+            point
+        device_energy (numpy.ndarray): energy of each device and data point
+        events_tables (list): event tables of each data point, or None if
+            they are not kept
+        data_points (list): output of LCOE_Calculator for each data point,
+            or None if they are not kept
     
-    lcoe = get_lcoe(discounted_opex, discounted_energy)
+    """
     
-    return lcoe
-
-
-def get_number_of_journeys(events_tables_dict):
+    def __init__(self, sim_numbers,
+                       data_points,
+                       keep_events_tables=True,
+                       keep_data_points=False):
+        
+        year_opex = [x["OpexPerYear [Euro]"].set_index("Year")["Cost"]
+                                                        for x in data_points]
+        year_energy = [x["energyPerYear [Wh]"].set_index("Year")["Energy"]
+                                                        for x in data_points]
+        downtimes = [x["downtimePerDevice [hour]"] for x in data_points]
+        energies = [x["energyPerDevice [Wh]"] for x in data_points]
+        
+        if data_points:
+            opex_years = list(year_opex[0].index)
+            energy_years = list(year_energy[0].index)
+            device_ids = sorted(downtimes[0].keys())
+        else:
+            opex_years = []
+            energy_years = []
+            device_ids = []
+        
+        self.sim_numbers = list(sim_numbers)
+        self.metrics = {key: np.array([x[key] for x in data_points])
+                                for key in DataPointAccumulator.metric_keys}
+        self.capex = [x["CapexOfArray [Euro]"] for x in data_points]
+        self.opex_years = opex_years
+        self.year_opex = _get_columns([x.reindex(opex_years).values
+                                                        for x in year_opex],
+                                      len(opex_years))
+        self.energy_years = energy_years
+        self.year_energy = _get_columns([x.reindex(energy_years).values
+                                                    for x in year_energy],
+                                        len(energy_years))
+        self.device_ids = device_ids
+        self.device_downtime = _get_columns(
+                    [[x.get(device_id, np.nan) for device_id in device_ids]
+                                                        for x in downtimes],
+                    len(device_ids))
+        self.device_energy = _get_columns(
+                    [[x.get(device_id, np.nan) for device_id in device_ids]
+                                                        for x in energies],
+                    len(device_ids))
+        
+        if any("likelihoodRatio [-]" in x for x in data_points):
+            self.likelihood_ratios = np.array(
+                        [x.get("likelihoodRatio [-]", 1.) for x in data_points])
+        else:
+            self.likelihood_ratios = None
+        
+        if keep_events_tables:
+            self.events_tables = [x['eventTables [-]'] for x in data_points]
+        else:
+            self.events_tables = None
+        
+        if not keep_data_points:
+            self.data_points = None
+        elif keep_events_tables:
+            self.data_points = list(data_points)
+        else:
+            
+            self.data_points = []
+            
+            for data_point in data_points:
+                data_point = dict(data_point)
+                data_point['eventTables [-]'] = None
+                self.data_points.append(data_point)
+        
+        return
     
-    total_ops = 0
+    def __len__(self):
+        return len(self.sim_numbers)
     
-    if not events_tables_dict['CaBaMa_eventsTable'].isnull().values.all():
+    def get_metrics(self, index):
         
-        total_ops += len(events_tables_dict['CaBaMa_eventsTable'])
+        """Return the metrics of a data point
         
-    if not events_tables_dict['CoBaMa_eventsTable'].isnull().values.all():
+        Args:
+            index (int): position of the data point within the block
         
-        total_ops += len(events_tables_dict['CoBaMa_eventsTable'])
-
-    if not events_tables_dict['UnCoMa_eventsTable'].isnull().values.all():
+        Returns:
+            dict: value of each metric, and the likelihood ratio of the data
+                point, if any
         
-        total_ops += len(events_tables_dict['UnCoMa_eventsTable'])
+        """
         
-    return total_ops
-
-
-def poisson_process(startOperationDate, simulationTime, failureRate):
-
-    '''poisson_process function: Estimation of random failure occurence of
-    components
-
-    Args:
-        startOperationDate (timedate) : start date of operation
-        simulationtime (float)        : simulation time [day]
-        failureRate (float)           : failure rate [1/day]
+        metrics = {key: values[index] for key, values in self.metrics.items()}
+        
+        if self.likelihood_ratios is not None:
+            metrics["likelihoodRatio [-]"] = self.likelihood_ratios[index]
+        
+        return metrics
+    
+    def get_data_point(self, index):
+        
+        """Return the output of LCOE_Calculator for a data point, rebuilt
+        from the arrays if it was not kept
+        
+        Args:
+            index (int): position of the data point within the block
+        
+        Returns:
+            dict: output of LCOE_Calculator
+        
+        """
+        
+        if self.data_points is not None: return self.data_points[index]
+        
+        data_point = self.get_metrics(index)
+        
+        data_point["OpexPerYear [Euro]"] = pd.DataFrame(
+                                        {"Year": self.opex_years,
+                                         "Cost": self.year_opex[:, index]},
+                                        columns=["Year", "Cost"])
+        data_point["energyPerYear [Wh]"] = pd.DataFrame(
+                                        {"Year": self.energy_years,
+                                         "Energy": self.year_energy[:, index]},
+                                        columns=["Year", "Energy"])
+        data_point["downtimePerDevice [hour]"] = dict(
+                        zip(self.device_ids, self.device_downtime[:, index]))
+        data_point["energyPerDevice [Wh]"] = dict(
+                        zip(self.device_ids, self.device_energy[:, index]))
+        data_point["CapexOfArray [Euro]"] = self.capex[index]
+        
+        if self.events_tables is None:
+            data_point['eventTables [-]'] = None
+        else:
+            data_point['eventTables [-]'] = self.events_tables[index]
+        
+        return data_point
+
+
+class EventTablesStore(object):
+    
+    """Sequence of the event tables of the data points of the statistical
+    population, saved to compressed pickle files in a directory. The tables
+    of each data point are only loaded when accessed.
+    
+    Args:
+        path (str): path to the directory in which to save the files. The
+            directory is created if it does not exist
+    
+    """
+    
+    def __init__(self, path):
+        
+        if not os.path.isdir(path): os.makedirs(path)
+        
+        self._path = path
+        self._file_names = []
+        
+        return
+    
+    def __len__(self):
+        return len(self._file_names)
+    
+    def __getitem__(self, index):
+        
+        file_path = os.path.join(self._path, self._file_names[index])
+        
+        with gzip.open(file_path, "rb") as f:
+            events_tables = pickle.load(f)
+        
+        return events_tables
+    
+    def __iter__(self):
+        
+        for index in xrange(len(self)):
+            yield self[index]
+    
+    def append(self, events_tables):
+        
+        """Save the event tables of a data point
+        
+        Args:
+            events_tables (dict): event tables of the data point
+        
+        """
+        
+        file_name = "eventTables_{}.pkl.gz".format(len(self._file_names))
+        file_path = os.path.join(self._path, file_name)
+        
+        with gzip.open(file_path, "wb") as f:
+            pickle.dump(events_tables, f, pickle.HIGHEST_PROTOCOL)
+        
+        self._file_names.append(file_name)
+        
+        return
+
+
+class Checkpoint(object):
+    
+    """Append only file store of the completed data points of the statistical
+    population. The file starts with a header holding the master seed, a
+    key of the inputs and the size of the population, followed by one
+    pickled record per data point. Records are flushed to
+    disk after every interval data points. An incomplete final record, left
+    by an interrupted run, is discarded on resumption.
+    
+    Args:
+        path (str): path to the checkpoint file
+        interval (int, optional): number of data points between writes to
+            disk. Defaults to 1
+    
+    """
+    
+    def __init__(self, path, interval=1):
+        
+        self._path = path
+        self._interval = max(int(interval), 1)
+        self._file = None
+        self._n_unsaved = 0
+        
+        return
+    
+    def start(self, master_seed, inputs_key=None, n_sims=None):
+        
+        """Start a new checkpoint file, replacing any existing file
+        
+        Args:
+            master_seed (int): seed of the statistical population
+            inputs_key (str, optional): key of the inputs of the statistical
+                population. Defaults to None
+            n_sims (int, optional): size of the statistical population.
+                Defaults to None
+        
+        """
+        
+        self.close()
+        
+        self._file = open(self._path, "wb")
+        header = {"master_seed": master_seed,
+                  "inputs_key": inputs_key,
+                  "n_sims": n_sims}
+        pickle.dump(header, self._file, pickle.HIGHEST_PROTOCOL)
+        self._sync()
+        
+        return
+    
+    def resume(self, inputs_key=None, n_sims=None):
+        
+        """Read the completed data points from an existing checkpoint file and
+        prepare it for adding further data points. The file is only resumed
+        if it was started with the given inputs key and population size, so
+        that data points of different populations are never mixed.
+        
+        Args:
+            inputs_key (str, optional): key of the inputs of the statistical
+                population. Defaults to None
+            n_sims (int, optional): size of the statistical population.
+                Defaults to None
+        
+        Returns:
+            tuple: master seed (int) and list of (index, data point) tuples
+        
+        """
+        
+        self.close()
+        
+        if not os.path.isfile(self._path):
+            
+            errStr = "Checkpoint file '{}' does not exist".format(self._path)
+            raise IOError(errStr)
+        
+        records = []
+        
+        with open(self._path, "rb") as f:
+            
+            header = pickle.load(f)
+            valid_size = f.tell()
+            
+            if header.get("inputs_key") != inputs_key:
+                
+                errStr = ("The inputs of checkpoint file '{}' do not match "
+                          "the inputs of the run").format(self._path)
+                raise ValueError(errStr)
+            
+            checkpoint_n_sims = header.get("n_sims")
+            
+            if checkpoint_n_sims != n_sims:
+                
+                errStr = ("The population size of checkpoint file '{}' is {} "
+                          "which does not match parameter "
+                          "numberOfSimulations, set to {}").format(
+                                                            self._path,
+                                                            checkpoint_n_sims,
+                                                            n_sims)
+                raise ValueError(errStr)
+            
+            while True:
+                
+                try:
+                    record = pickle.load(f)
+                except (EOFError, pickle.UnpicklingError, ValueError,
+                        AttributeError, IndexError, KeyError, TypeError):
+                    break
+                
+                records.append(record)
+                valid_size = f.tell()
+        
+        self._file = open(self._path, "r+b")
+        self._file.seek(valid_size)
+        self._file.truncate()
+        
+        return header["master_seed"], records
+    
+    def add(self, sim_number, data_point):
+        
+        """Add a completed data point
+        
+        Args:
+            sim_number (int): index of the data point
+            data_point (dict): output of LCOE_Calculator
+        
+        """
+        
+        pickle.dump((sim_number, data_point),
+                    self._file,
+                    pickle.HIGHEST_PROTOCOL)
+        
+        self._n_unsaved += 1
+        
+        if self._n_unsaved >= self._interval: self._sync()
+        
+        return
+    
+    def close(self):
+        
+        if self._file is None: return
+        
+        self._sync()
+        self._file.close()
+        self._file = None
+        
+        return
+    
+    def _sync(self):
+        
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._n_unsaved = 0
+        
+        return
+
+
+class SharedFrame(object):
+    
+    """Picklable handle to a DataFrame saved to memory mapped files, so that
+    it can be broadcast to worker processes once and attached without
+    copying. The numeric columns of each data type are saved to one file as
+    a two dimensional array, which is mapped copy-on-write and used
+    directly as the block of those columns. The pages are shared between
+    processes unless they are modified. Other columns are held by the
+    handle.
+    
+    Args:
+        path (str): path to the directory holding the files
+        columns (list): column labels
+        index (pandas.Index): index of the DataFrame
+        blocks (list): file name and column positions of each mapped block
+        objects (dict): values of the columns held by the handle, keyed by
+            column position
+    
+    """
+    
+    def __init__(self, path, columns, index, blocks, objects):
+        
+        self._path = path
+        self._columns = columns
+        self._index = index
+        self._blocks = blocks
+        self._objects = objects
+        
+        return
+    
+    @classmethod
+    def create(cls, df, dir_path=None):
+        
+        """Save a DataFrame to memory mapped files in a new temporary
+        directory
+        
+        Args:
+            df (pandas.DataFrame): table to share
+            dir_path (str, optional): directory in which to create the
+                temporary directory, e.g. /dev/shm. Defaults to the system
+                temporary directory
+        
+        Returns:
+            SharedFrame: handle to the saved table
+        
+        """
+        
+        path = tempfile.mkdtemp(prefix="dtocean_maintenance_", dir=dir_path)
+        dtype_positions = {}
+        objects = {}
+        
+        for i in xrange(len(df.columns)):
+            
+            values = df.iloc[:, i].values
+            
+            # Extension types (e.g. time zone aware dates) are not mapped
+            if (len(df) > 0 and
+                values.dtype == df.dtypes.iloc[i] and
+                values.dtype.kind in "biufcM"):
+                
+                dtype_positions.setdefault(values.dtype, []).append(i)
+            
+            else:
+                
+                objects[i] = values
+        
+        blocks = []
+        
+        for dtype, positions in dtype_positions.iteritems():
+            
+            # Blocks hold one row per column
+            values = np.empty((len(positions), len(df)), dtype=dtype)
+            
+            for j, i in enumerate(positions):
+                values[j] = df.iloc[:, i].values
+            
+            file_name = "block_{}.npy".format(len(blocks))
+            np.save(os.path.join(path, file_name), values)
+            blocks.append((file_name, positions))
+        
+        return cls(path, list(df.columns), df.index, blocks, objects)
+    
+    def load(self):
+        
+        """Return the DataFrame, with the blocks of the numeric columns mapped
+        from their files
+        
+        Returns:
+            pandas.DataFrame: shared table
+        
+        """
+        
+        mapped = sorted(i for _, positions in self._blocks
+                                                    for i in positions)
+        placements = {i: j for j, i in enumerate(mapped)}
+        blocks = []
+        
+        for file_name, positions in self._blocks:
+            
+            values = np.load(os.path.join(self._path, file_name),
+                             mmap_mode="c")
+            placement = [placements[i] for i in positions]
+            blocks.append(make_block(values, placement=placement))
+        
+        if blocks:
+            
+            # Building the manager directly avoids consolidating (and so
+            # copying) the mapped blocks
+            items = pd.Index([self._columns[i] for i in mapped])
+            manager = BlockManager(blocks, [items, self._index])
+            df = pd.DataFrame(manager)
+        
+        else:
+            
+            df = pd.DataFrame(index=self._index)
+        
+        for i in sorted(self._objects):
+            df.insert(i,
+                      self._columns[i],
+                      self._objects[i],
+                      allow_duplicates=True)
+        
+        return df
+    
+    def get_path(self):
+        
+        """Return the path to the directory holding the files"""
+        
+        return self._path
+    
+    def remove(self):
+        
+        """Delete the files of the shared table. Files which are mapped by a
+        process can not be deleted on some platforms, such as Windows.
+        
+        Returns:
+            bool: True if the files were deleted
+        
+        """
+        
+        shutil.rmtree(self._path, ignore_errors=True)
+        
+        return not os.path.isdir(self._path)
+
+
+class FileWorkQueue(object):
+    
+    """Queue of the data points of the statistical population, held in a
+    directory which may be shared between several hosts. Each submission is
+    a run with its own identifier and directory, holding its inputs and
+    master seed, so that several runs can be queued at once. Each data
+    point is a task file, which is claimed by a worker by atomically
+    renaming it into the "claimed" directory of its run. Results are
+    written to a temporary file and then renamed into the "results"
+    directory of the run, so that only complete results are ever visible.
+    
+    Args:
+        path (str): path to the queue directory
+    
+    """
+    
+    def __init__(self, path):
+        
+        self._path = path
+        self._runs_path = os.path.join(path, "runs")
+        
+        return
+    
+    def submit(self, inputOMPtr, master_seed, sim_numbers):
+        
+        """Add a run of data points to the queue. The run is prepared in a
+        hidden directory and then renamed into place, so that workers only
+        see complete runs.
+        
+        Args:
+            inputOMPtr (class): pointer of class inputOM
+            master_seed (int): seed of the statistical population
+            sim_numbers (list): indices of the data points
+        
+        Returns:
+            str: identifier of the run
+        
+        """
+        
+        if not os.path.isdir(self._runs_path): os.makedirs(self._runs_path)
+        
+        # Identifiers sort in order of submission
+        run_id = "{:016d}_{}_{}_{}".format(int(time.time() * 1e6),
+                                           socket.gethostname(),
+                                           os.getpid(),
+                                           os.urandom(4).encode("hex"))
+        temp_path = os.path.join(self._runs_path, "." + run_id)
+        
+        os.makedirs(os.path.join(temp_path, "tasks"))
+        os.makedirs(os.path.join(temp_path, "claimed"))
+        os.makedirs(os.path.join(temp_path, "results"))
+        
+        _write_pickle(os.path.join(temp_path, "inputs.pkl"),
+                      (inputOMPtr, master_seed))
+        
+        for sim_number in sim_numbers:
+            task_path = os.path.join(temp_path,
+                                     "tasks",
+                                     _get_task_name(sim_number))
+            open(task_path, "wb").close()
+        
+        os.rename(temp_path, self._get_run_path(run_id))
+        
+        return run_id
+    
+    def get_runs(self):
+        
+        """Return the identifiers of the queued runs, in order of submission
+        
+        Returns:
+            list: run identifiers (str)
+        
+        """
+        
+        if not os.path.isdir(self._runs_path): return []
+        
+        return sorted(x for x in os.listdir(self._runs_path)
+                                                    if not x.startswith("."))
+    
+    def get_inputs(self, run_id):
+        
+        """Return the inputs of a run
+        
+        Args:
+            run_id (str): identifier of the run
+        
+        Returns:
+            tuple: pointer of class inputOM and master seed (int)
+        
+        """
+        
+        inputs_path = os.path.join(self._get_run_path(run_id), "inputs.pkl")
+        
+        with open(inputs_path, "rb") as f:
+            inputs = pickle.load(f)
+        
+        return inputs
+    
+    def claim(self, run_id=None):
+        
+        """Claim the queued data point with the lowest index of the given run
+        or, if not given, of the earliest run with queued data points
+        
+        Args:
+            run_id (str, optional): identifier of the run
+        
+        Returns:
+            tuple: identifier of the run and index of the data point (int)
+                or None if there are no queued data points
+        
+        """
+        
+        if run_id is None:
+            run_ids = self.get_runs()
+        else:
+            run_ids = [run_id]
+        
+        for run_id in run_ids:
+            
+            run_path = self._get_run_path(run_id)
+            tasks_path = os.path.join(run_path, "tasks")
+            
+            # The run may have been removed by its coordinator
+            try:
+                task_names = sorted(os.listdir(tasks_path))
+            except OSError:
+                continue
+            
+            for task_name in task_names:
+                
+                task_path = os.path.join(tasks_path, task_name)
+                claimed_path = os.path.join(run_path, "claimed", task_name)
+                
+                # Record the time of the claim, for requeue_stale, before
+                # the task is visible as claimed. The rename fails if
+                # another worker claimed the task first
+                try:
+                    os.utime(task_path, None)
+                    os.rename(task_path, claimed_path)
+                except OSError:
+                    continue
+                
+                return run_id, int(task_name)
+        
+        return None
+    
+    def complete(self, run_id, sim_number, result):
+        
+        """Store the result of a claimed data point. The result is discarded
+        if the run has been removed.
+        
+        Args:
+            run_id (str): identifier of the run
+            sim_number (int): index of the data point
+            result (ResultBlock): results of the data point
+        
+        """
+        
+        run_path = self._get_run_path(run_id)
+        results_path = os.path.join(run_path, "results")
+        task_name = _get_task_name(sim_number)
+        result_path = os.path.join(results_path, task_name + ".pkl.gz")
+        temp_path = os.path.join(results_path,
+                                 ".{}.{}.{}".format(task_name,
+                                                    socket.gethostname(),
+                                                    os.getpid()))
+        
+        try:
+            
+            with gzip.open(temp_path, "wb") as f:
+                pickle.dump(result, f, pickle.HIGHEST_PROTOCOL)
+            
+            os.rename(temp_path, result_path)
+        
+        except (IOError, OSError):
+            
+            msg = ("Discarded result of data point {} of removed run "
+                   "{}").format(sim_number, run_id)
+            module_logger.info(msg)
+            
+            _remove_file(temp_path)
+            
+            return
+        
+        _remove_file(os.path.join(run_path, "claimed", task_name))
+        
+        return
+    
+    def pop_result(self, run_id, sim_number):
+        
+        """Remove and return the result of a data point, if available
+        
+        Args:
+            run_id (str): identifier of the run
+            sim_number (int): index of the data point
+        
+        Returns:
+            ResultBlock: results of the data point or None if it is not
+                complete
+        
+        """
+        
+        result_path = os.path.join(self._get_run_path(run_id),
+                                   "results",
+                                   _get_task_name(sim_number) + ".pkl.gz")
+        
+        if not os.path.isfile(result_path): return None
+        
+        with gzip.open(result_path, "rb") as f:
+            result = pickle.load(f)
+        
+        _remove_file(result_path)
+        
+        return result
+    
+    def requeue_stale(self, run_id, max_age):
+        
+        """Return claimed data points of a run to the queue, if they were
+        claimed more than max_age seconds ago, e.g. by a worker which has
+        failed
+        
+        Args:
+            run_id (str): identifier of the run
+            max_age (float): maximum time to complete a data point [s]
+        
+        """
+        
+        run_path = self._get_run_path(run_id)
+        claimed_path = os.path.join(run_path, "claimed")
+        now = time.time()
+        
+        for task_name in os.listdir(claimed_path):
+            
+            task_path = os.path.join(claimed_path, task_name)
+            
+            try:
+                age = now - os.path.getmtime(task_path)
+                if age <= max_age: continue
+                os.rename(task_path,
+                          os.path.join(run_path, "tasks", task_name))
+            except OSError:
+                continue
+            
+            msg = "Requeued stale data point {}".format(int(task_name))
+            module_logger.warning(msg)
+        
+        return
+    
+    def cancel(self, run_id):
+        
+        """Remove a run from the queue, with its inputs, remaining data
+        points and results
+        
+        Args:
+            run_id (str): identifier of the run
+        
+        """
+        
+        run_path = self._get_run_path(run_id)
+        
+        if not os.path.isdir(run_path): return
+        
+        # Rename first, so that workers stop claiming its data points
+        removed_path = os.path.join(self._runs_path, ".removed_" + run_id)
+        
+        try:
+            os.rename(run_path, removed_path)
+        except OSError:
+            removed_path = run_path
+        
+        shutil.rmtree(removed_path, ignore_errors=True)
+        
+        return
+    
+    def _get_run_path(self, run_id):
+        return os.path.join(self._runs_path, run_id)
+
+
+class PortSelectionStore(object):
+    
+    """Store of the ports selected for operations, saved to pickle files in a
+    directory. Each selection is keyed by a hash of its inputs, so that it is
+    made once for any number of runs, or hosts sharing the directory.
+    
+    Args:
+        path (str): path to the directory in which to save the files. The
+            directory is created if it does not exist
+    
+    """
+    
+    def __init__(self, path):
+        
+        if not os.path.isdir(path): os.makedirs(path)
+        
+        self._path = path
+        
+        return
+    
+    def __contains__(self, key):
+        return os.path.isfile(self._get_file_path(key))
+    
+    def __getitem__(self, key):
+        
+        file_path = self._get_file_path(key)
+        
+        if not os.path.isfile(file_path): raise KeyError(key)
+        
+        with open(file_path, "rb") as f:
+            selection = pickle.load(f)
+        
+        return selection
+    
+    def __setitem__(self, key, selection):
+        _write_pickle(self._get_file_path(key), selection)
+    
+    def _get_file_path(self, key):
+        return os.path.join(self._path, "ports_{}.pkl".format(key))
+    
+    @classmethod
+    def get_key(cls, *inputs):
+        
+        """Return the key of a port selection
+        
+        Args:
+            inputs: picklable inputs of the selection
+        
+        Returns:
+            str: hash of the inputs
+        
+        """
+        
+        return hashlib.md5(pickle.dumps(inputs, 2)).hexdigest()
+
+
+def _write_pickle(path, obj):
+    
+    """Pickle an object to a temporary file and then rename it to the given
+    path, so that only complete files are ever visible"""
+    
+    temp_path = "{}.{}.{}".format(path,
+                                  socket.gethostname(),
+                                  os.getpid())
+    
+    with open(temp_path, "wb") as f:
+        pickle.dump(obj, f, pickle.HIGHEST_PROTOCOL)
+    
+    if os.path.isfile(path): os.remove(path)
+    os.rename(temp_path, path)
+    
+    return
+
+
+def _get_columns(columns, n_rows):
+    
+    """Return a matrix with the given columns"""
+    
+    values = np.empty((n_rows, len(columns)))
+    
+    for i, column in enumerate(columns):
+        values[:, i] = column
+    
+    return values
+
+
+def _reindex_rows(values, index, new_index):
+    
+    """Reorder the rows of a matrix, labelled by index, to match new_index.
+    Rows which are missing from index are filled with NaN."""
+    
+    if list(index) == list(new_index): return values
+    
+    positions = pd.Index(index).get_indexer(new_index)
+    found = positions >= 0
+    
+    result = np.full((len(new_index), values.shape[1]), np.nan)
+    result[found] = values[positions[found]]
+    
+    return result
+
+
+def _get_task_name(sim_number):
+    return "{:09d}".format(sim_number)
+
+
+def _remove_file(path):
+    
+    """Remove a file, ignoring its absence"""
+    
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    
+    return
+
+
+class ParameterRecord(object):
+    
+    """Read only record of the parameters in one column of an input table,
+    such as a single failure mode of the Failure_Mode table. Values are
+    looked up by parameter name, as for the column Series.
+    
+    Args:
+        index (dict): position of each parameter name in values. Shared by
+            the records of a table
+        values (list): parameter values
+        name (str, optional): column name
+    
+    """
+    
+    __slots__ = ("_index", "_values", "name")
+    
+    def __init__(self, index, values, name=None):
+        
+        self._index = index
+        self._values = values
+        self.name = name
+        
+        return
+    
+    def __getitem__(self, key):
+        return self._values[self._index[key]]
+    
+    def __contains__(self, key):
+        return key in self._index
+    
+    def __getstate__(self):
+        return (self._index, self._values, self.name)
+    
+    def __setstate__(self, state):
+        self._index, self._values, self.name = state
+    
+    def keys(self):
+        return sorted(self._index, key=self._index.get)
+
+
+def get_parameter_records(table):
+    
+    """Compile the columns of an input table, such as Failure_Mode, into
+    ParameterRecord objects, keyed by column name. Each value is converted to
+    a number, where possible, in the same way as applying pandas.to_numeric
+    to the column.
+    
+    Args:
+        table (pandas.DataFrame): parameters in rows, with one column per
+            item
+    
+    Returns:
+        dict: ParameterRecord for each column. For duplicated column names,
+            the last column is kept
+    
+    """
+    
+    index = {key: i for i, key in enumerate(table.index)}
+    records = {}
+    
+    for i, column in enumerate(table.columns):
+        
+        series = table.iloc[:, i].apply(pd.to_numeric, errors="ignore")
+        records[column] = ParameterRecord(index, list(series.values), column)
+    
+    return records
+
+
+def get_uptime_df(commissioning_date,
+                  mission_time,
+                  device_ids,
+                  events_tables_dict):
+    
+    # Calculate device uptime per year
+    end_date = commissioning_date + relativedelta(years=int(mission_time))
+    start_date_hour = commissioning_date.replace(microsecond=0,
+                                                 second=0,
+                                                 minute=0)
+    end_date_hour = end_date.replace(microsecond=0, second=0, minute=0)
+    uptime_dates = pd.date_range(start_date_hour, end_date_hour, freq="H")
+    
+    uptime_dict = {"Date": uptime_dates}
+    
+    for device_id in device_ids:
+        uptime_dict[device_id] = [1] * len(uptime_dates)
+    
+    for event_df in events_tables_dict.itervalues():
+                    
+        repair_df = event_df.loc[:, ["repairActionRequestDate [-]",
+                                     "repairActionDate [-]",
+                                     "downtimeDuration [Hour]",
+                                     'downtimeDeviceList [-]']]
+        repair_df["repairActionRequestDate [-]"] = pd.to_datetime(
+                                repair_df["repairActionRequestDate [-]"])
+        repair_df["repairActionDate [-]"] = pd.to_datetime(
+                                repair_df["repairActionDate [-]"])
+        
+        for _, row in repair_df.iterrows():
+            
+            isnull = pd.isnull(row).all()
+            
+            if isnull: continue
+                                        
+            for device_id in row['downtimeDeviceList [-]']:
+            
+                downtime_start = row["repairActionDate [-]"]
+                downtime = row["downtimeDuration [Hour]"]
+                downtime_end = downtime_start + \
+                                     datetime.timedelta(hours=downtime)
+                                     
+                # Avoid zero downtime events
+                if downtime_start == downtime_end: continue
+            
+                downtime_start_hour = downtime_start.replace(microsecond=0,
+                                                             second=0,
+                                                             minute=0)
+                downtime_end_hour = downtime_end.replace(microsecond=0,
+                                                         second=0,
+                                                         minute=0)
+            
+                downtime_start_idx = bisect.bisect_right(uptime_dates,
+                                                         downtime_start_hour)
+                downtime_end_idx = bisect.bisect_left(uptime_dates,
+                                                      downtime_end_hour)
+                
+                n_zeros = downtime_end_idx - downtime_start_idx
+                
+                uptime_dict[device_id][
+                        downtime_start_idx:downtime_end_idx] = [0] * n_zeros
+                
+    uptime_df = pd.DataFrame(uptime_dict)
+    uptime_df = uptime_df.set_index("Date")
+                
+    return uptime_df
+
+
+def get_device_energy_df(uptime_df, device_ids, mean_power_per_device):
+    
+    uptime_df = uptime_df.resample("A").sum()
+    uptime_df.index = uptime_df.index.map(lambda x: x.year)
+    
+    # Energy calculation
+    dev_energy_dict = {device_id: [] for device_id in device_ids}
+    
+    for _, row in uptime_df.iterrows():
+        for device_id in device_ids:
+            year_energy = row[device_id] * mean_power_per_device[device_id]
+            dev_energy_dict[device_id].append(year_energy)
+            
+    dev_energy_dict["Year"] = list(uptime_df.index.values)
+    dev_energy_df = pd.DataFrame(dev_energy_dict)
+    dev_energy_df = dev_energy_df.set_index("Year")
+                    
+    dev_energy_df["Energy"] = dev_energy_df.sum(1)
+    dev_energy_df = dev_energy_df.reset_index()
+    
+    return dev_energy_df
+
+
+def get_opex_per_year(start_date,
+                      commissioning_date,
+                      mission_time,
+                      events_tables_dict):
+    
+    start_year = start_date.year
+    commisioning_year = commissioning_date.year
+    end_year = commisioning_year + int(mission_time)
+        
+    years = range(start_year, end_year + 1)
+    n_years = len(years)
+    year_idxs = range(n_years)
+    
+    eco_dict = {"Year": year_idxs,
+                "Cost": [0] * n_years}
+            
+    eco_df = pd.DataFrame(eco_dict)
+    eco_df = eco_df.set_index("Year")
+            
+    for event_df in events_tables_dict.itervalues():
+        
+        if event_df.isnull().values.all(): continue
+    
+        event_df = event_df.dropna()
+        event_df = event_df.set_index("repairActionDate [-]")
+        event_df.index = pd.to_datetime(event_df.index)
+        
+        event_df = event_df[["ComponentType [-]",
+                             "costLogistic [Euro]",
+                             "costOM_Labor [Euro]",
+                             "costOM_Spare [Euro]"]]
+
+        # Prepare a dataframe for each component type
+        grouped = event_df.groupby("ComponentType [-]")
+        group_dict = {}
+        
+        for name, comp_df in grouped:
+                
+            comp_df = comp_df.drop("ComponentType [-]", 1)
+            comp_df["Total Cost"] = \
+                            comp_df[["costLogistic [Euro]",
+                                     "costOM_Labor [Euro]",
+                                     "costOM_Spare [Euro]"]].sum(axis=1)
+            comp_df = comp_df.apply(pd.to_numeric)
+            comp_df = comp_df.resample("A").sum()
+            comp_df.index = comp_df.index.map(lambda x: x.year)
+            comp_df = comp_df.dropna()
+                            
+            group_dict[name] = comp_df
+
+        # Record energy and costs for each year
+        year_costs = []
+        
+        for year in years:
+
+            year_cost = 0.  
+        
+            for name, comp_df in group_dict.items():
+                
+                if year not in comp_df.index: continue
+                    
+                year_series = comp_df.loc[year]
+                year_cost += year_series["Total Cost"]
+                                  
+            year_costs.append(year_cost)
+            
+        year_dict = {"Year": year_idxs,
+                     "Cost": year_costs}
+
+        year_df = pd.DataFrame(year_dict)
+        year_df = year_df.set_index("Year")
+        
+        eco_df = eco_df.add(year_df)
+        
+    opex_per_year = eco_df.reset_index()
+    
+    return opex_per_year
+
+
+def get_opex_lcoe(opex_df, energy_df, discount_rate):
+    
+    opex_costs = opex_df["Cost"].values
+    opex_years = opex_df["Year"].values
+    
+    present_opex = get_present_values(opex_costs,
+                                      opex_years,
+                                      discount_rate)
+    discounted_opex = present_opex.sum()
+    
+    energy_costs = energy_df["Energy"].values
+    energy_years = energy_df["Year"].values
+    
+    present_energy = get_present_values(energy_costs,
+                                        energy_years,
+                                        discount_rate)
+    discounted_energy = present_energy.sum()
+    
+    lcoe = get_lcoe(discounted_opex, discounted_energy)
+    
+    return lcoe
+
+
+def get_number_of_journeys(events_tables_dict):
+    
+    total_ops = 0
+    
+    if not events_tables_dict['CaBaMa_eventsTable'].isnull().values.all():
+        
+        total_ops += len(events_tables_dict['CaBaMa_eventsTable'])
+        
+    if not events_tables_dict['CoBaMa_eventsTable'].isnull().values.all():
+        
+        total_ops += len(events_tables_dict['CoBaMa_eventsTable'])
+
+    if not events_tables_dict['UnCoMa_eventsTable'].isnull().values.all():
+        
+        total_ops += len(events_tables_dict['UnCoMa_eventsTable'])
+        
+    return total_ops
+
+
+def get_data_point_random_state(master_seed, sim_number):
+    
+    """Return an independent random number generator for a data point of
+    the statistical population. The generator is derived from the master seed
+    and the data point index, so its stream does not depend on the order in
+    which the data points are evaluated.
+    
+    Args:
+        master_seed (int): seed of the statistical population
+        sim_number (int): index of the data point
+    
+    Returns:
+        numpy.random.RandomState: data point random number generator
+    
+    """
+    
+    return np.random.RandomState([master_seed, sim_number])
+
+
+class StratifiedFailureSampler(object):
+    
+    """Sample the failure events of the failure modes of the array for a data
+    point of the statistical population, stratifying the number of failures
+    across the population.
+    
+    The number of failures of each failure mode is found from the inverse
+    cumulative Poisson distribution of a point of a scrambled van der Corput
+    sequence, indexed by the data point number. The scrambling is random, but
+    fixed for each failure mode and master seed, so that the first 2 ** m data
+    points of the population place exactly one point in each of 2 ** m equal
+    strata of probability, for every m. Different failure modes are scrambled
+    independently. Given the number of failures, the failure times are
+    uniformly distributed over the simulation time, as for a Poisson process.
+    
+    Args:
+        master_seed (int): seed of the statistical population
+        sim_number (int): index of the data point
+        random_state (numpy.random.RandomState, optional): random number
+            generator for the position of the sample within its stratum and
+            the failure times. Defaults to the global numpy generator.
+    
+    """
+    
+    n_digits = 24
+    
+    def __init__(self, master_seed, sim_number, random_state=None):
+        
+        if random_state is None: random_state = np.random
+        
+        self._master_seed = master_seed
+        self._sim_number = sim_number
+        self._random_state = random_state
+        
+        return
+    
+    def __call__(self, key,
+                       startOperationDate,
+                       simulationTime,
+                       failureRate):
+        
+        """Sample the failure events of a failure mode.
+        
+        Args:
+            key (str): unique identifier of the failure mode
+            startOperationDate (datetime) : start date of operation
+            simulationTime (float)        : simulation time [day]
+            failureRate (float)           : failure rate [1/day]
+        
+        Returns:
+            FailureDates: dates of the failure events
+        
+        """
+        
+        probability = self.get_probability(key)
+        n_failures = get_poisson_quantile(failureRate * simulationTime,
+                                          probability)
+        
+        if n_failures == 0: return FailureDates(0)
+        
+        times = np.sort(self._random_state.random_sample(n_failures) *
+                                                                simulationTime)
+        timeStep = np.diff(np.concatenate(([0.], times)))
+        
+        return _get_failure_dates(startOperationDate,
+                                  simulationTime,
+                                  timeStep)
+    
+    def get_probability(self, key):
+        
+        """Return the stratified cumulative probability of the data point for
+        the given failure mode.
+        
+        Args:
+            key (str): unique identifier of the failure mode
+        
+        Returns:
+            float: probability, between 0 and 1
+        
+        """
+        
+        index = self._sim_number
+        prefix = 1
+        probability = 0.
+        
+        # Nested (Owen) scrambling of the digits of the radical inverse
+        for i in xrange(self.n_digits):
+            
+            digit = (index & 1) ^ self._get_flip(key, prefix)
+            probability += digit * 0.5 ** (i + 1)
+            
+            prefix = (prefix << 1) | (index & 1)
+            index >>= 1
+        
+        jitter = self._random_state.random_sample() * 0.5 ** self.n_digits
+        
+        return probability + jitter
+    
+    def _get_flip(self, key, prefix):
+        
+        token = "{}:{}:{}".format(self._master_seed, key, prefix)
+        digest = hashlib.md5(token.encode("utf-8")).digest()
+        
+        return bytearray(digest)[0] & 1
+
+
+class FailureTimelines(object):
+    
+    """Failure times of a set of failure modes, presampled for a block of
+    data points of the statistical population in one vectorised pass.
+    
+    The failure times of every data point and failure mode are stored in a
+    single ragged array, sorted within each (data point, failure mode)
+    segment, with the segment boundaries given by an array of offsets. The
+    times of the whole block are drawn from one generator, derived from the
+    master seed, the first data point and the size of the block, so they
+    are only reproducible if the blocks are always formed from the same
+    data points, such as by aligning them to multiples of the block size.
+    
+    Use the sample class method to create a new object.
+    
+    Args:
+        keys (list): failure mode identifiers
+        rates (numpy.ndarray): failure rate of each failure mode [1/day]
+        sim_numbers (list): data point indices
+        simulationTime (float): simulation time [day]
+        times (numpy.ndarray): ragged array of failure times [day]
+        offsets (numpy.ndarray): start of the segment of each data point and
+            failure mode in times, with a final entry equal to its length
+    
+    """
+    
+    def __init__(self, keys,
+                       rates,
+                       sim_numbers,
+                       simulationTime,
+                       times,
+                       offsets):
+        
+        self._keys = {key: i for i, key in enumerate(keys)}
+        self._rates = rates
+        self._sim_numbers = {sim_number: i
+                                for i, sim_number in enumerate(sim_numbers)}
+        self._simulationTime = simulationTime
+        self._times = times
+        self._offsets = offsets
+        
+        return
+    
+    def __contains__(self, sim_number):
+        return sim_number in self._sim_numbers
+    
+    @classmethod
+    def sample(cls, failureRates, sim_numbers, simulationTime, master_seed):
+        
+        """Sample the failure times of the given failure modes and data
+        points as Poisson processes.
+        
+        Args:
+            failureRates (dict): failure rate [1/day] of each failure mode,
+                keyed by failure mode identifier
+            sim_numbers (list): data point indices
+            simulationTime (float): simulation time [day]
+            master_seed (int): seed of the statistical population
+        
+        Returns:
+            FailureTimelines
+        
+        """
+        
+        keys = sorted(failureRates)
+        rates = np.array([failureRates[key] for key in keys], dtype=float)
+        sim_numbers = list(sim_numbers)
+        first = sim_numbers[0] if sim_numbers else 0
+        
+        # Independent of the data point generators used by LCOE_Calculator
+        random_state = np.random.RandomState([master_seed,
+                                              first,
+                                              len(sim_numbers),
+                                              1])
+        
+        counts = random_state.poisson(rates * simulationTime,
+                                      (len(sim_numbers), len(keys))).ravel()
+        times = random_state.random_sample(counts.sum()) * simulationTime
+        
+        # Sort the times within each segment
+        segments = np.repeat(np.arange(len(counts)), counts)
+        times = times[np.lexsort((times, segments))]
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        
+        return cls(keys, rates, sim_numbers, simulationTime, times, offsets)
+    
+    def get_times(self, sim_number, key):
+        
+        """Return the sorted failure times of a failure mode for a data
+        point.
+        
+        Args:
+            sim_number (int): index of the data point
+            key (str): failure mode identifier
+        
+        Returns:
+            numpy.ndarray: failure times [day]
+        
+        """
+        
+        segment = self._sim_numbers[sim_number] * len(self._keys) + \
+                                                            self._keys[key]
+        
+        return self._times[self._offsets[segment]:self._offsets[segment + 1]]
+    
+    def get_sampler(self, sim_number, random_state=None):
+        
+        """Return a failure event sampler for a data point of the block,
+        for use with LCOE_Calculator. Failure modes which are not
+        presampled, or are sampled at a different rate or simulation time,
+        are sampled using poisson_process.
+        
+        Args:
+            sim_number (int): index of the data point
+            random_state (numpy.random.RandomState, optional): random number
+                generator for poisson_process. Defaults to the global numpy
+                generator.
+        
+        Returns:
+            callable: sampler with the same arguments as the __call__
+                method of StratifiedFailureSampler
+        
+        """
+        
+        def sampler(key, startOperationDate, simulationTime, failureRate):
+            
+            if self._is_presampled(key, simulationTime, failureRate):
+                
+                times = self.get_times(sim_number, key)
+                timeStep = np.diff(np.concatenate(([0.], times)))
+                
+                return _get_failure_dates(startOperationDate,
+                                          simulationTime,
+                                          timeStep)
+            
+            return poisson_process(startOperationDate,
+                                   simulationTime,
+                                   failureRate,
+                                   random_state)
+        
+        return sampler
+    
+    def _is_presampled(self, key, simulationTime, failureRate):
+        
+        if key not in self._keys: return False
+        if simulationTime != self._simulationTime: return False
+        
+        rate = self._rates[self._keys[key]]
+        
+        return abs(failureRate - rate) <= 1e-12 * abs(rate)
+
+
+def get_poisson_quantile(mean, probability):
+    
+    """Return the smallest number of events of a Poisson distribution for
+    which the cumulative probability reaches the given probability.
+    
+    Args:
+        mean (float): expected number of events
+        probability (float): cumulative probability, between 0 and 1
+    
+    Returns:
+        int: number of events
+    
+    """
+    
+    if mean <= 0: return 0
+    
+    # Use the normal approximation where exp(-mean) underflows
+    if mean > 700:
+        z = get_normal_quantile(min(max(probability, 1e-15), 1 - 1e-15))
+        return max(0, int(round(mean + z * math.sqrt(mean))))
+    
+    n_events = 0
+    mass = math.exp(-mean)
+    cumulative = mass
+    
+    while cumulative < probability:
+        
+        n_events += 1
+        mass *= mean / n_events
+        
+        # Guard against rounding for probabilities close to one
+        if mass < 1e-300 and n_events > mean: break
+        
+        cumulative += mass
+    
+    return n_events
 
+
+def get_normal_quantile(probability):
+    
+    """Return the quantile of the standard normal distribution for the given
+    cumulative probability, found by bisection of the error function.
+    
+    Args:
+        probability (float): cumulative probability, between 0 and 1
+    
     Returns:
-        randomList [list] : random failure occurence of a component [1/day]
+        float: standard normal quantile
+    
+    """
+    
+    if not 0 < probability < 1:
+        
+        errStr = ("Probability must lie between 0 and 1; however, it is set "
+                  "to {}").format(probability)
+        raise ValueError(errStr)
+    
+    def cdf(x):
+        return 0.5 * (1 + math.erf(x / math.sqrt(2)))
+    
+    lower = -40.
+    upper = 40.
+    
+    for _ in xrange(200):
+        
+        mid = 0.5 * (lower + upper)
+        
+        if cdf(mid) < probability:
+            lower = mid
+        else:
+            upper = mid
+        
+        if upper - lower < 1e-12: break
+    
+    return 0.5 * (lower + upper)
 
-    '''
 
-    # result of poisson process
-    randomList = []
+def get_relative_interval_width(values, confidence=0.95):
+    
+    """Return the width of the confidence interval of the mean of a sample,
+    relative to the magnitude of the mean. The interval uses the normal
+    approximation of the sampling distribution of the mean.
+    
+    Args:
+        values (array-like): sample
+        confidence (float, optional): confidence level. Defaults to 0.95
+    
+    Returns:
+        float: relative width of the confidence interval. Infinite if fewer
+            than two values are given or the mean is zero and the sample
+            varies.
+    
+    """
+    
+    values = np.asarray(values, dtype=float)
+    n_values = len(values)
+    
+    if n_values < 2: return np.inf
+    
+    mean = values.mean()
+    std = values.std(ddof=1)
+    
+    return _get_relative_interval_width(mean, std, n_values, confidence)
 
-    # intermediate results
-    timeStep = []
 
-    # intermediate results
-    timeStepAll = 0
-    number      = 0
+def _get_relative_interval_width(mean, std, n_values, confidence):
+    
+    if n_values < 2: return np.inf
+    if std == 0: return 0.
+    if mean == 0: return np.inf
+    
+    width = _get_interval_width(std, n_values, confidence)
+    
+    return width / abs(mean)
 
-    # poison parameter
-    loopNumber       = 2000
-    timeStepLoop     = []
-    numberLoop       = []
 
-    dummyStartOperationDate = datetime.datetime(startOperationDate.year,
-                                                startOperationDate.month,
-                                                startOperationDate.day,
-                                                startOperationDate.hour)
+def _get_interval_width(std, n_values, confidence):
+    
+    if n_values < 2: return np.inf
+    if std == 0: return 0.
+    
+    z = get_normal_quantile(0.5 + confidence / 2.)
+    
+    return 2 * z * std / math.sqrt(n_values)
 
-    endOperationDate = dummyStartOperationDate + \
-                                datetime.timedelta(days=simulationTime)
 
-    # poisson trial loop
-    for _ in range(0, loopNumber):
+class RunningMoments(object):
+    
+    """Mean and standard deviation of a sample which is updated one value at
+    a time, using Welford's algorithm. Values may be weighted, such as by the
+    likelihood ratios of importance sampling, in which case West's algorithm
+    gives the weighted (self-normalised) moments and the confidence interval
+    of the mean uses the effective sample size."""
+    
+    def __init__(self):
+        
+        self._count = 0
+        self._weight_sum = 0.
+        self._weight_sq_sum = 0.
+        self._mean = 0.
+        self._m2 = 0.
+        
+        return
+    
+    def add(self, value, weight=1.):
+        
+        self._count += 1
+        self._weight_sum += weight
+        self._weight_sq_sum += weight ** 2
+        
+        if self._weight_sum == 0: return
+        
+        delta = value - self._mean
+        self._mean += delta * weight / self._weight_sum
+        self._m2 += weight * delta * (value - self._mean)
+        
+        return
+    
+    def get_count(self):
+        return self._count
+    
+    def get_effective_count(self):
+        
+        """Return the effective sample size of the weighted values. Equal to
+        the count if the values are not weighted."""
+        
+        if self._weight_sq_sum == 0: return 0.
+        
+        return self._weight_sum ** 2 / self._weight_sq_sum
+    
+    def get_mean(self):
+        
+        if self._count == 0 or self._weight_sum == 0: return np.nan
+        
+        return self._mean
+    
+    def get_std(self):
+        
+        """Return the sample (unbiased) standard deviation"""
+        
+        if self._count < 2: return np.nan
+        
+        # Reduces to count - 1 for unit weights
+        denominator = self._weight_sum - self._weight_sq_sum / \
+                                                            self._weight_sum
+        
+        if denominator <= 0: return np.nan
+        
+        return math.sqrt(self._m2 / denominator)
+    
+    def get_relative_interval_width(self, confidence=0.95):
+        
+        """Return the relative width of the confidence interval of the mean.
+        See get_relative_interval_width."""
+        
+        return _get_relative_interval_width(self.get_mean(),
+                                            self.get_std(),
+                                            self.get_effective_count(),
+                                            confidence)
+    
+    def get_interval_width(self, confidence=0.95):
+        
+        """Return the width of the confidence interval of the mean, in the
+        units of the values. Infinite if fewer than two values have been
+        added."""
+        
+        return _get_interval_width(self.get_std(),
+                                   self.get_effective_count(),
+                                   confidence)
+
+
+class P2Quantile(object):
+    
+    """Estimate of a quantile of a sample which is updated one value at a
+    time, using the P-square algorithm of Jain and Chlamtac (1985). Only five
+    markers are stored, regardless of the size of the sample. The quantile is
+    exact for fewer than five values.
+    
+    Args:
+        probability (float): probability of the quantile, in the range (0, 1)
+    
+    """
+    
+    def __init__(self, probability):
+        
+        if not 0 < probability < 1:
+            
+            errStr = ("Quantile probability must be between 0 and 1 "
+                      "exclusive, not {}").format(probability)
+            raise ValueError(errStr)
+        
+        p = float(probability)
+        
+        self._probability = p
+        self._heights = []
+        self._positions = [1., 2., 3., 4., 5.]
+        self._desired = [1., 1. + 2 * p, 1. + 4 * p, 3. + 2 * p, 5.]
+        self._increments = [0., p / 2, p, (1. + p) / 2, 1.]
+        
+        return
+    
+    def add(self, value):
+        
+        heights = self._heights
+        
+        if len(heights) < 5:
+            bisect.insort(heights, float(value))
+            return
+        
+        # Find the cell containing the value, extending the extremes
+        if value < heights[0]:
+            heights[0] = float(value)
+            k = 0
+        elif value >= heights[4]:
+            heights[4] = float(value)
+            k = 3
+        else:
+            k = bisect.bisect_right(heights, value) - 1
+        
+        positions = self._positions
+        
+        for i in xrange(k + 1, 5):
+            positions[i] += 1
+        
+        for i in xrange(5):
+            self._desired[i] += self._increments[i]
+        
+        # Adjust the heights of the middle markers
+        for i in xrange(1, 4):
+            
+            d = self._desired[i] - positions[i]
+            
+            if ((d >= 1 and positions[i + 1] - positions[i] > 1) or
+                (d <= -1 and positions[i - 1] - positions[i] < -1)):
+                
+                d = 1 if d > 0 else -1
+                height = self._get_parabolic(i, d)
+                
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = self._get_linear(i, d)
+                
+                heights[i] = height
+                positions[i] += d
+        
+        return
+    
+    def get_quantile(self):
+        
+        if not self._heights: return np.nan
+        
+        if len(self._heights) < 5:
+            return np.percentile(self._heights, 100 * self._probability)
+        
+        return self._heights[2]
+    
+    def _get_parabolic(self, i, d):
+        
+        q = self._heights
+        n = self._positions
+        
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) /
+                                                        (n[i + 1] - n[i]) +
+                    (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) /
+                                                        (n[i] - n[i - 1]))
+    
+    def _get_linear(self, i, d):
+        
+        q = self._heights
+        n = self._positions
+        
+        return q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+
+
+class WeightedQuantile(object):
+    
+    """Estimate of a quantile of a sample of weighted values, such as from
+    importance sampling, found from the weighted empirical distribution. All
+    the values and weights are stored.
+    
+    Args:
+        probability (float): probability of the quantile, in the range (0, 1)
+    
+    """
+    
+    def __init__(self, probability):
+        
+        if not 0 < probability < 1:
+            
+            errStr = ("Quantile probability must be between 0 and 1 "
+                      "exclusive, not {}").format(probability)
+            raise ValueError(errStr)
+        
+        self._probability = float(probability)
+        self._values = []
+        self._weights = []
+        
+        return
+    
+    def add(self, value, weight=1.):
+        
+        self._values.append(float(value))
+        self._weights.append(float(weight))
+        
+        return
+    
+    def get_quantile(self):
+        
+        if not self._values: return np.nan
+        
+        values = np.array(self._values)
+        weights = np.array(self._weights)
+        
+        order = np.argsort(values)
+        cumulative = np.cumsum(weights[order])
+        
+        if cumulative[-1] <= 0: return np.nan
+        
+        idx = np.searchsorted(cumulative,
+                              self._probability * cumulative[-1])
+        
+        return values[order][min(idx, len(values) - 1)]
+
+
+class SummaryStatistics(RunningMoments):
+    
+    """Running moments and quantile estimates of a sample which is updated
+    one value at a time, using bounded memory.
+    
+    Args:
+        quantiles (tuple, optional): probabilities of the estimated
+            quantiles. Defaults to (0.1, 0.5, 0.9)
+        weighted (bool, optional): estimate the quantiles of the weighted
+            values, using the WeightedQuantile class, which stores the sample.
+            Otherwise, the weights only apply to the moments. Defaults to
+            False
+    
+    """
+    
+    def __init__(self, quantiles=(0.1, 0.5, 0.9), weighted=False):
+        
+        super(SummaryStatistics, self).__init__()
+        
+        if weighted:
+            quantile_class = WeightedQuantile
+        else:
+            quantile_class = P2Quantile
+        
+        self._weighted = weighted
+        self._quantiles = [(probability, quantile_class(probability))
+                                                for probability in quantiles]
+        
+        return
+    
+    def add(self, value, weight=1.):
+        
+        super(SummaryStatistics, self).add(value, weight)
+        
+        for _, quantile in self._quantiles:
+            
+            if self._weighted:
+                quantile.add(value, weight)
+            else:
+                quantile.add(value)
+        
+        return
+    
+    def get_quantiles(self):
+        
+        """Return the quantile estimates
+        
+        Returns:
+            list: (probability, estimate) tuples
+        
+        """
+        
+        return [(probability, quantile.get_quantile())
+                                for probability, quantile in self._quantiles]
+
 
-        timeStepAll = 0
-        timeStep = []
-        number = 0
+def get_summary_df(summaries, index_name=None):
+    
+    """Return a table of summary statistics, with one row per key.
+    
+    Args:
+        summaries (dict): SummaryStatistics or RunningMoments objects
+        index_name (str, optional): name of the index of the table
+    
+    Returns:
+        pandas.DataFrame: table with columns "count", "mean" and "std",
+            followed by a column for each quantile, e.g. "P10"
+    
+    """
+    
+    keys = sorted(summaries.keys())
+    columns = ["count", "mean", "std"]
+    data = {"count": [summaries[key].get_count() for key in keys],
+            "mean": [summaries[key].get_mean() for key in keys],
+            "std": [summaries[key].get_std() for key in keys]}
+    
+    if keys and hasattr(summaries[keys[0]], "get_quantiles"):
         
-        # calculation loop
-        while timeStepAll < simulationTime:
+        for i, (probability, _) in enumerate(
+                                        summaries[keys[0]].get_quantiles()):
+            
+            column = "P{:g}".format(100 * probability)
+            columns.append(column)
+            data[column] = [summaries[key].get_quantiles()[i][1]
+                                                            for key in keys]
+    
+    summary_df = pd.DataFrame(data,
+                              index=pd.Index(keys, name=index_name),
+                              columns=columns)
+    
+    return summary_df
+
+
+def poisson_process(startOperationDate,
+                    simulationTime,
+                    failureRate,
+                    random_state=None):
+
+    '''poisson_process function: Estimation of random failure occurence of
+    components
+
+    Args:
+        startOperationDate (timedate) : start date of operation
+        simulationtime (float)        : simulation time [day]
+        failureRate (float)           : failure rate [1/day]
+        random_state (numpy.random.RandomState, optional) : random number
+            generator. Defaults to the global numpy generator.
+
+    Returns:
+        randomList [FailureDates] : random failure occurence of a component
+            [1/day]
+
+    The inter-arrival times of a single sequence are drawn as exponential
+    variates, in blocks, and accumulated until they exceed the simulation
+    time. Only the events before the end of the simulation are kept.
+
+    '''
+
+    if random_state is None: random_state = np.random
+
+    if failureRate <= 0: return FailureDates(0)
 
-            # time dt
-            dt = -1 * math.log(random.random()) / failureRate
-            timeStepAll = timeStepAll + dt
-            number = number + 1
-            timeStep.append(dt)
+    # Size the blocks to cover the simulation time with high probability
+    expectedNumber = failureRate * simulationTime
+    blockSize = int(expectedNumber + 5 * math.sqrt(expectedNumber)) + 10
+
+    timeStep = random_state.exponential(1. / failureRate, blockSize)
+    timeStepAll = np.cumsum(timeStep)
+
+    while timeStepAll[-1] < simulationTime:
+
+        extra = random_state.exponential(1. / failureRate, blockSize)
+        timeStep = np.concatenate((timeStep, extra))
+        timeStepAll = np.concatenate((timeStepAll,
+                                      timeStepAll[-1] + np.cumsum(extra)))
+
+    # events completed within the simulation time
+    number = np.searchsorted(timeStepAll, simulationTime)
+    timeStep = timeStep[:number]
+
+    return _get_failure_dates(startOperationDate, simulationTime, timeStep)
+
+
+class FailureDates(list):
+    
+    """Dates of the failure events of a failure mode, as returned by
+    poisson_process and the failure samplers. The dates are rounded to
+    whole days, which may push the last events beyond the end of the
+    simulation, where they are dropped. The number of events drawn before
+    rounding, as required for the likelihood ratio of importance sampling,
+    is kept in the n_events attribute.
+    
+    Args:
+        n_events (int): number of events drawn
+    
+    """
+    
+    def __init__(self, n_events, dates=()):
         
-        #delete last entries
-        number = number - 1
-        del timeStep[-1]
+        super(FailureDates, self).__init__(dates)
+        self.n_events = n_events
+        
+        return
 
-        #save loop results
-        numberLoop.append(number)
-        timeStepLoop.append(timeStep)
 
-    loopIndex = random.randint(0, len(numberLoop) - 1)
-    timeStep = timeStepLoop[loopIndex]
-    number = numberLoop[loopIndex]
+def _get_failure_dates(startOperationDate, simulationTime, timeStep):
+    
+    # result of poisson process
+    randomList = FailureDates(len(timeStep))
+    
+    dummyStartOperationDate = datetime.datetime(startOperationDate.year,
+                                                startOperationDate.month,
+                                                startOperationDate.day,
+                                                startOperationDate.hour)
+
+    endOperationDate = dummyStartOperationDate + \
+                                datetime.timedelta(days=simulationTime)
 
     TimeStamp = dummyStartOperationDate
 
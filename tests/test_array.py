@@ -23,7 +23,7 @@ from collections import Counter # Required for eval of text files
 import numpy as np
 import pytest
 
-from dtocean_maintenance.array import Array
+from dtocean_maintenance.array import Array, RAMMetrics
 from dtocean_reliability.main import Network
 from dtocean_reliability.parse import SubNetwork
 
@@ -116,12 +116,47 @@ def test_Array_init(eventsTableKeys,
                   NoPoisson_eventsTableKeys,
                   False)
     
-    test = array._Array__ram_subsystem_metrics['Substation'].loc["array"]
+    ram_metrics = array._Array__ram_metrics
+    test = ram_metrics.get_subsystem_metrics('Substation').loc["array"]
     
     assert np.isclose(test["MTTF"], 1e6 / 5)
     assert test["Curtails"] == ['device001']
 
 
+def test_RAMMetrics(eventsTableKeys,
+                    NoPoisson_eventsTableKeys,
+                    database,
+                    electrical_network):
+    
+    ram_network = Network(database, electrical_network)
+    ram_network.set_failure_rates(inplace=True)
+    
+    ram_metrics = RAMMetrics(ram_network)
+    failure_rate, system_metrics = ram_metrics.get_component_failure_rate(
+                                                                "Substation",
+                                                                "array")
+    
+    assert np.isclose(failure_rate, 8766 * 5 / 1e6)
+    assert system_metrics["Curtails"] == ['device001']
+    
+    # Results are reused
+    assert ram_metrics.get_subsystem_metrics("Substation") is \
+                                ram_metrics.get_subsystem_metrics("Substation")
+    assert ram_metrics.get_component_failure_rate("Substation",
+                                                  "array")[1] is \
+                                                                system_metrics
+    
+    array = Array(ram_network,
+                  dt.datetime(2016, 1, 1),
+                  365,
+                  eventsTableKeys,
+                  NoPoisson_eventsTableKeys,
+                  False,
+                  ram_metrics=ram_metrics)
+    
+    assert array._Array__ram_metrics is ram_metrics
+
+
 def test_Array___calcPoissonEvents(eventsTableKeys,
                                    NoPoisson_eventsTableKeys,
                                    database,
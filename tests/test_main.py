@@ -17,12 +17,59 @@
 
 # pylint: disable=redefined-outer-name
 
+import os
+import pickle
+import datetime as dt
+
 import pytest
 
+import numpy as np
 import pandas as pd
 
-from dtocean_maintenance.input import inputOM
-from dtocean_maintenance.main import LCOE_Statistics
+from dtocean_maintenance.input import (inputOM,
+                                       PreparedModel,
+                                       _get_relabelled_tables)
+from dtocean_maintenance.main import (LCOE_Statistics,
+                                      StatisticsEngine,
+                                      run_queue_worker,
+                                      _init_worker,
+                                      _iter_pool_chunks,
+                                      _run_worker_chunk)
+from dtocean_maintenance import main
+from dtocean_maintenance.static import (Checkpoint,
+                                        FileWorkQueue,
+                                        ResultBlock)
+
+
+class MockAsyncResult(object):
+    
+    def __init__(self, value):
+        self.value = value
+    
+    def get(self, timeout=None):
+        return self.value
+
+
+class MockPool(object):
+    
+    def __init__(self, processes=None, initializer=None, initargs=()):
+        self.processes = processes
+        if initializer is not None: initializer(*initargs)
+    
+    def imap(self, func, iterable, chunksize=1):
+        return (func(x) for x in iterable)
+    
+    def apply_async(self, func, args=()):
+        return MockAsyncResult(func(*args))
+    
+    def close(self):
+        pass
+    
+    def terminate(self):
+        pass
+    
+    def join(self):
+        pass
 
 
 @pytest.fixture
@@ -137,6 +184,158 @@ def data_point():
     return data_point
 
 
+def test_PreparedModel():
+    
+    component = pd.DataFrame({"a": ["id1", "Hydrodynamic"],
+                              "b": ["id2", "Hydrodynamic"]},
+                             index=["Component_ID", "Component_subtype"])
+    failure_mode = pd.DataFrame({"a": ["id1", "fm1", 100.],
+                                 "b": ["id1", "fm2", np.nan],
+                                 "c": ["id2", "fm1", 50.]},
+                                index=["Component_ID",
+                                       "FM_ID",
+                                       "CAPEX_condition_based_maintenance"])
+    repair_action = pd.DataFrame({"a": ["id2", "fm1"],
+                                  "b": ["id1", "fm2"],
+                                  "c": ["id1", "fm1"]},
+                                 index=["Component_ID", "FM_ID"])
+    inspection = pd.DataFrame({"a": ["id1", "fm1"]},
+                              index=["Component_ID", "FM_ID"])
+    array_info = pd.DataFrame({"a": ["id1"], "b": ["id2"]},
+                              index=["Component_ID"])
+    simu_param = {'arrayInfoLogistic': array_info,
+                  'missionTime': 2,
+                  'startOperationDate': dt.datetime(2020, 1, 1)}
+    
+    control = inputOM({'condition_based_maintenance': True},
+                      component,
+                      failure_mode,
+                      repair_action,
+                      inspection,
+                      None,
+                      None,
+                      simu_param,
+                      None)
+    
+    model = PreparedModel(control)
+    
+    assert list(model.get_Component().columns) == ["id1", "id2"]
+    assert list(model.get_Failure_Mode().columns) == ["id1_1",
+                                                      "id1_2",
+                                                      "id2_1"]
+    assert list(model.get_Repair_Action().columns) == ["id2_1",
+                                                       "id1_2",
+                                                       "id1_1"]
+    assert list(model.get_Inspection().columns) == ["id1_1"]
+    assert list(model.get_Simu_Param()['arrayInfoLogistic'].columns) == \
+                                                                ["id1", "id2"]
+    
+    # The tables of inputOM are not modified
+    assert list(control.get_Component().columns) == ["a", "b"]
+    assert list(control.get_Simu_Param()['arrayInfoLogistic'].columns) == \
+                                                                    ["a", "b"]
+    
+    assert model.get_records("Failure_Mode")["id2_1"]["FM_ID"] == "fm1"
+    assert model.get_condition_capex() == 150.
+    assert model.get_operation_time_day() == 730.5
+    assert model.get_end_operation_date() == dt.datetime(2021, 12, 31, 12)
+    
+    test = pickle.loads(pickle.dumps(model))
+    
+    assert list(test.get_Failure_Mode().columns) == ["id1_1",
+                                                     "id1_2",
+                                                     "id2_1"]
+    assert test.get_condition_capex() == 150.
+
+
+@pytest.mark.parametrize("path", [False, True])
+def test_PreparedModel_get_port_selection(mocker, tmpdir, path):
+    
+    logistics_param = {'entry_point': pd.DataFrame({'zone [-]': ["30 U"]}),
+                       'ports': pd.DataFrame({'Name [-]': ["a", "b"]})}
+    
+    if path:
+        control_param = {'portSelectionPath': str(tmpdir)}
+    else:
+        control_param = {}
+    
+    def get_model():
+        control = inputOM(None,
+                          None,
+                          None,
+                          None,
+                          None,
+                          None,
+                          logistics_param,
+                          None,
+                          control_param)
+        return PreparedModel(control)
+    
+    select_ports = mocker.Mock(return_value={"repair": (10., 1)})
+    model = get_model()
+    
+    assert model.get_port_selection((1., 2., 3., 4.), select_ports) == \
+                                                        {"repair": (10., 1)}
+    assert model.get_port_selection((1., 2., 3., 4.), select_ports) == \
+                                                        {"repair": (10., 1)}
+    assert select_ports.call_count == 1
+    
+    model.get_port_selection((1., 2., 3., 5.), select_ports)
+    
+    assert select_ports.call_count == 2
+    
+    # Selections are only reused by a new run if saved to disk
+    get_model().get_port_selection((1., 2., 3., 4.), select_ports)
+    
+    assert select_ports.call_count == 2 if path else 3
+
+
+def test_get_relabelled_tables_duplicates():
+    
+    ids = ["id1", "id_2", "id1", "id_2", "id1"]
+    fms = ["fm1", "fm1", "fm2", "fm1", "fm1"]
+    columns = ["c{}".format(i) for i in range(5)]
+    
+    failure_mode = pd.DataFrame([ids, fms],
+                                index=["Component_ID", "FM_ID"],
+                                columns=columns)
+    repair_action = pd.DataFrame([["id1", "id1", "id_2", "id3"],
+                                  ["fm1", "fm1", "fm1", "fm1"]],
+                                 index=["Component_ID", "FM_ID"],
+                                 columns=columns[:4])
+    inspection = pd.DataFrame([["id1"], ["fm2"]],
+                              index=["Component_ID", "FM_ID"],
+                              columns=columns[:1])
+    component = pd.DataFrame([["id1", "id_2"]],
+                             index=["Component_ID"],
+                             columns=columns[:2])
+    simu_param = {'arrayInfoLogistic': component}
+    
+    control = inputOM(None,
+                      component,
+                      failure_mode,
+                      repair_action,
+                      inspection,
+                      None,
+                      None,
+                      simu_param,
+                      None)
+    
+    tables = _get_relabelled_tables(control)
+    
+    # Labels of the last duplicated pair replace the earlier ones
+    assert list(tables["Failure_Mode"].columns) == ["id1_1",
+                                                    "id_2_1",
+                                                    "id1_2",
+                                                    "id_2_1",
+                                                    "id1_3"]
+    assert list(tables["Repair_Action"].columns) == ["id1_3",
+                                                     "dummy",
+                                                     "id_2_1",
+                                                     "dummy"]
+    assert list(tables["Inspection"].columns) == ["id1_2"]
+
+
 def test_LCOE_Statistics_call(mocker, data_point):
     
     mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
@@ -187,7 +386,9 @@ def test_LCOE_Statistics_call(mocker, data_point):
     test = LCOE_Statistics(control)
     result = test()
     keys = ["MetricsTable [-]",
+            "MetricsSummary [-]",
             "OpexPerYear [Euro]",
+            "OpexPerYearSummary [Euro]",
             "energyPerYear [Wh]",
             "downtimePerDevice [hour]",
             "energyPerDevice [Wh]",
@@ -307,3 +508,1667 @@ def test_LCOE_Statistics_main_networks(mocker, data_point):
     
     test = LCOE_Statistics(control)
     test.main()
+
+
+def test_LCOE_Statistics_main_parallel(mocker, data_point):
+    
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                 return_value=data_point)
+    mocker.patch('dtocean_logistics.performance.schedule.schedule_shared.'
+                 'WaitingTime.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    mock_pool = mocker.patch('dtocean_maintenance.main.Pool',
+                             side_effect=MockPool)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    n_sims = 5
+    
+    control = inputOM(None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      {'numberOfSimulations': n_sims})
+    
+    serial = LCOE_Statistics(control).main()
+    
+    control = inputOM(None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      {'numberOfSimulations': n_sims,
+                       'numberOfProcesses': 2})
+    
+    parallel = LCOE_Statistics(control).main()
+    
+    assert mock_pool.call_args[1]['processes'] == 2
+    assert set(parallel.keys()) == set(serial.keys())
+    assert parallel["MetricsTable [-]"].equals(serial["MetricsTable [-]"])
+    assert parallel["OpexPerYear [Euro]"].equals(
+                                                serial["OpexPerYear [Euro]"])
+    assert parallel["downtimePerDevice [hour]"].equals(
+                                        serial["downtimePerDevice [hour]"])
+
+
+def test_run_worker_chunk(mocker, data_point):
+    
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mock_init = mocker.patch(
+                        'dtocean_maintenance.main.LCOE_Calculator.__init__',
+                        return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                 return_value=data_point)
+    mocker.patch('dtocean_logistics.performance.schedule.schedule_shared.'
+                 'WaitingTime.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mock_rates = mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                              return_value=None)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    control = inputOM(None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      {'numberOfSimulations': 2})
+    
+    _init_worker(control, 1)
+    
+    elapsed, block = _run_worker_chunk([0, 1], keep_events_tables=False)
+    
+    assert elapsed >= 0
+    assert isinstance(block, ResultBlock)
+    assert block.sim_numbers == [0, 1]
+    assert block.metrics["numberOfJourneys [-]"].tolist() == [15, 15]
+    assert block.events_tables is None
+    assert block.data_points is None
+    assert mock_init.call_count == 2
+    assert mock_rates.call_count == 1
+    
+    _, block = _run_worker_chunk([2], keep_data_points=True)
+    
+    assert block.data_points[0] is data_point
+    assert mock_init.call_count == 3
+
+
+def test_LCOE_Statistics_random_seed(mocker, data_point):
+    
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mock_init = mocker.patch(
+                        'dtocean_maintenance.main.LCOE_Calculator.__init__',
+                        return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                 return_value=data_point)
+    mocker.patch('dtocean_logistics.performance.schedule.schedule_shared.'
+                 'WaitingTime.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    n_sims = 3
+    
+    control = inputOM(None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      {'numberOfSimulations': n_sims,
+                       'randomSeed': 1234})
+    
+    test = LCOE_Statistics(control)
+    test.main()
+    
+    assert test.get_master_seed() == 1234
+    
+    for sim_number, call in enumerate(mock_init.call_args_list):
+        
+        random_state = call[1]['random_state']
+        expected = test.get_random_state(sim_number)
+        
+        assert np.isclose(random_state.random_sample(),
+                          expected.random_sample())
+
+
+def test_LCOE_Statistics_set_master_seed_negative():
+    
+    control = inputOM(None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      {'numberOfSimulations': 1})
+    
+    test = LCOE_Statistics(control)
+    
+    with pytest.raises(ValueError):
+        test.set_master_seed(-1)
+
+
+def test_LCOE_Statistics_main_converged(mocker, data_point):
+    
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.__init__',
+                 return_value=None)
+    mock_calc = mocker.patch(
+                    'dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                    return_value=data_point)
+    mocker.patch('dtocean_logistics.performance.schedule.schedule_shared.'
+                 'WaitingTime.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    control = inputOM(None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      {'numberOfSimulations': 100,
+                       'convergenceTolerance': 0.1,
+                       'convergenceMinPoints': 4})
+    
+    test = LCOE_Statistics(control)
+    result = test.main()
+    
+    # Identical data points converge as soon as allowed
+    assert mock_calc.call_count == 4
+    assert len(result["MetricsTable [-]"]) == 4
+    assert len(result["OpexPerYear [Euro]"].columns) == 4
+
+
+def test_LCOE_Statistics_iter_data_points(mocker, data_point):
+    
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.__init__',
+                 return_value=None)
+    mock_calc = mocker.patch(
+                    'dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                    return_value=data_point)
+    mocker.patch('dtocean_logistics.performance.schedule.schedule_shared.'
+                 'WaitingTime.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    control = inputOM(None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      {'numberOfSimulations': 5})
+    
+    test = LCOE_Statistics(control)
+    generator = test.iter_data_points()
+    
+    sim_number, result, summary = next(generator)
+    
+    assert sim_number == 0
+    assert result is data_point
+    assert mock_calc.call_count == 1
+    assert summary.loc["LCOEOpex [Euro/kWh]", "count"] == 1
+    assert np.isclose(summary.loc["LCOEOpex [Euro/kWh]", "mean"],
+                      data_point["LCOEOpex [Euro/kWh]"])
+    
+    sim_number, result, summary = next(generator)
+    
+    assert sim_number == 1
+    assert summary.loc["numberOfJourneys [-]", "count"] == 2
+    assert np.isclose(summary.loc["numberOfJourneys [-]", "std"], 0)
+    
+    generator.close()
+    
+    assert mock_calc.call_count == 2
+
+
+def test_LCOE_Statistics_checkpoint_resume(mocker, tmpdir, data_point):
+    
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.__init__',
+                 return_value=None)
+    mock_calc = mocker.patch(
+                    'dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                    return_value=data_point)
+    mocker.patch('dtocean_logistics.performance.schedule.schedule_shared.'
+                 'WaitingTime.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    path = str(tmpdir.join("checkpoint.pkl"))
+    control_param = {'numberOfSimulations': 5,
+                     'checkpointPath': path}
+    
+    control = inputOM(None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      control_param)
+    
+    test = LCOE_Statistics(control)
+    master_seed = test.get_master_seed()
+    
+    # Interrupt the run after three data points
+    generator = test.iter_data_points()
+    
+    for _ in range(3):
+        next(generator)
+    
+    generator.close()
+    
+    assert mock_calc.call_count == 3
+    
+    control_param['checkpointResume'] = True
+    
+    test = LCOE_Statistics(control)
+    result = test()
+    
+    assert test.get_master_seed() == master_seed
+    assert mock_calc.call_count == 5
+    assert len(result["MetricsTable [-]"]) == 5
+
+
+def test_LCOE_Statistics_checkpoint_resume_bad_seed(mocker, tmpdir):
+    
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_logistics.performance.schedule.schedule_shared.'
+                 'WaitingTime.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    path = str(tmpdir.join("checkpoint.pkl"))
+    
+    control = inputOM(None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      {'numberOfSimulations': 5,
+                       'randomSeed': 2,
+                       'checkpointPath': path,
+                       'checkpointResume': True})
+    
+    Checkpoint(path).start(1, main._get_inputs_key(control), 5)
+    
+    test = LCOE_Statistics(control)
+    
+    with pytest.raises(ValueError) as excinfo:
+        test()
+    
+    assert "does not match" in str(excinfo)
+
+
+@pytest.mark.parametrize("changes", [{'numberOfSimulations': 6},
+                                     {'stratifiedSampling': True}])
+def test_LCOE_Statistics_checkpoint_resume_changed(mocker,
+                                                   tmpdir,
+                                                   data_point,
+                                                   changes):
+    
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                 return_value=data_point)
+    mocker.patch('dtocean_logistics.performance.schedule.schedule_shared.'
+                 'WaitingTime.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    path = str(tmpdir.join("checkpoint.pkl"))
+    control_param = {'numberOfSimulations': 5,
+                     'checkpointPath': path}
+    
+    control = inputOM(None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      control_param)
+    
+    generator = LCOE_Statistics(control).iter_data_points()
+    next(generator)
+    generator.close()
+    
+    control_param['checkpointResume'] = True
+    control_param.update(changes)
+    
+    test = LCOE_Statistics(control)
+    
+    with pytest.raises(ValueError) as excinfo:
+        test()
+    
+    assert "does not match" in str(excinfo) or "do not match" in str(excinfo)
+
+
+def test_LCOE_Statistics_compare_strategies(mocker, data_point):
+    
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mock_init = mocker.patch(
+                        'dtocean_maintenance.main.LCOE_Calculator.__init__',
+                        return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                 return_value=data_point)
+    mocker.patch('dtocean_logistics.performance.schedule.schedule_shared.'
+                 'WaitingTime.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    farm_om = {'calendar_based_maintenance': False,
+               'condition_based_maintenance': False,
+               'corrective_maintenance': True}
+    
+    control = inputOM(farm_om,
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      {'numberOfSimulations': 3})
+    
+    strategies = {"corrective": {},
+                  "calendar": {'calendar_based_maintenance': True}}
+    
+    test = LCOE_Statistics(control)
+    result = test.compare_strategies(strategies, "corrective")
+    
+    assert set(result.keys()) == set(strategies.keys())
+    assert len(result["corrective"]["MetricsTable [-]"]) == 3
+    assert "PairedDifferenceTable [-]" not in result["corrective"]
+    assert np.allclose(result["calendar"]["PairedDifferenceTable [-]"], 0)
+    assert np.isclose(result["calendar"]["PairedDifferenceSummary [-]"].loc[
+                                            "LCOEOpex [Euro/kWh]", "mean"],
+                      0)
+    
+    # Strategies are evaluated in lockstep with the same random numbers
+    assert mock_init.call_count == 6
+    
+    inputs = [args[0][0] for args in mock_init.call_args_list]
+    random_states = [args[1]["random_state"]
+                                        for args in mock_init.call_args_list]
+    
+    assert not inputs[0].get_Farm_OM()['calendar_based_maintenance']
+    assert inputs[1].get_Farm_OM()['calendar_based_maintenance']
+    
+    for i in range(0, 6, 2):
+        assert random_states[i].randint(2 ** 30) == \
+                                        random_states[i + 1].randint(2 ** 30)
+    
+    assert not farm_om['calendar_based_maintenance']
+
+
+def test_LCOE_Statistics_compare_strategies_converged(mocker, data_point):
+    
+    # The strategies are identical but for small alternating differences,
+    # so their mean difference is close to zero
+    calls = [0]
+    
+    def execute_calc():
+        
+        point_index, strategy_index = divmod(calls[0], 2)
+        calls[0] += 1
+        
+        factor = 1. + 0.01 * (point_index % 3)
+        
+        if strategy_index == 1:
+            factor += 1e-4 * (-1) ** point_index
+        
+        result = dict(data_point)
+        
+        for key in LCOE_Statistics.convergence_metrics:
+            result[key] = data_point[key] * factor
+        
+        return result
+    
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                 side_effect=execute_calc)
+    mocker.patch('dtocean_logistics.performance.schedule.schedule_shared.'
+                 'WaitingTime.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    control = inputOM({},
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      {'numberOfSimulations': 1000,
+                       'convergenceTolerance': 0.01})
+    
+    strategies = {"first": {}, "second": {}}
+    
+    test = LCOE_Statistics(control)
+    result = test.compare_strategies(strategies, "first")
+    
+    assert len(result["first"]["MetricsTable [-]"]) == 10
+    assert len(result["second"]["PairedDifferenceTable [-]"]) == 10
+    assert np.isclose(result["second"]["PairedDifferenceSummary [-]"].loc[
+                                            "LCOEOpex [Euro/kWh]", "mean"],
+                      0,
+                      atol=1e-6)
+
+
+def test_LCOE_Statistics_compare_strategies_shared_pool(mocker, data_point):
+    
+    mock_pool = mocker.patch('dtocean_maintenance.main.Pool',
+                             side_effect=MockPool)
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                 return_value=data_point)
+    mocker.patch('dtocean_logistics.performance.schedule.schedule_shared.'
+                 'WaitingTime.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    control = inputOM({'calendar_based_maintenance': False},
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      {'numberOfSimulations': 5,
+                       'numberOfProcesses': 2})
+    
+    strategies = {"corrective": {},
+                  "calendar": {'calendar_based_maintenance': True},
+                  "other": {}}
+    
+    test = LCOE_Statistics(control)
+    reports = []
+    
+    def callback(report):
+        reports.append(report)
+        if report.n_complete == 2: test.cancel()
+    
+    test.add_progress_callback(callback)
+    result = test.compare_strategies(strategies, "corrective")
+    
+    # One pool is shared by all the strategies
+    assert mock_pool.call_count == 1
+    assert test.is_cancelled()
+    assert test.get_n_data_points() == 2
+    assert [report.n_complete for report in reports] == [1, 2]
+    assert reports[-1].n_total == 5
+    assert reports[-1].summary.loc["LCOEOpex [Euro/kWh]", "count"] == 2
+    assert all(len(x["MetricsTable [-]"]) == 2 for x in result.values())
+
+
+def test_LCOE_Statistics_compare_strategies_work_queue(mocker,
+                                                       tmpdir,
+                                                       data_point):
+    
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.__init__',
+                 return_value=None)
+    mock_calc = mocker.patch(
+                    'dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                    return_value=data_point)
+    mocker.patch('dtocean_logistics.performance.schedule.schedule_shared.'
+                 'WaitingTime.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    farm_om = {'calendar_based_maintenance': False,
+               'condition_based_maintenance': False,
+               'corrective_maintenance': True}
+    
+    path = str(tmpdir.join("queue"))
+    control = inputOM(farm_om,
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      {'numberOfSimulations': 3,
+                       'workQueuePath': path,
+                       'workQueuePollInterval': 0.01})
+    
+    strategies = {"corrective": {},
+                  "calendar": {'calendar_based_maintenance': True}}
+    
+    # Each strategy is submitted to the queue as its own run
+    test = LCOE_Statistics(control)
+    result = test.compare_strategies(strategies, "corrective")
+    
+    assert len(result["corrective"]["MetricsTable [-]"]) == 3
+    assert len(result["calendar"]["MetricsTable [-]"]) == 3
+    assert mock_calc.call_count == 6
+    assert FileWorkQueue(path).get_runs() == []
+
+
+def test_LCOE_Statistics_compare_strategies_bad_key():
+    
+    control = inputOM({'helideck': False},
+                      None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      {'numberOfSimulations': 3})
+    
+    test = LCOE_Statistics(control)
+    
+    with pytest.raises(ValueError) as excinfo:
+        test.compare_strategies({"a": {}, "b": {"not_a_key": 1}}, "a")
+    
+    assert "not a member" in str(excinfo)
+
+
+def test_LCOE_Statistics_sweep(mocker, data_point):
+    
+    mock_logistics = mocker.patch(
+                            'dtocean_maintenance.logistics.Logistics.__init__',
+                            return_value=None)
+    mock_init = mocker.patch(
+                        'dtocean_maintenance.main.LCOE_Calculator.__init__',
+                        return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                 return_value=data_point)
+    mock_waiting = mocker.patch('dtocean_logistics.performance.schedule.'
+                                'schedule_shared.WaitingTime.__init__',
+                                return_value=None)
+    mock_network = mocker.patch('dtocean_reliability.Network.__init__',
+                                return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    mock_pool = mocker.patch('dtocean_maintenance.main.Pool',
+                             side_effect=MockPool)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    farm_om = {'helideck': False,
+               'wage_technician_day': 10.}
+    
+    control = inputOM(farm_om,
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      {'numberOfSimulations': 2,
+                       'numberOfProcesses': 2})
+    
+    scenarios = [{},
+                 {"Farm_OM": {'wage_technician_day': 20.}},
+                 {"Farm_OM": {'helideck': True}},
+                 {"Control_Param": {'numberOfParallelActions': 2}}]
+    
+    test = LCOE_Statistics(control)
+    result = test.sweep(scenarios)
+    
+    assert mock_pool.call_count == 1
+    assert len(result) == 4
+    assert all(len(x["MetricsTable [-]"]) == 2 for x in result)
+    assert mock_init.call_count == 8
+    
+    # Shared objects are built once, except Logistics for each helideck
+    assert mock_waiting.call_count == 1
+    assert mock_network.call_count == 1
+    assert mock_logistics.call_count == 2
+    
+    inputs = [args[0][0] for args in mock_init.call_args_list[:4]]
+    
+    assert inputs[1].get_Farm_OM()['wage_technician_day'] == 20.
+    assert inputs[3].get_Control_Param()['numberOfParallelActions'] == 2
+    assert farm_om['wage_technician_day'] == 10.
+
+
+def test_LCOE_Statistics_sweep_component():
+    
+    component = pd.DataFrame({"comp1": [0.1, 1],
+                              "comp2": [0.2, 1]},
+                             index=["soh_threshold",
+                                    "number_failure_modes"])
+    
+    control = inputOM({'helideck': False},
+                      component,
+                      None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      {'numberOfSimulations': 2})
+    
+    test = LCOE_Statistics(control)
+    
+    scenario_input = test._get_scenario_input(
+                        {"Component": {"soh_threshold": {"comp2": 0.5}}})
+    
+    assert scenario_input.get_Component().loc["soh_threshold",
+                                              "comp2"] == 0.5
+    assert component.loc["soh_threshold", "comp2"] == 0.2
+    
+    scenario_input = test._get_scenario_input(
+                                    {"Component": {"soh_threshold": 0.3}})
+    
+    assert (scenario_input.get_Component().loc["soh_threshold"] == 0.3).all()
+    
+    with pytest.raises(ValueError):
+        test._get_scenario_input(
+                            {"Component": {"number_failure_modes": 2}})
+    
+    with pytest.raises(ValueError):
+        test._get_scenario_input(
+                        {"Component": {"soh_threshold": {"comp3": 0.5}}})
+    
+    with pytest.raises(ValueError):
+        test._get_scenario_input(
+                        {"Control_Param": {"numberOfSimulations": 4}})
+    
+    with pytest.raises(ValueError):
+        test._get_scenario_input({"Failure_Mode": {}})
+
+
+def test_LCOE_Statistics_work_queue(mocker, tmpdir, data_point):
+    
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.__init__',
+                 return_value=None)
+    mock_calc = mocker.patch(
+                    'dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                    return_value=data_point)
+    mocker.patch('dtocean_logistics.performance.schedule.schedule_shared.'
+                 'WaitingTime.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    path = str(tmpdir.join("queue"))
+    control = inputOM(None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      {'numberOfSimulations': 3,
+                       'workQueuePath': path,
+                       'keepEventTables': False})
+    
+    # Without any workers, the coordinator evaluates the data points
+    test = LCOE_Statistics(control)
+    result = test()
+    
+    assert mock_calc.call_count == 3
+    assert len(result["MetricsTable [-]"]) == 3
+    assert result['eventTables [-]'] == []
+    assert FileWorkQueue(path).claim() is None
+    assert FileWorkQueue(path).get_runs() == []
+
+
+def test_run_queue_worker(mocker, tmpdir, data_point):
+    
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                 return_value=data_point)
+    mocker.patch('dtocean_logistics.performance.schedule.schedule_shared.'
+                 'WaitingTime.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    
+    mock_runner = mocker.spy(main, '_DataPointRunner')
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    control = inputOM(None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      {'numberOfSimulations': 3})
+    
+    path = str(tmpdir.join("queue"))
+    
+    # Workers may start before any data points are submitted
+    assert run_queue_worker(path) == 0
+    
+    queue = FileWorkQueue(path)
+    first = queue.submit(control, 1, [0, 1, 2])
+    second = queue.submit(control, 2, [0])
+    
+    assert run_queue_worker(path) == 4
+    
+    for sim_number in range(3):
+        result = queue.pop_result(first, sim_number)
+        assert result.sim_numbers == [sim_number]
+        assert result.data_points is None
+        assert result.get_metrics(0)["LCOEOpex [Euro/kWh]"] == \
+                                            data_point["LCOEOpex [Euro/kWh]"]
+    
+    assert queue.pop_result(second, 0) is not None
+    
+    # Each run is evaluated with its own inputs
+    seeds = [args[0][1] for args in mock_runner.call_args_list]
+    
+    assert seeds == [1, 2]
+
+
+def test_LCOE_Statistics_progress_cancel(mocker, data_point):
+    
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.__init__',
+                 return_value=None)
+    mock_calc = mocker.patch(
+                    'dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                    return_value=data_point)
+    mocker.patch('dtocean_logistics.performance.schedule.schedule_shared.'
+                 'WaitingTime.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    control = inputOM(None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      {'numberOfSimulations': 10})
+    
+    test = LCOE_Statistics(control)
+    reports = []
+    
+    def callback(report):
+        reports.append(report)
+        if report.n_complete == 3: test.cancel()
+    
+    test.add_progress_callback(callback)
+    result = test()
+    
+    assert test.is_cancelled()
+    assert mock_calc.call_count == 3
+    assert len(result["MetricsTable [-]"]) == 3
+    assert [report.n_complete for report in reports] == [1, 2, 3]
+    assert all(report.n_total == 10 for report in reports)
+    assert reports[-1].seconds_per_point >= 0
+    assert np.isclose(reports[-1].eta, 7 * reports[-1].seconds_per_point)
+    assert reports[-1].summary.loc["LCOEOpex [Euro/kWh]", "count"] == 3
+    
+    # A new run is not cancelled
+    test.remove_progress_callback(callback)
+    result = test()
+    
+    assert not test.is_cancelled()
+    assert len(result["MetricsTable [-]"]) == 10
+    assert len(reports) == 3
+    
+    # A cancellation before the run starts stops it before any data points
+    test.cancel()
+    result = test()
+    
+    assert test.is_cancelled()
+    assert len(result["MetricsTable [-]"]) == 0
+    assert mock_calc.call_count == 13
+    
+    result = test()
+    
+    assert not test.is_cancelled()
+    assert len(result["MetricsTable [-]"]) == 10
+
+
+def test_LCOE_Statistics_time_budget(mocker, data_point):
+    
+    # Each data point takes one second of a fake clock
+    clock = [0.]
+    
+    def execute_calc():
+        clock[0] += 1.
+        return data_point
+    
+    mocker.patch('dtocean_maintenance.main.timeit.default_timer',
+                 side_effect=lambda: clock[0])
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.__init__',
+                 return_value=None)
+    mock_calc = mocker.patch(
+                    'dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                    side_effect=execute_calc)
+    mocker.patch('dtocean_logistics.performance.schedule.schedule_shared.'
+                 'WaitingTime.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    control = inputOM(None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      {'numberOfSimulations': None,
+                       'timeBudget': 4.5})
+    
+    test = LCOE_Statistics(control)
+    result = test()
+    
+    assert mock_calc.call_count == 4
+    assert test.get_n_data_points() == 4
+    assert len(result["MetricsTable [-]"]) == 4
+
+
+def test_LCOE_Statistics_sweep_time_budget(mocker, data_point):
+    
+    # Each data point takes one second of a fake clock
+    clock = [0.]
+    
+    def execute_calc():
+        clock[0] += 1.
+        return data_point
+    
+    mocker.patch('dtocean_maintenance.main.timeit.default_timer',
+                 side_effect=lambda: clock[0])
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.__init__',
+                 return_value=None)
+    mock_calc = mocker.patch(
+                    'dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                    side_effect=execute_calc)
+    mocker.patch('dtocean_logistics.performance.schedule.schedule_shared.'
+                 'WaitingTime.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    control = inputOM({'helideck': False},
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      {'numberOfSimulations': None,
+                       'timeBudget': 5.5})
+    
+    scenarios = [{}, {"Farm_OM": {'helideck': True}}]
+    
+    test = LCOE_Statistics(control)
+    result = test.sweep(scenarios)
+    
+    # The data point started by only one scenario is discarded
+    assert mock_calc.call_count == 5
+    assert all(len(x["MetricsTable [-]"]) == 2 for x in result)
+
+
+def test_LCOE_Statistics_sweep_no_simulations():
+    
+    control = inputOM({'helideck': False},
+                      None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      {'numberOfSimulations': None})
+    
+    test = LCOE_Statistics(control)
+    
+    with pytest.raises(ValueError) as excinfo:
+        test.sweep([{}])
+    
+    assert "numberOfSimulations" in str(excinfo)
+
+
+def test_LCOE_Statistics_main_parallel_shared_metocean(mocker,
+                                                       tmpdir,
+                                                       data_point):
+    
+    mocker.patch('dtocean_maintenance.main.Pool',
+                 side_effect=MockPool)
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                 return_value=data_point)
+    mock_waiting = mocker.patch('dtocean_logistics.performance.schedule.'
+                                'schedule_shared.WaitingTime.__init__',
+                                return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    metocean = pd.DataFrame({"year [-]": [2000, 2000],
+                             "Hs [m]": [1., 2.]})
+    
+    logistics_param = {'equipments': None,
+                       'metocean': metocean,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    control = inputOM(None,
+                      None,
+                      None,
+                      None,
+                      None,
+                      ram_param,
+                      logistics_param,
+                      None,
+                      {'numberOfSimulations': 3,
+                       'numberOfProcesses': 2,
+                       'sharedMemoryPath': str(tmpdir)})
+    
+    test = LCOE_Statistics(control)
+    result = test()
+    
+    assert len(result["MetricsTable [-]"]) == 3
+    assert mock_waiting.call_count == 1
+    
+    worker_metocean = mock_waiting.call_args[0][0]
+    
+    assert worker_metocean is not metocean
+    pd.testing.assert_frame_equal(worker_metocean, metocean)
+    
+    # The shared files are removed after the run
+    assert len(tmpdir.listdir()) == 0
+    assert logistics_param['metocean'] is metocean
+
+
+def test_iter_pool_chunks(mocker):
+    
+    chunk_sizes = []
+    
+    # Each task takes 0.1 seconds
+    def run_chunk(tasks, keep_events_tables, keep_data_points):
+        chunk_sizes.append(len(tasks))
+        return 0.1 * len(tasks), [task * 2 for task in tasks]
+    
+    mocker.patch('dtocean_maintenance.main._run_worker_chunk',
+                 side_effect=run_chunk)
+    
+    tasks = range(100)
+    result = [x for block in _iter_pool_chunks(MockPool(),
+                                               tasks,
+                                               2,
+                                               {"chunkTime": 1.})
+                                                            for x in block]
+    
+    assert result == [task * 2 for task in tasks]
+    assert sum(chunk_sizes) == 100
+    assert chunk_sizes[0] == 1
+    assert max(chunk_sizes) == 10
+
+
+def test_iter_pool_chunks_deadline(mocker):
+    
+    # Each task takes 0.1 seconds of a fake clock
+    clock = [0.]
+    
+    def run_chunk(tasks, keep_events_tables, keep_data_points):
+        elapsed = 0.1 * len(tasks)
+        clock[0] += elapsed
+        return elapsed, [task * 2 for task in tasks]
+    
+    mocker.patch('dtocean_maintenance.main._run_worker_chunk',
+                 side_effect=run_chunk)
+    mocker.patch('dtocean_maintenance.main.timeit.default_timer',
+                 side_effect=lambda: clock[0])
+    
+    tasks = range(100)
+    result = [x for block in _iter_pool_chunks(MockPool(),
+                                               tasks,
+                                               2,
+                                               {"chunkTime": 1.},
+                                               2.)
+                                                            for x in block]
+    
+    assert 2 < len(result) < 100
+    assert result == [task * 2 for task in tasks[:len(result)]]
+    assert clock[0] <= 2. + 1e-9
+
+
+def test_iter_pool_chunks_presample(mocker):
+    
+    chunks = []
+    
+    # Each task takes 0.1 seconds
+    def run_chunk(tasks, keep_events_tables, keep_data_points):
+        chunks.append(tasks)
+        return 0.1 * len(tasks), tasks
+    
+    mocker.patch('dtocean_maintenance.main._run_worker_chunk',
+                 side_effect=run_chunk)
+    
+    tasks = range(3, 100)
+    result = [x for block in _iter_pool_chunks(MockPool(),
+                                               tasks,
+                                               2,
+                                               {"chunkTime": 1.,
+                                                "presampleFailures": 10})
+                                                            for x in block]
+    
+    # Chunks start at the boundaries of the presampled blocks
+    assert result == tasks
+    assert chunks[0] == range(3, 10)
+    assert all(chunk[0] % 10 == 0 for chunk in chunks[1:])
+
+
+def test_StatisticsEngine(mocker, data_point):
+    
+    mock_pool = mocker.patch('dtocean_maintenance.main.Pool',
+                             side_effect=MockPool)
+    mock_logistics = mocker.patch(
+                            'dtocean_maintenance.logistics.Logistics.__init__',
+                            return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.__init__',
+                 return_value=None)
+    mock_calc = mocker.patch(
+                    'dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                    return_value=data_point)
+    mock_waiting = mocker.patch('dtocean_logistics.performance.schedule.'
+                                'schedule_shared.WaitingTime.__init__',
+                                return_value=None)
+    mock_network = mocker.patch('dtocean_reliability.Network.__init__',
+                                return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    logistics_param = {'equipments': None,
+                       'metocean': None,
+                       'ports': None,
+                       'vessels': None,
+                       'eq_sf': None,
+                       'port_sf': None,
+                       'vessel_sf': None,
+                       'schedule_OLC': None}
+    
+    def get_input(repair_action):
+        
+        return inputOM(None,
+                       None,
+                       None,
+                       repair_action,
+                       None,
+                       ram_param,
+                       logistics_param,
+                       None,
+                       {'numberOfSimulations': 3})
+    
+    with StatisticsEngine(n_processes=2) as engine:
+        
+        first = engine.run(get_input({"a": 1}))
+        second = engine.run(get_input({"a": 1}))
+        
+        assert len(first["MetricsTable [-]"]) == 3
+        assert len(second["MetricsTable [-]"]) == 3
+        assert mock_calc.call_count == 6
+        
+        # The shared objects are reused by the repeated run
+        assert mock_waiting.call_count == 1
+        assert mock_network.call_count == 1
+        assert mock_logistics.call_count == 1
+        
+        # Changed inputs require new logistics
+        engine.run(get_input({"a": 2}))
+        
+        assert mock_waiting.call_count == 1
+        assert mock_logistics.call_count == 2
+        
+        # The inputs file of each run is removed once it is complete
+        assert not [x for x in os.listdir(engine._path)
+                                                    if x.startswith("run_")]
+    
+    assert mock_pool.call_count == 1
+    assert engine._pool is None
+
+
+def test_StatisticsEngine_shared_metocean(mocker, tmpdir, data_point):
+    
+    mocker.patch('dtocean_maintenance.main.Pool', side_effect=MockPool)
+    mocker.patch('dtocean_maintenance.logistics.Logistics.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_maintenance.main.LCOE_Calculator.executeCalc',
+                 return_value=data_point)
+    mocker.patch('dtocean_logistics.performance.schedule.'
+                 'schedule_shared.WaitingTime.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.__init__',
+                 return_value=None)
+    mocker.patch('dtocean_reliability.Network.set_failure_rates',
+                 return_value=None)
+    mock_keys = mocker.spy(main, '_get_cache_keys')
+    
+    ram_param = {'db': None,
+                 'elechier': None,
+                 'elecbom': None,
+                 'moorhier': None,
+                 'moorbom': None,
+                 'userhier': None,
+                 'userbom': None,
+                 'calcscenario': None,
+                 'kfactors': None}
+    
+    def get_input(metocean):
+        
+        logistics_param = {'equipments': None,
+                           'metocean': metocean,
+                           'ports': None,
+                           'vessels': None,
+                           'eq_sf': None,
+                           'port_sf': None,
+                           'vessel_sf': None,
+                           'schedule_OLC': None}
+        
+        return inputOM(None,
+                       None,
+                       None,
+                       None,
+                       None,
+                       ram_param,
+                       logistics_param,
+                       None,
+                       {'numberOfSimulations': 2,
+                        'sharedMemoryPath': str(tmpdir)})
+    
+    metocean = pd.DataFrame({"Hs [m]": [1., 2.]})
+    first = get_input(metocean)
+    
+    with StatisticsEngine(n_processes=2, cache_size=1) as engine:
+        
+        engine.run(first)
+        engine.run(first)
+        
+        # The inputs are hashed and shared once
+        assert mock_keys.call_count == 1
+        assert len(tmpdir.listdir()) == 1
+        
+        # The files of evicted metocean data are removed
+        engine.run(get_input(metocean * 2))
+        
+        assert mock_keys.call_count == 2
+        assert len(tmpdir.listdir()) == 1
+        
+        # Replacing a table of inputs which have been run is detected
+        first.get_Logistic_Param()['metocean'] = pd.concat([metocean] * 2)
+        engine.run(first)
+        
+        assert mock_keys.call_count == 3
+    
+    assert len(tmpdir.listdir()) == 0
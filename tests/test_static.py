@@ -17,6 +17,9 @@
 
 # pylint: disable=redefined-outer-name
 
+import os
+import pickle
+import time
 import datetime as dt
 
 import pytest
@@ -25,12 +28,33 @@ import numpy as np
 import pandas as pd
 
 from dtocean_maintenance.static import (Availability,
+                                        Checkpoint,
+                                        DataPointAccumulator,
                                         Energy,
+                                        EventTablesStore,
+                                        FailureDates,
+                                        FailureTimelines,
+                                        FileWorkQueue,
+                                        ResultBlock,
                                         get_uptime_df,
                                         get_device_energy_df,
                                         get_opex_per_year,
                                         get_opex_lcoe,
-                                        get_number_of_journeys)
+                                        get_number_of_journeys,
+                                        get_data_point_random_state,
+                                        get_normal_quantile,
+                                        get_parameter_records,
+                                        get_poisson_quantile,
+                                        get_relative_interval_width,
+                                        get_summary_df,
+                                        poisson_process,
+                                        PortSelectionStore,
+                                        P2Quantile,
+                                        RunningMoments,
+                                        SharedFrame,
+                                        StratifiedFailureSampler,
+                                        SummaryStatistics,
+                                        WeightedQuantile)
 
 
 @pytest.fixture(scope="module")
@@ -1001,3 +1025,855 @@ def test_Energy_get_project_energy_df(energy):
     assert project_energy_df["Year"].min() == 0
     assert project_energy_df["Year"].max() == (commissioning_year - \
                                                     start_year) + mission_time
+
+
+def test_get_data_point_random_state():
+    
+    first = get_data_point_random_state(1, 0).random_sample(10)
+    repeat = get_data_point_random_state(1, 0).random_sample(10)
+    second = get_data_point_random_state(1, 1).random_sample(10)
+    
+    assert np.allclose(first, repeat)
+    assert not np.allclose(first, second)
+
+
+def test_poisson_process_random_state():
+    
+    start = dt.datetime(2016, 1, 1)
+    
+    first = poisson_process(start,
+                            3650,
+                            0.01,
+                            get_data_point_random_state(1, 0))
+    repeat = poisson_process(start,
+                             3650,
+                             0.01,
+                             get_data_point_random_state(1, 0))
+    
+    assert first
+    assert first == repeat
+
+
+def test_poisson_process_distribution():
+    
+    start = dt.datetime(2016, 1, 1)
+    random_state = np.random.RandomState(1)
+    
+    samples = [poisson_process(start, 3650, 0.01, random_state)
+                                                        for _ in range(2000)]
+    counts = np.array([len(x) for x in samples])
+    
+    # Poisson distributed counts with mean and variance of rate * time
+    assert np.isclose(counts.mean(), 36.5, rtol=0.02)
+    assert np.isclose(counts.var(), 36.5, rtol=0.15)
+    
+    # Exponential first arrival times, rounded to whole days
+    first = np.array([(x[0] - start).days for x in samples if x])
+    
+    assert np.isclose(first.mean(), 100., rtol=0.1)
+    
+    assert all(x == sorted(x) for x in samples)
+    assert all(x[-1] <= start + dt.timedelta(days=3650)
+                                                    for x in samples if x)
+
+
+def test_poisson_process_zero_rate():
+    
+    result = poisson_process(dt.datetime(2016, 1, 1), 3650, 0.)
+    
+    assert result == []
+    assert result.n_events == 0
+
+
+def test_poisson_process_n_events(mocker):
+    
+    # Inter-arrival times of 0.6 days are rounded to one day, which pushes
+    # the third event beyond the end of the simulation
+    random_state = mocker.Mock()
+    random_state.exponential.side_effect = \
+                                        lambda scale, size: np.full(size, 0.6)
+    
+    result = poisson_process(dt.datetime(2016, 1, 1), 2., 1., random_state)
+    
+    assert isinstance(result, FailureDates)
+    assert len(result) == 2
+    assert result.n_events == 3
+
+
+def get_data_point(scale, events_tables=None):
+    
+    return {"lifetimeOpex [Euro]": 1. * scale,
+            "lifetimeEnergy [Wh]": 2. * scale,
+            "LCOEOpex [Euro/kWh]": 3. * scale,
+            "arrayDowntime [hour]": 4. * scale,
+            "arrayAvailability [-]": 0.5,
+            "numberOfJourneys [-]": scale,
+            "CapexOfArray [Euro]": 1.,
+            "OpexPerYear [Euro]": pd.DataFrame(
+                                        {"Year": [0, 1, 2],
+                                         "Cost": [0., 1. * scale, 2.]}),
+            "energyPerYear [Wh]": pd.DataFrame(
+                                        {"Year": [0, 1, 2],
+                                         "Energy": [0., 3., 4. * scale]}),
+            "downtimePerDevice [hour]": {'device002': 2. * scale,
+                                         'device001': 1. * scale},
+            "energyPerDevice [Wh]": {'device001': 3. * scale,
+                                     'device002': 4. * scale},
+            'eventTables [-]': events_tables}
+
+
+def test_DataPointAccumulator():
+    
+    # Start with too small a capacity to test growth
+    test = DataPointAccumulator(2)
+    
+    for sim_number in range(5):
+        test.add(sim_number, get_data_point(sim_number + 1))
+    
+    result = test.get_output_dict()
+    
+    assert len(test) == 5
+    assert len(result["MetricsTable [-]"]) == 5
+    assert len(result['eventTables [-]']) == 5
+    assert result["CapexOfArray [Euro]"] == 1.
+    assert result["OpexPerYear [Euro]"].index.name == "Year"
+    assert list(result["OpexPerYear [Euro]"].columns) == \
+                        ["Cost {} [Euro]".format(i) for i in range(5)]
+    assert np.allclose(result["OpexPerYear [Euro]"].loc[1].values,
+                       [1., 2., 3., 4., 5.])
+    assert np.allclose(result["energyPerYear [Wh]"].loc[2].values,
+                       [4., 8., 12., 16., 20.])
+    assert list(result["downtimePerDevice [hour]"].index) == ['device001',
+                                                              'device002']
+    assert np.allclose(
+            result["downtimePerDevice [hour]"]["Downtime 4 [hours]"].values,
+            [5., 10.])
+    assert np.allclose(
+                result["energyPerDevice [Wh]"].loc['device002'].values,
+                [4., 8., 12., 16., 20.])
+
+
+def test_DataPointAccumulator_add_block():
+    
+    block = ResultBlock(range(4),
+                        [get_data_point(i + 1) for i in range(4)])
+    
+    # Later data points may lack the years or devices of the first
+    data_point = get_data_point(5)
+    data_point["OpexPerYear [Euro]"] = pd.DataFrame({"Year": [0, 1],
+                                                     "Cost": [0., 5.]})
+    data_point["downtimePerDevice [hour]"] = {'device001': 5.}
+    
+    test = DataPointAccumulator(2)
+    test.add(4, data_point)
+    test.add_block(block, [1, 3])
+    
+    result = test.get_output_dict()
+    
+    assert len(test) == 3
+    assert list(result["OpexPerYear [Euro]"].columns) == \
+                        ["Cost {} [Euro]".format(i) for i in [4, 1, 3]]
+    assert list(result["OpexPerYear [Euro]"].index) == [0, 1]
+    assert np.allclose(result["OpexPerYear [Euro]"].loc[1].values,
+                       [5., 2., 4.])
+    assert list(result["downtimePerDevice [hour]"].index) == ['device001']
+    assert np.allclose(result["MetricsTable [-]"]["lifetimeOpex [Euro]"],
+                       [5., 2., 4.])
+    assert len(result['eventTables [-]']) == 3
+
+
+def test_ResultBlock():
+    
+    data_points = [get_data_point(i + 1, "tables") for i in range(3)]
+    data_points[2]["likelihoodRatio [-]"] = 0.5
+    
+    test = ResultBlock([4, 5, 6], data_points, keep_events_tables=False)
+    
+    assert len(test) == 3
+    assert test.opex_years == [0, 1, 2]
+    assert test.device_ids == ['device001', 'device002']
+    assert test.year_opex.shape == (3, 3)
+    assert np.allclose(test.device_energy[1], [4., 8., 12.])
+    assert test.likelihood_ratios.tolist() == [1., 1., 0.5]
+    assert test.events_tables is None
+    assert test.data_points is None
+    
+    metrics = test.get_metrics(1)
+    
+    assert metrics["lifetimeOpex [Euro]"] == 2.
+    assert metrics["likelihoodRatio [-]"] == 1.
+    
+    data_point = test.get_data_point(2)
+    
+    assert data_point["lifetimeOpex [Euro]"] == 3.
+    assert data_point["CapexOfArray [Euro]"] == 1.
+    assert data_point['eventTables [-]'] is None
+    assert data_point["downtimePerDevice [hour]"] == {'device001': 3.,
+                                                      'device002': 6.}
+    assert data_point["OpexPerYear [Euro]"].set_index(
+                                    "Year")["Cost"].tolist() == [0., 3., 2.]
+    assert data_point["energyPerYear [Wh]"].set_index(
+                                    "Year")["Energy"].tolist() == [0., 3., 12.]
+
+
+def test_ResultBlock_keep_data_points():
+    
+    data_points = [get_data_point(i + 1, "tables") for i in range(2)]
+    
+    test = ResultBlock([0, 1], data_points, keep_data_points=True)
+    
+    assert test.get_data_point(1) is data_points[1]
+    assert test.events_tables == ["tables", "tables"]
+    
+    test = ResultBlock([0, 1],
+                       data_points,
+                       keep_events_tables=False,
+                       keep_data_points=True)
+    
+    assert test.get_data_point(1)['eventTables [-]'] is None
+    assert data_points[1]['eventTables [-]'] == "tables"
+
+
+def test_DataPointAccumulator_empty():
+    
+    test = DataPointAccumulator(2)
+    result = test.get_output_dict()
+    
+    assert len(test) == 0
+    assert result["MetricsTable [-]"].empty
+    assert result["OpexPerYear [Euro]"].empty
+
+
+def test_DataPointAccumulator_discard_events_tables():
+    
+    test = DataPointAccumulator(2, keep_events_tables=False)
+    
+    for sim_number in range(3):
+        test.add(sim_number, get_data_point(sim_number + 1, {"a": 1}))
+    
+    result = test.get_output_dict()
+    
+    assert len(result["MetricsTable [-]"]) == 3
+    assert result['eventTables [-]'] == []
+
+
+def test_DataPointAccumulator_EventTablesStore(tmpdir):
+    
+    store = EventTablesStore(str(tmpdir.join("events")))
+    test = DataPointAccumulator(2, events_tables=store)
+    
+    for sim_number in range(3):
+        test.add(sim_number,
+                 get_data_point(sim_number + 1, {"a": sim_number}))
+    
+    result = test.get_output_dict()
+    
+    assert result['eventTables [-]'] is store
+    assert len(store) == 3
+    assert store[1] == {"a": 1}
+    assert [x["a"] for x in store] == [0, 1, 2]
+
+
+def test_DataPointAccumulator_summaries():
+    
+    test = DataPointAccumulator(5)
+    
+    for sim_number in range(5):
+        test.add(sim_number, get_data_point(sim_number + 1))
+    
+    result = test.get_output_dict()
+    metrics_summary = result["MetricsSummary [-]"]
+    opex_summary = result["OpexPerYearSummary [Euro]"]
+    
+    assert list(metrics_summary.index) == \
+                                    sorted(DataPointAccumulator.metric_keys)
+    assert list(metrics_summary.columns) == ["count",
+                                             "mean",
+                                             "std",
+                                             "P10",
+                                             "P50",
+                                             "P90"]
+    assert np.isclose(metrics_summary.loc["lifetimeOpex [Euro]", "mean"],
+                      3.)
+    assert np.isclose(metrics_summary.loc["lifetimeOpex [Euro]", "P50"],
+                      3.)
+    assert opex_summary.index.name == "Year"
+    assert list(opex_summary.index) == [0, 1, 2]
+    assert np.isclose(opex_summary.loc[1, "std"], np.std(range(1, 6), ddof=1))
+
+
+@pytest.mark.parametrize("probability, expected", [
+                            (0.5, 0.),
+                            (0.975, 1.959964),
+                            (0.05, -1.644854)])
+def test_get_normal_quantile(probability, expected):
+    assert np.isclose(get_normal_quantile(probability), expected)
+
+
+def test_get_normal_quantile_bad_probability():
+    
+    with pytest.raises(ValueError):
+        get_normal_quantile(1.)
+
+
+def test_get_relative_interval_width():
+    
+    values = [1., 2., 3., 4., 5.]
+    expected = 2 * 1.959964 * np.std(values, ddof=1) / np.sqrt(5) / 3.
+    
+    assert np.isclose(get_relative_interval_width(values), expected)
+
+
+@pytest.mark.parametrize("values, expected", [
+                            ([1.], np.inf),
+                            ([2., 2., 2.], 0.),
+                            ([-1., 1.], np.inf)])
+def test_get_relative_interval_width_special(values, expected):
+    assert get_relative_interval_width(values) == expected
+
+
+def test_RunningMoments():
+    
+    values = [3., 1., 4., 1., 5., 9., 2., 6.]
+    test = RunningMoments()
+    
+    for value in values:
+        test.add(value)
+    
+    assert test.get_count() == len(values)
+    assert np.isclose(test.get_mean(), np.mean(values))
+    assert np.isclose(test.get_std(), np.std(values, ddof=1))
+    assert np.isclose(test.get_relative_interval_width(),
+                      get_relative_interval_width(values))
+    assert np.isclose(test.get_interval_width(),
+                      get_relative_interval_width(values) * np.mean(values))
+
+
+def test_RunningMoments_weighted():
+    
+    test = RunningMoments()
+    
+    # Equivalent to the sample [1., 2., 2., 3., 3., 3.]
+    for value, weight in [(1., 1.), (2., 2.), (3., 3.)]:
+        test.add(value, weight)
+    
+    assert test.get_count() == 3
+    assert np.isclose(test.get_mean(), 14. / 6)
+    assert np.isclose(test.get_effective_count(), 36. / 14)
+    assert test.get_std() > 0
+
+
+def test_RunningMoments_empty():
+    
+    test = RunningMoments()
+    
+    assert test.get_count() == 0
+    assert np.isnan(test.get_mean())
+    assert np.isnan(test.get_std())
+    assert test.get_interval_width() == np.inf
+
+
+def test_Checkpoint(tmpdir):
+    
+    path = str(tmpdir.join("checkpoint.pkl"))
+    
+    checkpoint = Checkpoint(path)
+    checkpoint.start(7)
+    checkpoint.add(0, {"a": 1})
+    checkpoint.add(1, {"a": 2})
+    checkpoint.close()
+    
+    checkpoint = Checkpoint(path)
+    master_seed, records = checkpoint.resume()
+    checkpoint.add(2, {"a": 3})
+    checkpoint.close()
+    
+    assert master_seed == 7
+    assert records == [(0, {"a": 1}), (1, {"a": 2})]
+    
+    master_seed, records = Checkpoint(path).resume()
+    
+    assert [record[0] for record in records] == [0, 1, 2]
+
+
+def test_Checkpoint_truncated(tmpdir):
+    
+    path = str(tmpdir.join("checkpoint.pkl"))
+    
+    checkpoint = Checkpoint(path)
+    checkpoint.start(7)
+    checkpoint.add(0, {"a": 1})
+    checkpoint.add(1, {"a": 2})
+    checkpoint.close()
+    
+    # Simulate an interrupted write of the last record
+    size = os.path.getsize(path)
+    
+    with open(path, "r+b") as f:
+        f.truncate(size - 3)
+    
+    checkpoint = Checkpoint(path)
+    master_seed, records = checkpoint.resume()
+    checkpoint.add(1, {"a": 3})
+    checkpoint.close()
+    
+    assert records == [(0, {"a": 1})]
+    
+    master_seed, records = Checkpoint(path).resume()
+    
+    assert records == [(0, {"a": 1}), (1, {"a": 3})]
+
+
+@pytest.mark.parametrize("inputs_key, n_sims", [("b", 10),
+                                               ("a", 20),
+                                               (None, None)])
+def test_Checkpoint_resume_mismatch(tmpdir, inputs_key, n_sims):
+    
+    path = str(tmpdir.join("checkpoint.pkl"))
+    
+    checkpoint = Checkpoint(path)
+    checkpoint.start(7, "a", 10)
+    checkpoint.add(0, {"a": 1})
+    checkpoint.close()
+    
+    with pytest.raises(ValueError):
+        Checkpoint(path).resume(inputs_key, n_sims)
+    
+    master_seed, records = Checkpoint(path).resume("a", 10)
+    
+    assert master_seed == 7
+    assert records == [(0, {"a": 1})]
+
+
+def test_Checkpoint_resume_missing(tmpdir):
+    
+    path = str(tmpdir.join("checkpoint.pkl"))
+    
+    with pytest.raises(IOError):
+        Checkpoint(path).resume()
+
+
+@pytest.mark.parametrize("probability", [0.1, 0.5, 0.9])
+def test_P2Quantile(probability):
+    
+    values = np.random.RandomState(1).normal(size=10000)
+    
+    test = P2Quantile(probability)
+    
+    for value in values:
+        test.add(value)
+    
+    assert np.isclose(test.get_quantile(),
+                      np.percentile(values, 100 * probability),
+                      atol=0.05)
+
+
+def test_P2Quantile_small_sample():
+    
+    test = P2Quantile(0.5)
+    
+    assert np.isnan(test.get_quantile())
+    
+    for value in [3., 1., 2.]:
+        test.add(value)
+    
+    assert test.get_quantile() == 2.
+
+
+def test_P2Quantile_bad_probability():
+    
+    with pytest.raises(ValueError):
+        P2Quantile(1.)
+
+
+def test_SummaryStatistics():
+    
+    values = [1., 2., 3., 4., 5., 6., 7., 8., 9., 10.]
+    test = SummaryStatistics(quantiles=(0.5,))
+    
+    for value in values:
+        test.add(value)
+    
+    quantiles = test.get_quantiles()
+    
+    assert test.get_count() == 10
+    assert np.isclose(test.get_mean(), 5.5)
+    assert len(quantiles) == 1
+    assert quantiles[0][0] == 0.5
+    assert np.isclose(quantiles[0][1], 5.5, atol=0.5)
+
+
+def test_get_summary_df():
+    
+    summaries = {"b": SummaryStatistics(),
+                 "a": SummaryStatistics()}
+    
+    for value in range(10):
+        summaries["a"].add(value)
+        summaries["b"].add(2 * value)
+    
+    result = get_summary_df(summaries, "name")
+    
+    assert list(result.index) == ["a", "b"]
+    assert result.index.name == "name"
+    assert list(result.columns) == ["count",
+                                    "mean",
+                                    "std",
+                                    "P10",
+                                    "P50",
+                                    "P90"]
+    assert np.isclose(result.loc["b", "mean"], 9.)
+
+
+def test_get_summary_df_moments():
+    
+    summaries = {"a": RunningMoments()}
+    summaries["a"].add(1.)
+    
+    result = get_summary_df(summaries)
+    
+    assert list(result.columns) == ["count", "mean", "std"]
+
+
+def test_FileWorkQueue(tmpdir):
+    
+    test = FileWorkQueue(str(tmpdir))
+    
+    assert test.get_runs() == []
+    assert test.claim() is None
+    
+    run_id = test.submit("inputs", 3, [2, 0, 1])
+    
+    assert test.get_runs() == [run_id]
+    assert test.get_inputs(run_id) == ("inputs", 3)
+    assert test.claim() == (run_id, 0)
+    assert test.claim(run_id) == (run_id, 1)
+    
+    test.complete(run_id,
+                  1,
+                  ResultBlock([1], [get_data_point(2)], False))
+    
+    assert test.pop_result(run_id, 0) is None
+    
+    result = test.pop_result(run_id, 1)
+    
+    assert isinstance(result, ResultBlock)
+    assert result.sim_numbers == [1]
+    assert result.get_metrics(0)["lifetimeOpex [Euro]"] == 2.
+    assert result.events_tables is None
+    assert test.pop_result(run_id, 1) is None
+    
+    # Requeue the unfinished claim of data point 0
+    test.requeue_stale(run_id, -1)
+    
+    assert test.claim() == (run_id, 0)
+    
+    test.cancel(run_id)
+    
+    assert test.get_runs() == []
+    assert test.claim() is None
+    
+    # Results of removed runs are discarded
+    test.complete(run_id, 0, {"a": 1})
+    
+    assert test.get_runs() == []
+
+
+def test_FileWorkQueue_runs(tmpdir):
+    
+    test = FileWorkQueue(str(tmpdir))
+    first = test.submit("first", 3, [0, 1])
+    second = test.submit("second", 4, [0])
+    
+    assert test.get_runs() == [first, second]
+    assert test.get_inputs(first) == ("first", 3)
+    assert test.get_inputs(second) == ("second", 4)
+    
+    # Each run only claims its own data points
+    assert test.claim(second) == (second, 0)
+    assert test.claim(second) is None
+    
+    test.complete(second, 0, {"a": 2})
+    
+    assert test.pop_result(first, 0) is None
+    assert test.pop_result(second, 0) == {"a": 2}
+    
+    # Earlier runs are claimed first
+    assert test.claim() == (first, 0)
+    
+    test.cancel(second)
+    
+    assert test.get_runs() == [first]
+    assert test.claim() == (first, 1)
+
+
+def test_FileWorkQueue_claim_time(tmpdir):
+    
+    test = FileWorkQueue(str(tmpdir))
+    run_id = test.submit({"a": 1}, 7, [0])
+    
+    # A task queued long ago is not stale once claimed
+    task_path = str(tmpdir.join("runs", run_id, "tasks", "000000000"))
+    old_time = time.time() - 3600
+    os.utime(task_path, (old_time, old_time))
+    
+    assert test.claim(run_id) == (run_id, 0)
+    
+    test.requeue_stale(run_id, 60)
+    
+    assert test.claim(run_id) is None
+
+
+def test_PortSelectionStore(tmpdir):
+    
+    path = str(tmpdir.join("ports"))
+    test = PortSelectionStore(path)
+    key = test.get_key((1., 2.), "ports")
+    
+    assert key == PortSelectionStore.get_key((1., 2.), "ports")
+    assert key != PortSelectionStore.get_key((1., 3.), "ports")
+    assert key not in test
+    
+    with pytest.raises(KeyError):
+        test[key]
+    
+    test[key] = {"repair": (10., 1)}
+    
+    assert key in PortSelectionStore(path)
+    assert PortSelectionStore(path)[key] == {"repair": (10., 1)}
+
+
+def test_SharedFrame(tmpdir):
+    
+    df = pd.DataFrame({"Hs [m]": [1., 2., 3.],
+                       "year [-]": [2000, 2000, 2001],
+                       "name": ["a", "b", "c"]},
+                      columns=["year [-]", "Hs [m]", "name"],
+                      index=[10, 11, 12])
+    
+    test = SharedFrame.create(df, str(tmpdir))
+    
+    assert len(tmpdir.listdir()) == 1
+    
+    result = pickle.loads(pickle.dumps(test)).load()
+    
+    pd.testing.assert_frame_equal(result, df)
+    
+    # Modifications are private to the process
+    result.iloc[0, 1] = 5.
+    
+    assert test.load().iloc[0, 1] == 1.
+    
+    test.remove()
+    
+    assert len(tmpdir.listdir()) == 0
+
+
+def test_SharedFrame_shares_memory(tmpdir):
+    
+    df = pd.DataFrame({"Hs [m]": [1., 2., 3.],
+                       "Tp [s]": [4., 5., 6.],
+                       "year [-]": [2000, 2000, 2001],
+                       "date": pd.date_range("2000-01-01", periods=3),
+                       "name": ["a", "b", "c"]},
+                      columns=["date", "Hs [m]", "name", "year [-]",
+                               "Tp [s]"])
+    
+    test = SharedFrame.create(df, str(tmpdir))
+    result = test.load()
+    
+    pd.testing.assert_frame_equal(result, df)
+    
+    hs = result["Hs [m]"].values
+    tp = result["Tp [s]"].values
+    
+    # Columns of the same type are views of a single mapped array
+    mapped = hs
+    while isinstance(mapped.base, np.ndarray): mapped = mapped.base
+    
+    assert isinstance(mapped, np.memmap)
+    assert mapped.shape == (2, 3)
+    assert np.shares_memory(hs, mapped)
+    assert np.shares_memory(tp, mapped)
+    
+    for column in ["year [-]", "date"]:
+        
+        values = result[column].values
+        mapped = values
+        while isinstance(mapped.base, np.ndarray): mapped = mapped.base
+        
+        assert isinstance(mapped, np.memmap)
+        assert np.shares_memory(values, mapped)
+    
+    test.remove()
+
+
+def test_SharedFrame_empty(tmpdir):
+    
+    df = pd.DataFrame({"Hs [m]": []})
+    
+    test = SharedFrame.create(df, str(tmpdir))
+    result = test.load()
+    test.remove()
+    
+    assert list(result.columns) == ["Hs [m]"]
+    assert len(result) == 0
+
+
+@pytest.mark.parametrize("mean, probability, expected", [
+                            (0., 0.5, 0),
+                            (1., 0.3, 0),
+                            (1., 0.5, 1),
+                            (1., 0.95, 3),
+                            (10., 0.5, 10)])
+def test_get_poisson_quantile(mean, probability, expected):
+    assert get_poisson_quantile(mean, probability) == expected
+
+
+def test_StratifiedFailureSampler_strata():
+    
+    n_points = 16
+    
+    probabilities = [StratifiedFailureSampler(1, i).get_probability("A_1")
+                                                    for i in range(n_points)]
+    strata = sorted(int(p * n_points) for p in probabilities)
+    
+    assert strata == range(n_points)
+    
+    others = [StratifiedFailureSampler(1, i).get_probability("B_1")
+                                                    for i in range(n_points)]
+    
+    assert not np.allclose(probabilities, others)
+
+
+def test_StratifiedFailureSampler_call():
+    
+    start = dt.datetime(2016, 1, 1)
+    
+    def sample(sim_number):
+        random_state = get_data_point_random_state(1, sim_number)
+        sampler = StratifiedFailureSampler(1, sim_number, random_state)
+        return sampler("A_1", start, 3650, 0.01)
+    
+    first = sample(0)
+    repeat = sample(0)
+    
+    assert first == repeat
+    
+    counts = [len(sample(i)) for i in range(32)]
+    
+    assert np.isclose(np.mean(counts), 36.5, rtol=0.05)
+    assert all(x >= start for x in first)
+    assert all(x <= start + dt.timedelta(days=3650) for x in first)
+    assert first == sorted(first)
+
+
+@pytest.mark.parametrize("probability, expected", [(0.1, 1.),
+                                                   (0.5, 2.),
+                                                   (0.9, 3.)])
+def test_WeightedQuantile(probability, expected):
+    
+    test = WeightedQuantile(probability)
+    
+    for value, weight in [(3., 5.), (1., 2.), (2., 3.)]:
+        test.add(value, weight)
+    
+    assert test.get_quantile() == expected
+
+
+def test_DataPointAccumulator_weighted():
+    
+    test = DataPointAccumulator(3, weighted=True)
+    
+    for sim_number, weight in enumerate([0.5, 1., 1.5]):
+        data_point = get_data_point(sim_number + 1)
+        data_point["likelihoodRatio [-]"] = weight
+        test.add(sim_number, data_point)
+    
+    result = test.get_output_dict()
+    metrics_summary = result["MetricsSummary [-]"]
+    
+    assert list(result["MetricsTable [-]"]["likelihoodRatio [-]"]) == \
+                                                                [0.5, 1., 1.5]
+    assert np.isclose(metrics_summary.loc["lifetimeOpex [Euro]", "mean"],
+                      7. / 3)
+    assert metrics_summary.loc["lifetimeOpex [Euro]", "count"] == 3
+
+
+def test_FailureTimelines():
+    
+    rates = {"A_1": 0.01, "A_2": 0.001}
+    test = FailureTimelines.sample(rates, range(3), 3650, 1)
+    repeat = FailureTimelines.sample(rates, range(3), 3650, 1)
+    other = FailureTimelines.sample(rates, range(3, 6), 3650, 1)
+    
+    assert 2 in test
+    assert 3 not in test
+    
+    for sim_number in range(3):
+        for key in rates:
+            
+            times = test.get_times(sim_number, key)
+            
+            assert (np.diff(times) >= 0).all()
+            assert ((times >= 0) & (times <= 3650)).all()
+    
+    # Blocks of the same data points are reproducible
+    assert np.allclose(test.get_times(2, "A_1"), repeat.get_times(2, "A_1"))
+    assert not np.array_equal(test.get_times(0, "A_1"),
+                              other.get_times(3, "A_1"))
+    assert len(test.get_times(0, "A_1")) > 0
+
+
+def test_FailureTimelines_get_sampler():
+    
+    start = dt.datetime(2016, 1, 1)
+    rates = {"A_1": 0.01}
+    test = FailureTimelines.sample(rates, range(2), 3650, 1)
+    sampler = test.get_sampler(1, get_data_point_random_state(1, 1))
+    
+    result = sampler("A_1", start, 3650, 0.01)
+    
+    assert len(result) <= len(test.get_times(1, "A_1"))
+    assert result == sorted(result)
+    
+    # Fall back to the poisson process for other rates
+    other = sampler("A_1", start, 3650, 0.02)
+    expected = poisson_process(start,
+                               3650,
+                               0.02,
+                               get_data_point_random_state(1, 1))
+    
+    assert other == expected
+
+
+def test_get_parameter_records():
+    
+    table = pd.DataFrame({"id1_1": ["id1", "MoS1", "10", "2016-01-01"],
+                          "id2_1": ["id2", "Insp1", 2.5, "n/a"]},
+                         index=["Component_ID",
+                                "FM_ID",
+                                "duration_maintenance",
+                                "start_date"])
+    
+    records = get_parameter_records(table)
+    
+    assert set(records) == set(["id1_1", "id2_1"])
+    
+    record = records["id1_1"]
+    
+    assert record.name == "id1_1"
+    assert record["FM_ID"] == "MoS1"
+    assert record["duration_maintenance"] == 10
+    assert record["start_date"] == "2016-01-01"
+    assert records["id2_1"]["duration_maintenance"] == 2.5
+    assert "FM_ID" in record
+    assert record.keys() == list(table.index)
+    
+    with pytest.raises(KeyError):
+        record["bad"]
+    
+    result = pickle.loads(pickle.dumps(record))
+    
+    assert result["FM_ID"] == "MoS1"
+    assert result.name == "id1_1"